@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline da sincronização GitHub → GitLab AGES
+Sobe servidores locais que imitam GitHub e GitLab (dados sintéticos e latência injetável) e mede
+tempo, chamadas de API, bytes e pico de memória de execuções a frio (backfill) e em regime
+
+Uso:
+    python scripts/bench-sync.py --sizes 1000,10000 --latency-ms 20 --targets issues,prs,complete
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+from promata_sync.fake_forge import FakeForge, start_fake_forge
+
+TARGETS = ('issues', 'prs', 'complete')
+BENCH_TOKEN = 'bench-token'
+
+class SyncBenchmark:
+    def __init__(self, args: argparse.Namespace):
+        """Inicializa o benchmark com os parâmetros da linha de comando"""
+        self.args = args
+        self.results: List[Dict] = []
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log com timestamp"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] {level}: {message}", flush=True)
+
+    def _git(self, workdir: str, *args, stdin: str = None):
+        subprocess.run(['git', *args], cwd=workdir, input=stdin, capture_output=True, text=True, check=True)
+
+    def _prepare_workdir(self, base_url: str) -> str:
+        """Repositório git local com as branches sintéticas e um remote bare no lugar do GitLab"""
+        workdir = tempfile.mkdtemp(prefix='bench-sync-')
+        bare = os.path.join(workdir, '.bench-gitlab.git')
+        identity = ['-c', 'user.name=bench', '-c', 'user.email=bench@localhost']
+        self._git(workdir, 'init', '-q', '-b', 'main')
+        self._git(workdir, *identity, 'commit', '-q', '--allow-empty', '-m', 'bench')
+        self._git(workdir, 'init', '-q', '--bare', bare)
+        refs = ''.join(f"create refs/heads/feature/{i} HEAD\n" for i in range(1, self.args.branches))
+        self._git(workdir, 'update-ref', '--stdin', stdin=refs)
+        
+        # O syncer completo monta a URL do remote a partir de GITLAB_URL: redirecionar para o bare local
+        host = base_url.replace('https://', '')
+        remote_url = f"https://oauth2:{BENCH_TOKEN}@{host}/pro-mata/frontend.git"
+        self._git(workdir, 'config', f'url.{bare}.insteadOf', remote_url)
+        return workdir
+
+    def _child_env(self, base_url: str) -> Dict[str, str]:
+        env = {key: value for key, value in os.environ.items()
+               if key not in ('GITHUB_BACKEND', 'SYNC_MODE', 'SYNC_HTTP_CACHE_DIR', 'GITHUB_STEP_SUMMARY')}
+        env.update({
+            'GIT_TOKEN': BENCH_TOKEN,
+            'GITLAB_TOKEN': BENCH_TOKEN,
+            'GITLAB_PROJECT_ID': '7',
+            'GITHUB_REPOSITORY': 'pro-mata/frontend',
+            'GITLAB_URL': base_url,
+            'GITHUB_API_URL': base_url,
+        })
+        return env
+
+    def _run_child(self, target: str, workdir: str, env: Dict[str, str]) -> Dict:
+        """Executa um syncer em processo separado (estado de módulo e memória isolados)"""
+        result_path = os.path.join(workdir, '.bench-result.json')
+        output = None if self.args.verbose else subprocess.DEVNULL
+        subprocess.run([sys.executable, os.path.abspath(__file__), '_worker', target, result_path],
+                       cwd=workdir, env=env, stdout=output, stderr=output)
+        try:
+            with open(result_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'ok': False, 'wall_s': None, 'peak_rss_mb': None}
+
+    def run_scenario(self, size: int, target: str):
+        """Execução a frio seguida de execução em regime com `churn` dos itens alterados"""
+        forge = FakeForge(
+            issues=size,
+            prs=int(size * self.args.pr_ratio),
+            branches=self.args.branches,
+            labels=self.args.labels,
+            comments=int(size * self.args.comment_ratio),
+            body_bytes=self.args.body_bytes,
+        )
+        server, base_url = start_fake_forge(forge, latency=self.args.latency_ms / 1000)
+        workdir = None
+        try:
+            workdir = self._prepare_workdir(base_url)
+            env = self._child_env(base_url)
+            for run in ('cold', 'steady'):
+                if run == 'steady':
+                    changed = forge.churn(self.args.churn)
+                    self.log(f"   {changed} itens alterados antes da execução em regime")
+                forge.reset_counters()
+                result = self._run_child(target, workdir, env)
+                result.update(forge.stats())
+                result.update({'size': size, 'target': target, 'run': run, 'latency_ms': self.args.latency_ms})
+                self.results.append(result)
+                self.log(f"   {target:<8} {run:<6} {self._format_row(result)}")
+        finally:
+            server.shutdown()
+            server.server_close()
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def _format_row(self, result: Dict) -> str:
+        wall = f"{result['wall_s']:.2f}s" if result.get('wall_s') is not None else 'falhou'
+        rss = f"{result['peak_rss_mb']:.0f}MB" if result.get('peak_rss_mb') is not None else '-'
+        return (f"tempo={wall:<9} github={result['github_calls']:<6} gitlab={result['gitlab_calls']:<6} "
+                f"bytes={result['bytes_out'] + result['bytes_in']:<11} memória={rss}")
+
+    def print_table(self):
+        """Tabela Markdown com todas as execuções"""
+        print("\n## ⏱️ Benchmark de sincronização\n")
+        print("| Itens | Alvo | Execução | Tempo (s) | Chamadas GitHub | Chamadas GitLab | Bytes | Pico RSS (MB) |")
+        print("|---|---|---|---|---|---|---|---|")
+        for r in self.results:
+            wall = f"{r['wall_s']:.2f}" if r.get('wall_s') is not None else 'falhou'
+            rss = f"{r['peak_rss_mb']:.0f}" if r.get('peak_rss_mb') is not None else '-'
+            print(f"| {r['size']} | {r['target']} | {r['run']} | {wall} | {r['github_calls']} | "
+                  f"{r['gitlab_calls']} | {r['bytes_in'] + r['bytes_out']} | {rss} |")
+
+    def run(self) -> bool:
+        for size in self.args.sizes:
+            for target in self.args.targets:
+                self.log(f"🏁 {target}: {size} issues, {int(size * self.args.pr_ratio)} PRs, "
+                         f"latência {self.args.latency_ms}ms")
+                self.run_scenario(size, target)
+        self.print_table()
+        if self.args.output:
+            with open(self.args.output, 'w') as f:
+                json.dump(self.results, f, indent=2)
+            self.log(f"💾 Resultados gravados em {self.args.output}")
+        return all(result.get('ok') for result in self.results)
+
+
+def run_worker(target: str, result_path: str):
+    """Processo filho: executa um syncer contra os servidores locais e grava as medições"""
+    import resource
+    from promata_sync.loader import load_script
+
+    started = time.perf_counter()
+    ok = True
+    try:
+        if target == 'issues':
+            load_script('sync-issues.py').GitHubIssuesSyncer().sync_issues()
+        elif target == 'prs':
+            load_script('sync-prs.py').GitHubPRSyncer().sync_pull_requests()
+        else:
+            ok = load_script('sync-complete.py').ProMataCompleteSyncer().run_complete_sync()
+    except Exception as e:
+        print(f"❌ Erro no benchmark de {target}: {str(e)}")
+        ok = False
+    wall = time.perf_counter() - started
+
+    # ru_maxrss em KB no Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    with open(result_path, 'w') as f:
+        json.dump({'ok': bool(ok), 'wall_s': wall, 'peak_rss_mb': peak_rss_mb}, f)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',') if item]
+
+
+def _target_list(value: str) -> List[str]:
+    targets = [item for item in value.split(',') if item]
+    invalid = [target for target in targets if target not in TARGETS]
+    if invalid:
+        raise argparse.ArgumentTypeError(f"alvos inválidos: {', '.join(invalid)}")
+    return targets
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) == 4 and sys.argv[1] == '_worker':
+        run_worker(sys.argv[2], sys.argv[3])
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark offline da sincronização GitHub → GitLab")
+    parser.add_argument('--sizes', type=_int_list, default=[1000], help="quantidades de issues (ex.: 1000,10000,50000)")
+    parser.add_argument('--targets', type=_target_list, default=list(TARGETS), help="issues,prs,complete")
+    parser.add_argument('--pr-ratio', type=float, default=0.25, help="PRs por issue")
+    parser.add_argument('--comment-ratio', type=float, default=0.5, help="comentários por issue")
+    parser.add_argument('--branches', type=int, default=100)
+    parser.add_argument('--labels', type=int, default=20)
+    parser.add_argument('--body-bytes', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="latência injetada por requisição")
+    parser.add_argument('--churn', type=float, default=0.01, help="fração alterada antes da execução em regime")
+    parser.add_argument('--output', help="arquivo JSON com os resultados")
+    parser.add_argument('--verbose', action='store_true', help="mostra a saída dos syncers")
+    args = parser.parse_args()
+
+    try:
+        success = SyncBenchmark(args).run()
+        if not success:
+            sys.exit(1)
+
+    except Exception as e:
+        print(f"❌ ERRO CRÍTICO no benchmark: {str(e)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+Módulos compartilhados pelos scripts de sincronização GitHub → GitLab AGES
+Para uso no projeto Pro-Mata PUCRS
+"""
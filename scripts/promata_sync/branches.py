@@ -0,0 +1,82 @@
+"""
+Índice de branches do projeto GitLab carregado uma única vez por execução
+"""
+
+import threading
+from typing import Iterable, List, Optional
+
+from promata_sync.gitlab_pagination import iter_gitlab
+
+HEADS_PREFIX = 'refs/heads/'
+
+
+class BranchIndex:
+    """Nomes de branches do GitLab com consulta O(1) e atualização incremental"""
+
+    def __init__(self, project):
+        self.project = project
+        self.loaded = False
+        self._names: List[str] = []
+        self._lookup = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Lista as branches do projeto (uma listagem lazy por execução, guardando apenas os nomes)"""
+        self._names = [branch['name'] for branch in iter_gitlab(self.project.branches)]
+        self._lookup = set(self._names)
+        self.loaded = True
+
+    def seed(self, refs: Iterable[str]):
+        """Preenche o índice a partir de refs já conhecidas (ex.: `git ls-remote`), sem chamada à API"""
+        with self._lock:
+            self._names = [ref[len(HEADS_PREFIX):] for ref in refs if ref.startswith(HEADS_PREFIX)]
+            self._lookup = set(self._names)
+            self.loaded = True
+
+    def ensure_loaded(self) -> bool:
+        """Carrega o índice se necessário (seguro entre threads); retorna True se listou agora"""
+        with self._lock:
+            if self.loaded:
+                return False
+            self.load()
+            return True
+
+    def refresh(self):
+        """Força nova listagem na próxima consulta"""
+        self.loaded = False
+
+    def add(self, name: str):
+        """Registra branch criada/enviada durante a execução"""
+        if name not in self._lookup:
+            self._lookup.add(name)
+            self._names.append(name)
+
+    def discard(self, name: str):
+        """Remove branch apagada durante a execução"""
+        if name in self._lookup:
+            self._lookup.discard(name)
+            self._names.remove(name)
+
+    def apply_ref_updates(self, updated_refs: Iterable[str], deleted_refs: Iterable[str] = ()):
+        """Aplica refs enviadas pelo espelhamento (apenas refs/heads/*)"""
+        for ref in updated_refs:
+            if ref.startswith(HEADS_PREFIX):
+                self.add(ref[len(HEADS_PREFIX):])
+        for ref in deleted_refs:
+            if ref.startswith(HEADS_PREFIX):
+                self.discard(ref[len(HEADS_PREFIX):])
+
+    def fallback(self, preferred: str = 'main') -> str:
+        """Branch padrão usada quando a branch do PR não existe no GitLab"""
+        if preferred in self._lookup:
+            return preferred
+        return self._names[0] if self._names else preferred
+
+    def names(self) -> List[str]:
+        return list(self._names)
+
+    def __contains__(self, name: Optional[str]) -> bool:
+        return name in self._lookup
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,86 @@
+"""
+Checkpoint de execução: cursor e fila durável de itens pendentes de uma fase
+Gravado após cada lote confirmado; `--resume` retoma exatamente do último lote
+A fila cresce à medida que as páginas chegam; `listed` indica que a listagem terminou
+"""
+
+import os
+import json
+from typing import Dict, Iterable, List, Optional
+
+from promata_sync.state import DATA_DIR
+
+ISSUES_CHECKPOINT_FILE = os.path.join(DATA_DIR, 'checkpoint-issues.json')
+PRS_CHECKPOINT_FILE = os.path.join(DATA_DIR, 'checkpoint-prs.json')
+
+# Itens por lote confirmado (mapeamentos + checkpoint gravados ao fim de cada lote)
+CHECKPOINT_BATCH_SIZE = max(1, int(os.environ.get('SYNC_CHECKPOINT_BATCH', '50')))
+
+
+class Checkpoint:
+    """Estado de uma fase interrompida: início da execução, watermarks usados, cursor e fila pendente"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run_started_at: Optional[str] = None
+        self.github_since: Optional[str] = None
+        self.gitlab_since: Optional[str] = None
+        self.cursor = 0
+        self.pending: List[int] = []
+        self.listed = False
+
+    def load(self) -> bool:
+        """Carrega o checkpoint existente; retorna False se não houver execução a retomar"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        self.run_started_at = data.get('run_started_at')
+        self.github_since = data.get('github_since')
+        self.gitlab_since = data.get('gitlab_since')
+        self.cursor = int(data.get('cursor', 0))
+        self.pending = [int(number) for number in data.get('pending', [])]
+        # Checkpoints sem o campo foram gravados com a fila completa
+        self.listed = bool(data.get('listed', True))
+        return self.run_started_at is not None
+
+    def begin(self, run_started_at: str, github_since: Optional[str], gitlab_since: Optional[str],
+              queue: Iterable[int] = (), listed: bool = False):
+        """Inicia uma nova execução; a fila pode começar vazia e crescer a cada lote confirmado"""
+        self.run_started_at = run_started_at
+        self.github_since = github_since
+        self.gitlab_since = gitlab_since
+        self.cursor = 0
+        self.pending = [int(number) for number in queue]
+        self.listed = listed
+        self.save()
+
+    def commit(self, processed: int, pending: Iterable[int]):
+        """Registra um lote confirmado: avança o cursor e regrava a fila restante"""
+        self.cursor += processed
+        self.pending = [int(number) for number in pending]
+        self.save()
+
+    def save(self):
+        """Grava o checkpoint de forma atômica (arquivo temporário + rename)"""
+        data: Dict = {
+            'run_started_at': self.run_started_at,
+            'github_since': self.github_since,
+            'gitlab_since': self.gitlab_since,
+            'cursor': self.cursor,
+            'pending': self.pending,
+            'listed': self.listed,
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Remove o checkpoint ao concluir a fase sem pendências"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.pending = []
+        self.cursor = 0
+        self.listed = False
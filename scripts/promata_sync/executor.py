@@ -0,0 +1,49 @@
+"""
+Executor de escritas concorrentes no GitLab com limite global e por host
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict
+
+WRITE_WORKERS = int(os.environ.get('SYNC_WRITE_WORKERS', '4'))
+WRITE_PER_HOST = int(os.environ.get('SYNC_WRITE_PER_HOST', '4'))
+
+
+class WriteExecutor:
+    """Pool de threads para escritas; cada tarefa executa todas as etapas de um item em ordem"""
+
+    def __init__(self, max_workers: int = WRITE_WORKERS, per_host_limit: int = WRITE_PER_HOST):
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='gitlab-write')
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def submit(self, host: str, fn: Callable, *args, **kwargs) -> Future:
+        """Agenda `fn` respeitando o limite de requisições simultâneas para `host`"""
+        slot = self._slot(host)
+
+        def run():
+            with slot:
+                return fn(*args, **kwargs)
+
+        return self._pool.submit(run)
+
+    def shutdown(self):
+        """Aguarda todas as escritas agendadas"""
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        return False
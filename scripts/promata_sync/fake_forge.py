@@ -0,0 +1,366 @@
+"""
+Servidor local que imita as APIs REST do GitHub e do GitLab usadas pela sincronização
+Dados sintéticos, latência injetável e contadores de chamadas/bytes para benchmarks offline
+"""
+
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+GITLAB_PREFIX = '/api/v4'
+BASE_TIMESTAMP = '2024-01-01T00:00:00Z'
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class FakeForge:
+    """Estado em memória de um repositório GitHub e do projeto GitLab correspondente"""
+
+    def __init__(self, repo: str = 'pro-mata/frontend', project_id: int = 7, issues: int = 1000,
+                 prs: int = 250, branches: int = 100, labels: int = 20, comments: int = 500,
+                 body_bytes: int = 200, seed: int = 42):
+        self.repo = repo
+        self.project_id = project_id
+        self.lock = threading.RLock()
+        self.calls: Counter = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        rng = random.Random(seed)
+        body = 'x' * body_bytes
+
+        self.gh_labels = [{'name': f'label-{i}', 'color': f'{rng.randrange(0x1000000):06x}', 'description': ''}
+                          for i in range(labels)]
+        self.branch_names = ['main'] + [f'feature/{i}' for i in range(1, branches)]
+        self.gh_issues = [self._github_item(number, f'Issue {number}', body, rng) for number in range(1, issues + 1)]
+        self.gh_prs = []
+        for k in range(prs):
+            number = issues + k + 1
+            pr = self._github_item(number, f'PR {number}', body, rng)
+            pr['merged_at'] = BASE_TIMESTAMP if pr['state'] == 'closed' and k % 2 else None
+            # Parte dos PRs usa branches inexistentes no GitLab (fallback para main)
+            pr['head'] = {'ref': self.branch_names[k % len(self.branch_names)] if k % 10 else f'missing/{k}'}
+            pr['base'] = {'ref': 'main'}
+            self.gh_prs.append(pr)
+        numbers = [item['number'] for item in self.gh_issues + self.gh_prs]
+        self.gh_comments = []
+        for k in range(comments if numbers else 0):
+            number = numbers[k % len(numbers)]
+            self.gh_comments.append({
+                'id': 100000 + k,
+                'issue_url': f'https://api.github.com/repos/{repo}/issues/{number}',
+                'html_url': f'https://github.com/{repo}/issues/{number}#issuecomment-{100000 + k}',
+                'body': f'Comentário {k}',
+                'user': {'login': 'dev'},
+                'created_at': BASE_TIMESTAMP,
+                'updated_at': BASE_TIMESTAMP,
+            })
+
+        self.gl_issues: List[Dict] = []
+        self.gl_mrs: List[Dict] = []
+        self.gl_labels: List[Dict] = []
+        self.gl_notes: Dict[Tuple[str, int], List[Dict]] = {}
+        self._next_note_id = 1
+
+    def _github_item(self, number: int, title: str, body: str, rng: random.Random) -> Dict:
+        labels = rng.sample(self.gh_labels, k=min(len(self.gh_labels), rng.randint(0, 3)))
+        return {
+            'number': number,
+            'title': title,
+            'body': body,
+            'state': 'closed' if number % 3 == 0 else 'open',
+            'html_url': f'https://github.com/{self.repo}/issues/{number}',
+            'user': {'login': 'dev'},
+            'created_at': BASE_TIMESTAMP,
+            'updated_at': BASE_TIMESTAMP,
+            'labels': labels,
+        }
+
+    def churn(self, fraction: float, seed: int = 7) -> int:
+        """Altera uma fração das issues/PRs e comentários (execução em regime)"""
+        rng = random.Random(seed)
+        now = _now_iso()
+        changed = 0
+        with self.lock:
+            for collection in (self.gh_issues, self.gh_prs, self.gh_comments):
+                for item in rng.sample(collection, k=int(len(collection) * fraction)):
+                    if 'title' in item:
+                        item['title'] = f"{item['title']} (editado)"
+                    else:
+                        item['body'] = f"{item['body']} (editado)"
+                    item['updated_at'] = now
+                    changed += 1
+        return changed
+
+    def reset_counters(self):
+        with self.lock:
+            self.calls.clear()
+            self.bytes_in = 0
+            self.bytes_out = 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'github_calls': sum(n for (service, _), n in self.calls.items() if service == 'github'),
+                'gitlab_calls': sum(n for (service, _), n in self.calls.items() if service == 'gitlab'),
+                'calls_by_method': {f'{service} {method}': n for (service, method), n in sorted(self.calls.items())},
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+            }
+
+    # --- GitLab -----------------------------------------------------------
+
+    def gitlab_item(self, collection: List[Dict], data: Dict, kind: str) -> Dict:
+        iid = len(collection) + 1
+        labels = data.get('labels') or []
+        item = {
+            'id': self.project_id * 100000 + iid,
+            'iid': iid,
+            'project_id': self.project_id,
+            'title': data.get('title'),
+            'description': data.get('description'),
+            'state': 'opened',
+            'labels': labels.split(',') if isinstance(labels, str) else labels,
+            'updated_at': _now_iso(),
+            'web_url': f'http://gitlab.local/{self.repo}/-/{kind}/{iid}',
+        }
+        if kind == 'merge_requests':
+            item['source_branch'] = data.get('source_branch')
+            item['target_branch'] = data.get('target_branch')
+        collection.append(item)
+        return item
+
+    def gitlab_update(self, item: Dict, data: Dict):
+        event = data.pop('state_event', None)
+        if event == 'close':
+            item['state'] = 'closed'
+        elif event == 'reopen':
+            item['state'] = 'opened'
+        for field in ('title', 'description', 'labels'):
+            if field in data:
+                value = data[field]
+                item[field] = (value.split(',') if value else []) if isinstance(value, str) else value
+        item['updated_at'] = _now_iso()
+
+    def gitlab_note(self, key: Tuple[str, int], body: str) -> Dict:
+        note = {'id': self._next_note_id, 'body': body}
+        self._next_note_id += 1
+        self.gl_notes.setdefault(key, []).append(note)
+        return note
+
+
+class _Handler(BaseHTTPRequestHandler):
+    forge: FakeForge = None
+    latency: float = 0.0
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body=None, headers: Optional[Dict] = None):
+        data = b'' if body is None else json.dumps(body).encode()
+        headers = dict(headers or {})
+        if self.service == 'github' and self.command == 'GET' and status == 200:
+            etag = f'"{hashlib.sha1(data).hexdigest()}"'
+            headers['ETag'] = etag
+            if self.headers.get('If-None-Match') == etag:
+                status, data = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        with self.forge.lock:
+            self.forge.bytes_out += len(data)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        with self.forge.lock:
+            self.forge.bytes_in += len(raw)
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+
+    def _page(self, items: List, query: Dict, path: str) -> Tuple[List, Dict]:
+        per_page = int(query.get('per_page', ['20'])[0])
+        page = int(query.get('page', ['1'])[0])
+        last = max(1, (len(items) + per_page - 1) // per_page)
+        base = f'http://{self.headers["Host"]}{path}?'
+        kept = {key: values[0] for key, values in query.items() if key != 'page'}
+        base += ''.join(f'{key}={value}&' for key, value in kept.items())
+        links = []
+        if page < last:
+            links.append(f'<{base}page={page + 1}>; rel="next"')
+        links.append(f'<{base}page={last}>; rel="last"')
+        headers = {'Link': ', '.join(links), 'X-Page': str(page), 'X-Per-Page': str(per_page),
+                   'X-Total': str(len(items)), 'X-Total-Pages': str(last)}
+        if page < last:
+            headers['X-Next-Page'] = str(page + 1)
+        return items[(page - 1) * per_page:page * per_page], headers
+
+    def _route(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+        self.service = 'gitlab' if path.startswith(GITLAB_PREFIX) else 'github'
+        forge = self.forge
+        with forge.lock:
+            forge.calls[(self.service, self.command)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        body = self._body() if self.command in ('POST', 'PUT') else {}
+        with forge.lock:
+            if self.service == 'github':
+                return self._github(path, query, body)
+            return self._gitlab(path[len(GITLAB_PREFIX):], query, body)
+
+    def _graphql(self, body: Dict):
+        # Apenas a consulta de contagens dos relatórios (totalCount), respondida em uma página
+        forge = self.forge
+        if 'totalCount' not in body.get('query', ''):
+            return self._send(200, {'errors': [{'message': 'Consulta não suportada pelo servidor local'}]})
+        def total(items, state):
+            return {'totalCount': sum(1 for item in items if item['state'] == state)}
+        merged = sum(1 for pr in forge.gh_prs if pr['merged_at'])
+        labels = Counter(label['name'] for issue in forge.gh_issues for label in issue['labels'])
+        heads = Counter(pr['head']['ref'] for pr in forge.gh_prs)
+        last_page = {'hasNextPage': False, 'endCursor': None}
+        repository = {
+            'openIssues': total(forge.gh_issues, 'open'),
+            'closedIssues': total(forge.gh_issues, 'closed'),
+            'openPullRequests': total(forge.gh_prs, 'open'),
+            'closedPullRequests': {'totalCount': total(forge.gh_prs, 'closed')['totalCount'] - merged},
+            'mergedPullRequests': {'totalCount': merged},
+            'labels': {'pageInfo': last_page, 'nodes': [{'name': label['name'], 'issues': {'totalCount': labels[label['name']]}}
+                                                        for label in forge.gh_labels]},
+            'refs': {'pageInfo': last_page, 'nodes': [{'name': name, 'associatedPullRequests': {'totalCount': heads[name]}}
+                                                      for name in forge.branch_names]},
+        }
+        return self._send(200, {'data': {'repository': repository}})
+
+    def _github(self, path: str, query: Dict, body: Dict):
+        forge = self.forge
+        if path == '/graphql':
+            return self._graphql(body)
+        prefix = f'/repos/{forge.repo}'
+        if path == prefix:
+            return self._send(200, {'full_name': forge.repo, 'language': 'TypeScript', 'size': 1,
+                                    'default_branch': 'main', 'updated_at': BASE_TIMESTAMP})
+        since = query.get('since', [None])[0]
+        if path == f'{prefix}/issues':
+            items = forge.gh_issues + [dict(pr, pull_request={}) for pr in forge.gh_prs]
+            if query.get('state', ['open'])[0] != 'all':
+                items = [item for item in items if item['state'] == query['state'][0]]
+        elif path == f'{prefix}/pulls':
+            items = list(forge.gh_prs)
+            if query.get('sort', [''])[0] == 'updated':
+                items.sort(key=lambda item: item['updated_at'], reverse=query.get('direction', ['desc'])[0] == 'desc')
+        elif path == f'{prefix}/issues/comments':
+            items = forge.gh_comments
+        else:
+            return self._send(404, {'message': 'Not Found'})
+        if since:
+            items = [item for item in items if item['updated_at'] >= since]
+        data, headers = self._page(items, query, path)
+        return self._send(200, data, headers)
+
+    def _gitlab(self, path: str, query: Dict, body: Dict):
+        forge = self.forge
+        if path == '/user':
+            return self._send(200, {'id': 1, 'username': 'bench'})
+        match = re.match(r'/projects/(\d+)(/.*)?$', path)
+        if not match or int(match.group(1)) != forge.project_id:
+            return self._send(404, {'message': '404 Not found'})
+        sub = match.group(2) or ''
+        if sub == '':
+            name = forge.repo.split('/')[-1]
+            return self._send(200, {'id': forge.project_id, 'name': name, 'path': name,
+                                    'path_with_namespace': f'pro-mata/{name}',
+                                    'web_url': f'http://gitlab.local/pro-mata/{name}'})
+        if sub == '/repository/branches':
+            data, headers = self._page([{'name': name} for name in forge.branch_names], query, GITLAB_PREFIX + path)
+            return self._send(200, data, headers)
+        if sub == '/labels':
+            if self.command == 'GET':
+                data, headers = self._page(forge.gl_labels, query, GITLAB_PREFIX + path)
+                return self._send(200, data, headers)
+            if any(label['name'] == body.get('name') for label in forge.gl_labels):
+                return self._send(409, {'message': 'Label already exists'})
+            label = {'id': len(forge.gl_labels) + 1, 'name': body.get('name'), 'color': body.get('color')}
+            forge.gl_labels.append(label)
+            return self._send(201, label)
+        if sub == '/issues_statistics':
+            counts = Counter(issue['state'] for issue in forge.gl_issues)
+            return self._send(200, {'statistics': {'counts': {'all': len(forge.gl_issues), 'opened': counts['opened'],
+                                                              'closed': counts['closed']}}})
+        for kind, collection in (('issues', forge.gl_issues), ('merge_requests', forge.gl_mrs)):
+            if sub == f'/{kind}':
+                if self.command == 'POST':
+                    return self._send(201, forge.gitlab_item(collection, body, kind))
+                items = collection
+                updated_after = query.get('updated_after', [None])[0]
+                if updated_after:
+                    items = [item for item in items if item['updated_at'] >= updated_after]
+                state = query.get('state', ['all'])[0]
+                if state != 'all':
+                    items = [item for item in items if item['state'] == state]
+                data, headers = self._page(items, query, GITLAB_PREFIX + path)
+                return self._send(200, data, headers)
+            item_match = re.match(rf'/{kind}/(\d+)(/notes)?(?:/(\d+))?$', sub)
+            if not item_match:
+                continue
+            iid = int(item_match.group(1))
+            item = collection[iid - 1] if 0 < iid <= len(collection) else None
+            if item is None:
+                return self._send(404, {'message': '404 Not found'})
+            if item_match.group(2):
+                key = (kind, iid)
+                if item_match.group(3):
+                    note_id = int(item_match.group(3))
+                    note = next((n for n in forge.gl_notes.get(key, []) if n['id'] == note_id), None)
+                    if note is None:
+                        return self._send(404, {'message': '404 Not found'})
+                    note['body'] = body.get('body', note['body'])
+                    return self._send(200, note)
+                if self.command == 'POST':
+                    return self._send(201, forge.gitlab_note(key, body.get('body')))
+                data, headers = self._page(forge.gl_notes.get(key, []), query, GITLAB_PREFIX + path)
+                return self._send(200, data, headers)
+            if self.command == 'PUT':
+                forge.gitlab_update(item, body)
+            return self._send(200, item)
+        return self._send(404, {'message': '404 Not found'})
+
+    def do_GET(self):
+        self._route()
+
+    def do_POST(self):
+        self._route()
+
+    def do_PUT(self):
+        self._route()
+
+
+def start_fake_forge(forge: FakeForge, latency: float = 0.0,
+                     host: str = '127.0.0.1', port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Inicia o servidor em uma thread daemon e retorna (servidor, URL base)"""
+    handler = type('FakeForgeHandler', (_Handler,), {'forge': forge, 'latency': latency})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
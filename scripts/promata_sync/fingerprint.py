@@ -0,0 +1,18 @@
+"""
+Impressão digital do conteúdo sincronizado de issues, PRs e comentários do GitHub
+"""
+
+import json
+import hashlib
+from typing import Iterable
+
+
+def content_fingerprint(title: str, body: str, labels: Iterable[str], state: str) -> str:
+    """Hash estável de título, corpo, labels (sem ordem) e estado"""
+    payload = json.dumps([title, body or '', sorted(labels), state], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def text_fingerprint(text: str) -> str:
+    """Hash estável de um texto já renderizado (ex.: corpo de nota do GitLab)"""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
@@ -0,0 +1,148 @@
+"""
+Backend GraphQL opcional para buscar issues e PRs do GitHub em lote
+Os nós são convertidos nos mesmos registros compactos usados pelo backend REST
+"""
+
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+from promata_sync.http_client import GITHUB_API_URL
+from promata_sync.models import GitHubIssue, GitHubPullRequest
+from promata_sync.snapshot import ItemCounts
+
+GITHUB_GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', f"{GITHUB_API_URL}/graphql")
+
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $since: DateTime) {
+  repository(owner: $owner, name: $name) {
+    issues(first: 100, after: $cursor, filterBy: {since: $since},
+           orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body state url createdAt updatedAt
+        author { login }
+        labels(first: 50) { nodes { name color } }
+      }
+    }
+  }
+}
+"""
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: 100, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body state url createdAt updatedAt
+        merged mergedAt mergeable headRefName baseRefName
+        author { login }
+        labels(first: 50) { nodes { name color } }
+      }
+    }
+  }
+}
+"""
+
+COUNTS_QUERY = """
+query($owner: String!, $name: String!, $labelCursor: String, $refCursor: String) {
+  repository(owner: $owner, name: $name) {
+    openIssues: issues(states: OPEN) { totalCount }
+    closedIssues: issues(states: CLOSED) { totalCount }
+    openPullRequests: pullRequests(states: OPEN) { totalCount }
+    closedPullRequests: pullRequests(states: CLOSED) { totalCount }
+    mergedPullRequests: pullRequests(states: MERGED) { totalCount }
+    labels(first: 100, after: $labelCursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name issues { totalCount } }
+    }
+    refs(refPrefix: "refs/heads/", first: 100, after: $refCursor) {
+      pageInfo { hasNextPage endCursor }
+      nodes { name associatedPullRequests { totalCount } }
+    }
+  }
+}
+"""
+
+def graphql_backend_enabled() -> bool:
+    """GITHUB_BACKEND=graphql ativa o backend GraphQL (padrão: REST)"""
+    return os.environ.get('GITHUB_BACKEND', 'rest').lower() == 'graphql'
+
+
+class GitHubGraphQLFetcher:
+    """Busca issues e PRs via consultas GraphQL paginadas por cursor"""
+
+    def __init__(self, session: requests.Session, headers: Dict, repo_name: str):
+        self.session = session
+        self.headers = {'Authorization': headers['Authorization']}
+        self.owner, self.name = repo_name.split('/', 1)
+
+    def _query(self, query: str, variables: Dict) -> Dict:
+        response = self.session.post(GITHUB_GRAPHQL_URL, headers=self.headers,
+                                     json={'query': query, 'variables': variables})
+        response.raise_for_status()
+        payload = response.json()
+        if payload.get('errors'):
+            raise RuntimeError(f"GraphQL: {payload['errors'][0].get('message')}")
+        return payload['data']['repository']
+
+    def _iter_pages(self, query: str, connection: str, variables: Dict) -> Iterator[List[Dict]]:
+        cursor = None
+        while True:
+            data = self._query(query, {**variables, 'owner': self.owner, 'name': self.name, 'cursor': cursor})
+            page = data[connection]
+            yield page['nodes']
+            if not page['pageInfo']['hasNextPage']:
+                break
+            cursor = page['pageInfo']['endCursor']
+
+    def iter_issue_pages(self, since: Optional[str] = None) -> Iterator[List[GitHubIssue]]:
+        """Páginas de issues (sem PRs) alteradas após `since`, ou todas, à medida que chegam"""
+        for nodes in self._iter_pages(ISSUES_QUERY, 'issues', {'since': since}):
+            yield [GitHubIssue.from_graphql(node) for node in nodes]
+
+    def iter_pr_pages(self, since: Optional[str] = None) -> Iterator[List[GitHubPullRequest]]:
+        """Páginas de PRs alterados após `since`, ou todos; a ordenação por atualização permite parar no watermark"""
+        for nodes in self._iter_pages(PULL_REQUESTS_QUERY, 'pullRequests', {}):
+            recent = [node for node in nodes if not since or node['updatedAt'] >= since]
+            if recent:
+                yield [GitHubPullRequest.from_graphql(node) for node in recent]
+            if len(recent) < len(nodes):
+                break
+
+    def fetch_issues(self, since: Optional[str] = None) -> List[GitHubIssue]:
+        """Issues (sem PRs) alteradas após `since`, ou todas"""
+        return [issue for page in self.iter_issue_pages(since) for issue in page]
+
+    def fetch_prs(self, since: Optional[str] = None) -> List[GitHubPullRequest]:
+        """PRs alterados após `since`, ou todos"""
+        return [pr for page in self.iter_pr_pages(since) for pr in page]
+
+    def fetch_counts(self) -> Tuple[ItemCounts, ItemCounts]:
+        """Contagens de issues e PRs (por estado, label e branch de origem) sem listar os itens"""
+        issues, prs = ItemCounts(), ItemCounts()
+        cursors = {'labelCursor': None, 'refCursor': None}
+        pending = {'labels': 'labelCursor', 'refs': 'refCursor'}
+        while pending:
+            data = self._query(COUNTS_QUERY, {'owner': self.owner, 'name': self.name, **cursors})
+            issues.states['open'] = data['openIssues']['totalCount']
+            issues.states['closed'] = data['closedIssues']['totalCount']
+            # No GitHub um PR merged também está fechado
+            prs.merged = data['mergedPullRequests']['totalCount']
+            prs.states['open'] = data['openPullRequests']['totalCount']
+            prs.states['closed'] = data['closedPullRequests']['totalCount'] + prs.merged
+            # Labels e branches paginam em paralelo; conexões já esgotadas são ignoradas
+            for connection, cursor in list(pending.items()):
+                page = data[connection]
+                for node in page['nodes']:
+                    if connection == 'labels':
+                        issues.labels[node['name']] = node['issues']['totalCount']
+                    else:
+                        prs.branches[node['name']] = node['associatedPullRequests']['totalCount']
+                if page['pageInfo']['hasNextPage']:
+                    cursors[cursor] = page['pageInfo']['endCursor']
+                else:
+                    del pending[connection]
+        return issues, prs
@@ -0,0 +1,88 @@
+"""
+Listagens do GitLab com iteração lazy (python-gitlab http_list com iterator=True)
+Os itens são entregues como JSON cru, sem RESTObjects, para conversão direta em registros compactos
+Pede paginação keyset; endpoints sem suporte ignoram o parâmetro e seguem o cabeçalho Link de
+offset, e servidores que recusam os parâmetros (400/405) recebem a listagem offset tradicional
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from gitlab.exceptions import GitlabHttpError
+
+from promata_sync.models import github_id_marker
+
+GITLAB_PER_PAGE = 100
+KEYSET_PARAMS = {'pagination': 'keyset'}
+# Respostas da primeira página que indicam recusa da paginação keyset
+KEYSET_REJECTED = (400, 405)
+
+
+def iter_gitlab(manager, **filters) -> Iterator[Dict]:
+    """Itera o JSON dos itens listados por `manager` página a página, sem carregar a listagem inteira"""
+    params = {'per_page': GITLAB_PER_PAGE, **filters}
+    try:
+        # A primeira página é buscada na chamada: uma recusa acontece antes de qualquer item
+        pages = manager.gitlab.http_list(manager.path, iterator=True, **params, **KEYSET_PARAMS)
+    except GitlabHttpError as e:
+        if e.response_code not in KEYSET_REJECTED:
+            raise
+        pages = manager.gitlab.http_list(manager.path, iterator=True, **params)
+    yield from pages
+
+
+def gitlab_total(manager, **filters) -> int:
+    """Total de itens da listagem pelo cabeçalho X-Total (uma página de um item, sem listar)"""
+    pages = manager.gitlab.http_list(manager.path, iterator=True, per_page=1, **filters)
+    if pages.total is None:
+        # O GitLab omite X-Total em listagens muito grandes: sem ele não há contagem barata
+        raise RuntimeError(f"GitLab não informou X-Total para {manager.path}")
+    return pages.total
+
+
+class GitLabIndex:
+    """Registros de issues ou MRs do GitLab indexados durante a iteração (sem lista intermediária)
+
+    `by_github` é o índice reverso número GitHub → registro, montado a partir do marcador que o sync
+    grava nas descrições; reconstrói os mapeamentos sem chamadas extras quando o JSON se perde.
+    Só itens sem marcador entram em `by_title` (casamento por título é apenas o último recurso).
+    """
+
+    def __init__(self, items: Iterable = ()):
+        self.by_title: Dict[str, object] = {}
+        self.by_iid: Dict[int, object] = {}
+        self.by_github: Dict[int, object] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        self.by_iid[item.iid] = item
+        if item.github_number is None:
+            self.by_title[item.title] = item
+            return
+        # Duplicatas de execuções anteriores: o item mais antigo (menor iid) é o canônico
+        current = self.by_github.get(item.github_number)
+        if current is None or item.iid < current.iid:
+            self.by_github[item.github_number] = item
+
+    def items(self) -> List:
+        """Objetos indexados na ordem da listagem"""
+        return list(self.by_iid.values())
+
+    def __len__(self) -> int:
+        return len(self.by_iid)
+
+
+def find_synced_item(manager, github_number: int, title: str, convert: Callable[[Dict], object],
+                     **filters) -> Optional[object]:
+    """Busca pontual (sem listar o projeto) do item do GitLab de um número do GitHub
+
+    Procura o marcador do GitHub nas descrições e, sem resultado, um item sem marcador com o mesmo
+    título. A busca do GitLab é por substring (#12 também encontra #123): os resultados passam pelo
+    GitLabIndex, que confere o número e o título exatos.
+    """
+    marked = GitLabIndex(convert(item) for item in iter_gitlab(
+        manager, search=github_id_marker(github_number), **{'in': 'description'}, **filters))
+    if github_number in marked.by_github:
+        return marked.by_github[github_number]
+    titled = GitLabIndex(convert(item) for item in iter_gitlab(manager, search=title, **{'in': 'title'}, **filters))
+    return titled.by_title.get(title)
@@ -0,0 +1,174 @@
+"""
+Cache em disco para requisições condicionais à API do GitHub
+Respostas 304 (If-None-Match / If-Modified-Since) não consomem o rate limit primário
+"""
+
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from promata_sync.http_client import get_session
+
+CACHE_DIR = os.environ.get('SYNC_HTTP_CACHE_DIR', '.github/data/http-cache')
+MAX_BYTES = int(float(os.environ.get('SYNC_HTTP_CACHE_MAX_MB', '50')) * 1024 * 1024)
+MAX_ENTRIES = int(os.environ.get('SYNC_HTTP_CACHE_MAX_ENTRIES', '2000'))
+
+# Cabeçalhos da resposta original preservados no cache (paginação)
+KEPT_HEADERS = ('Link', 'Content-Type')
+
+_cache: Optional['ConditionalCache'] = None
+
+
+class CachedResponse:
+    """Resposta servida do cache após um 304 (interface mínima de requests.Response)"""
+
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, url: str, body: str, headers: Dict[str, str]):
+        self.url = url
+        self.text = body
+        self.headers = CaseInsensitiveDict(headers)
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        return None
+
+
+class ConditionalCache:
+    """Cache de respostas GET indexado por URL + parâmetros, com despejo LRU por tamanho"""
+
+    def __init__(self, session: requests.Session, directory: str = CACHE_DIR,
+                 max_bytes: int = MAX_BYTES, max_entries: int = MAX_ENTRIES):
+        self.session = session
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        # Tamanho de cada entrada em disco (chave → bytes)
+        self._sizes: Dict[str, int] = {
+            name[:-5]: os.path.getsize(os.path.join(self.directory, name))
+            for name in os.listdir(self.directory) if name.endswith('.json')
+        }
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict] = None) -> str:
+        """Chave estável para URL + parâmetros (ordem dos parâmetros irrelevante)"""
+        items = sorted((str(k), str(v)) for k, v in (params or {}).items())
+        return hashlib.sha256(json.dumps([url, items]).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read(self, key: str) -> Optional[Dict]:
+        # Leitura, descarte e escrita sob o mesmo lock: as páginas buscadas em paralelo não podem
+        # ler um arquivo sendo substituído nem descartar uma entrada recém-gravada
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                self._discard(key)
+                return None
+
+    def _write(self, key: str, entry: Dict):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self._sizes[key] = os.path.getsize(path)
+            self._evict()
+
+    def _touch(self, key: str):
+        """Marca a entrada como usada agora (ordem do despejo LRU)"""
+        with self._lock:
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+
+    def _discard(self, key: str):
+        """Remove a entrada (chamado com o lock adquirido)"""
+        self._sizes.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove as entradas menos usadas até respeitar os limites"""
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes and len(self._sizes) <= self.max_entries:
+            return
+        by_age = sorted(self._sizes, key=self._mtime)
+        for key in by_age:
+            if total <= self.max_bytes and len(self._sizes) <= self.max_entries:
+                break
+            total -= self._sizes[key]
+            self._discard(key)
+
+    def _mtime(self, key: str) -> float:
+        try:
+            return os.path.getmtime(self._path(key))
+        except OSError:
+            return 0.0
+
+    def get(self, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None):
+        """GET condicional: 304 é servido do cache, 200 atualiza o cache"""
+        key = self.cache_key(url, params)
+        entry = self._read(key)
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get('etag'):
+                request_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.session.get(url, headers=request_headers, params=params)
+
+        if response.status_code == 304 and entry:
+            self.hits += 1
+            self._touch(key)
+            return CachedResponse(url, entry['body'], entry['headers'])
+
+        self.misses += 1
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code == 200 and (etag or last_modified):
+            self._write(key, {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+                'body': response.text,
+            })
+        return response
+
+
+def get_github_cache() -> ConditionalCache:
+    """Cache compartilhado do processo sobre a Session pooled"""
+    global _cache
+    if _cache is None:
+        _cache = ConditionalCache(get_session())
+    return _cache
+
+
+def reset_github_cache() -> ConditionalCache:
+    """Reabre o cache no diretório de trabalho atual (workers que trocam de repositório)"""
+    global _cache
+    _cache = ConditionalCache(get_session())
+    return _cache
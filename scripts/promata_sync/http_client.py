@@ -0,0 +1,128 @@
+"""
+Camada HTTP compartilhada pelos syncers (GitHub REST e python-gitlab)
+Uma única Session keep-alive com pool de conexões, gzip, timeout, retries e rate limit
+"""
+
+import os
+import time
+import requests
+import gitlab
+from requests.adapters import HTTPAdapter
+from typing import Optional
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
+
+from promata_sync.log import log
+from promata_sync.metrics import get_metrics
+from promata_sync.ratelimit import RateLimitScheduler, get_scheduler
+
+GITHUB_API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+
+DEFAULT_TIMEOUT = float(os.environ.get('SYNC_HTTP_TIMEOUT', '30'))
+POOL_CONNECTIONS = int(os.environ.get('SYNC_HTTP_POOL_CONNECTIONS', '4'))
+POOL_MAXSIZE = int(os.environ.get('SYNC_HTTP_POOL_MAXSIZE', '16'))
+MAX_RETRIES = int(os.environ.get('SYNC_HTTP_RETRIES', '3'))
+
+# POST fica de fora para não duplicar issues/MRs criados. 429/403 de rate limit são repetidos
+# apenas pelo agendador (PooledSession.request): urllib3 ignora Retry-After e python-gitlab
+# não repete por conta própria
+RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+
+
+def _body_size(response: requests.Response, stream: bool) -> int:
+    """Bytes do corpo recebido (respostas em streaming não são consumidas aqui)"""
+    if stream:
+        return int(response.headers.get('Content-Length') or 0)
+    return len(response.content or b'')
+
+
+def _adapter_retries(response: requests.Response) -> int:
+    """Retentativas feitas pelo urllib3 (5xx/conexão) antes desta resposta"""
+    retries = getattr(response.raw, 'retries', None)
+    return len(retries.history) if retries is not None else 0
+
+
+class PooledSession(requests.Session):
+    """Session com timeout padrão e passagem obrigatória pelo agendador de rate limit"""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, scheduler: Optional[RateLimitScheduler] = None):
+        super().__init__()
+        self.timeout = timeout
+        self.scheduler = scheduler or get_scheduler()
+
+    def request(self, method, url, **kwargs):
+        # python-gitlab envia timeout=None explicitamente quando não configurado
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        host = urlparse(url).netloc
+        metrics = get_metrics()
+        attempt = 0
+        while True:
+            self.scheduler.before_request(host)
+            started = time.monotonic()
+            try:
+                response = super().request(method, url, **kwargs)
+            except requests.RequestException:
+                metrics.record_http(method, url, None, started, time.monotonic() - started, retries=attempt)
+                raise
+            metrics.record_http(method, url, response.status_code, started, time.monotonic() - started,
+                                bytes_in=_body_size(response, kwargs.get('stream', False)), bytes_out=len(response.request.body or b''),
+                                retries=attempt + _adapter_retries(response))
+            self.scheduler.after_response(host, response)
+            delay = self.scheduler.retry_delay(response, attempt)
+            if delay is None:
+                return response
+            log(f"⚠️ Rate limit em {method} {host} (HTTP {response.status_code}): nova tentativa em {delay:.1f}s", "WARN")
+            time.sleep(delay)
+            attempt += 1
+
+
+def build_session(timeout: float = DEFAULT_TIMEOUT, scheduler: Optional[RateLimitScheduler] = None) -> requests.Session:
+    """Cria uma Session keep-alive com pool, política de retry e agendador de rate limit"""
+    session = PooledSession(timeout=timeout, scheduler=scheduler)
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=False,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+
+def get_session() -> requests.Session:
+    """Session compartilhada do processo (criada sob demanda)"""
+    global _session
+    if _session is None:
+        _session = build_session()
+    return _session
+
+
+class ScheduledGitlab(gitlab.Gitlab):
+    """Cliente python-gitlab sem o retry próprio de 429 (obey_rate_limit): o agendador já repete"""
+
+    def http_request(self, *args, **kwargs):
+        kwargs['obey_rate_limit'] = False
+        return super().http_request(*args, **kwargs)
+
+
+def build_gitlab_client(url: str, private_token: str) -> gitlab.Gitlab:
+    """Cliente python-gitlab reutilizando a Session compartilhada"""
+    return ScheduledGitlab(
+        url,
+        private_token=private_token,
+        timeout=DEFAULT_TIMEOUT,
+        session=get_session(),
+    )
@@ -0,0 +1,115 @@
+"""
+Provisionamento de labels no GitLab por diferença, com índice de labels do projeto em cache
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from promata_sync.gitlab_pagination import iter_gitlab
+
+SYNC_LABEL = 'github-sync'
+SYNC_LABEL_SPEC = {'name': SYNC_LABEL, 'color': '#24292f', 'description': 'Sincronizado do GitHub'}
+
+# Labels padrão do projeto (seguindo padrão CP-Planta)
+DEFAULT_LABELS = [
+    {'name': 'bug', 'color': '#d73a4a', 'description': 'Erro ou problema no sistema'},
+    {'name': 'enhancement', 'color': '#a2eeef', 'description': 'Nova funcionalidade ou melhoria'},
+    {'name': 'documentation', 'color': '#0075ca', 'description': 'Relacionado à documentação'},
+    {'name': 'IMPORTANTE', 'color': '#b60205', 'description': 'Alta prioridade'},
+    {'name': 'Débito Técnico', 'color': '#fbca04', 'description': 'Débito técnico'},
+    {'name': 'frontend', 'color': '#7057ff', 'description': 'Frontend React'},
+    {'name': 'backend', 'color': '#ff6b00', 'description': 'Backend Spring Boot'},
+    {'name': 'infraestrutura', 'color': '#006b75', 'description': 'Infraestrutura e DevOps'},
+    {'name': 'Finalizada', 'color': '#0e8a16', 'description': 'Tarefa finalizada'},
+    {'name': 'Integração', 'color': '#1d76db', 'description': 'Integração entre sistemas'},
+    SYNC_LABEL_SPEC,
+]
+
+DEFAULT_COLOR = '#ededed'
+
+
+def label_spec(name: str, color: Optional[str] = None, description: Optional[str] = None) -> Dict:
+    """Dados de criação de uma label no GitLab (cor com '#', padrão se ausente)"""
+    color = color or DEFAULT_COLOR
+    return {
+        'name': name,
+        'color': color if color.startswith('#') else f"#{color}",
+        'description': description or '',
+    }
+
+
+def label_from_github(label: Dict) -> Dict:
+    """Converte uma label da API do GitHub para os dados de criação no GitLab"""
+    return label_spec(label['name'], label.get('color'), label.get('description'))
+
+
+def labels_from_items(items: Iterable) -> List[Dict]:
+    """Labels distintas (pelo nome) usadas em issues/PRs do GitHub (registros de promata_sync.models)"""
+    seen = {}
+    for item in items:
+        for label in item.labels:
+            if label.name not in seen:
+                seen[label.name] = label_spec(label.name, label.color, label.description)
+    return list(seen.values())
+
+
+class LabelIndex:
+    """Labels existentes no projeto GitLab, listadas uma única vez por execução"""
+
+    def __init__(self, project):
+        self.project = project
+        self.loaded = False
+        self._names = set()
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self) -> bool:
+        """Lista as labels do projeto se necessário; retorna True se listou agora"""
+        with self._lock:
+            if self.loaded:
+                return False
+            # JSON cru página a página: apenas os nomes ficam em memória
+            self._names = {label['name'] for label in iter_gitlab(self.project.labels)}
+            self.loaded = True
+            return True
+
+    def missing(self, wanted: Iterable[Dict]) -> List[Dict]:
+        """Labels desejadas que ainda não existem no GitLab"""
+        self.ensure_loaded()
+        result, seen = [], set()
+        for label in wanted:
+            if label['name'] not in self._names and label['name'] not in seen:
+                seen.add(label['name'])
+                result.append(label)
+        return result
+
+    def ensure(self, wanted: Iterable[Dict]) -> List[str]:
+        """Cria apenas as labels ausentes e retorna os nomes criados"""
+        created = []
+        for label in self.missing(wanted):
+            self.project.labels.create(label)
+            with self._lock:
+                self._names.add(label['name'])
+            created.append(label['name'])
+        return created
+
+    def update(self, old_name: str, label: Dict) -> bool:
+        """Renomeia/atualiza uma label existente; cria se ainda não existir. Retorna True se alterou"""
+        self.ensure_loaded()
+        if old_name not in self._names:
+            return bool(self.ensure([label]))
+        gitlab_label = self.project.labels.get(old_name)
+        if label['name'] != old_name:
+            gitlab_label.new_name = label['name']
+        gitlab_label.color = label['color']
+        gitlab_label.description = label['description']
+        gitlab_label.save()
+        with self._lock:
+            self._names.discard(old_name)
+            self._names.add(label['name'])
+        return True
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
@@ -0,0 +1,22 @@
+"""
+Carregamento em processo dos scripts de sincronização (nomes com hífen não são importáveis)
+"""
+
+import os
+import sys
+import importlib.util
+from types import ModuleType
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_script(filename: str) -> ModuleType:
+    """Importa scripts/<filename> uma única vez por processo"""
+    module_name = os.path.splitext(filename)[0].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,11 @@
+"""
+Log com timestamp no mesmo formato dos scripts de sincronização
+"""
+
+from datetime import datetime
+
+
+def log(message: str, level: str = "INFO"):
+    """Log com timestamp"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    print(f"[{timestamp}] {level}: {message}")
@@ -0,0 +1,101 @@
+"""
+Mapeamento GitHub ↔ GitLab mantido em memória e gravado com um único flush atômico
+"""
+
+import os
+import json
+from typing import Dict, Iterator, Optional, Tuple
+
+from promata_sync.state import DATA_DIR
+
+ISSUE_MAPPING_FILE = os.path.join(DATA_DIR, 'issue-mapping.json')
+PR_MAPPING_FILE = os.path.join(DATA_DIR, 'pr-mapping.json')
+# Comentários: id do comentário GitHub → id da nota GitLab
+COMMENT_MAPPING_FILE = os.path.join(DATA_DIR, 'comment-mapping.json')
+
+
+class MappingStore:
+    """Índices nos dois sentidos: número GitHub → iid GitLab e iid GitLab → número GitHub"""
+
+    def __init__(self, path: str, fingerprints_path: Optional[str] = None):
+        self.path = path
+        # Impressões digitais do conteúdo já sincronizado, em arquivo separado
+        self.fingerprints_path = fingerprints_path or f"{os.path.splitext(path)[0]}-fingerprints.json"
+        self._by_number: Dict[int, int] = {}
+        self._by_iid: Dict[int, int] = {}
+        self._fingerprints: Dict[int, str] = {}
+        self._dirty = False
+
+    def load(self):
+        """Carrega o arquivo JSON existente (formato {"<número>": iid}) e as impressões digitais"""
+        self._by_number.clear()
+        self._by_iid.clear()
+        self._fingerprints.clear()
+        self._dirty = False
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for number, iid in json.load(f).items():
+                    self._by_number[int(number)] = int(iid)
+                    self._by_iid[int(iid)] = int(number)
+        if os.path.exists(self.fingerprints_path):
+            with open(self.fingerprints_path, 'r') as f:
+                self._fingerprints = {int(number): fp for number, fp in json.load(f).items()}
+
+    def get_iid(self, github_number: int) -> Optional[int]:
+        """iid GitLab mapeado para o número GitHub"""
+        return self._by_number.get(int(github_number))
+
+    def get_number(self, gitlab_iid: int) -> Optional[int]:
+        """Número GitHub mapeado para o iid GitLab"""
+        return self._by_iid.get(int(gitlab_iid))
+
+    def set(self, github_number: int, gitlab_iid: int):
+        """Registra (ou substitui) um mapeamento; persistido apenas em flush()"""
+        github_number, gitlab_iid = int(github_number), int(gitlab_iid)
+        previous_iid = self._by_number.get(github_number)
+        if previous_iid == gitlab_iid:
+            return
+        if previous_iid is not None:
+            self._by_iid.pop(previous_iid, None)
+        previous_number = self._by_iid.get(gitlab_iid)
+        if previous_number is not None:
+            self._by_number.pop(previous_number, None)
+        self._by_number[github_number] = gitlab_iid
+        self._by_iid[gitlab_iid] = github_number
+        self._dirty = True
+
+    def get_fingerprint(self, github_number: int) -> Optional[str]:
+        """Impressão digital do conteúdo sincronizado na última escrita bem-sucedida"""
+        return self._fingerprints.get(int(github_number))
+
+    def set_fingerprint(self, github_number: int, fingerprint: str):
+        """Registra a impressão digital do conteúdo enviado ao GitLab"""
+        if self._fingerprints.get(int(github_number)) != fingerprint:
+            self._fingerprints[int(github_number)] = fingerprint
+            self._dirty = True
+
+    def items(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._by_number.items())
+
+    def __contains__(self, github_number) -> bool:
+        return int(github_number) in self._by_number
+
+    def __len__(self) -> int:
+        return len(self._by_number)
+
+    @staticmethod
+    def _write_atomic(path: str, data: Dict):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def flush(self):
+        """Grava todos os mapeamentos de uma vez (arquivo temporário + rename atômico)"""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._write_atomic(self.path, {str(number): iid for number, iid in sorted(self._by_number.items())})
+        self._write_atomic(self.fingerprints_path,
+                           {str(number): fp for number, fp in sorted(self._fingerprints.items())})
+        self._dirty = False
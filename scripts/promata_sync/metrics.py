@@ -0,0 +1,220 @@
+"""
+Métricas estruturadas da sincronização: spans por fase e por chamada HTTP, contadores por endpoint
+Exportadas como JSON e como tabela no resumo do job do GitHub Actions
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from promata_sync.state import DATA_DIR, utc_now_iso
+
+METRICS_FILE = os.environ.get('SYNC_METRICS_FILE', os.path.join(DATA_DIR, 'sync-metrics.json'))
+# Spans individuais de chamadas HTTP guardados no JSON (os contadores por endpoint não têm limite)
+MAX_CALL_SPANS = int(os.environ.get('SYNC_METRICS_MAX_CALL_SPANS', '2000'))
+TOP_ENDPOINTS = 10
+
+_GITHUB_REPO_PATH = re.compile(r'^/repos/[^/]+/[^/]+')
+_NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_of(url: str) -> str:
+    """Endpoint normalizado: ids numéricos e owner/repo viram placeholders (sem query string)"""
+    path = urlparse(url).path
+    path = _GITHUB_REPO_PATH.sub('/repos/:owner/:repo', path)
+    return _NUMERIC_SEGMENT.sub('/:id', path)
+
+
+@dataclass
+class EndpointStats:
+    """Contadores acumulados de um endpoint (host + método + caminho normalizado)"""
+    host: str
+    method: str
+    endpoint: str
+    calls: int = 0
+    retries: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class Span:
+    """Intervalo medido de uma fase (ou de uma chamada HTTP)"""
+    name: str
+    start_s: float
+    duration_s: float = 0.0
+    calls: int = 0
+    not_modified: int = 0
+    retries: int = 0
+    errors: int = 0
+    status: Optional[int] = None
+
+
+class MetricsRegistry:
+    """Registro do processo: fases aninhadas, chamadas HTTP e contadores por endpoint"""
+
+    def __init__(self):
+        self.started_at = utc_now_iso()
+        self._origin = time.monotonic()
+        self._lock = threading.Lock()
+        self._stack: List[str] = []
+        self.spans: List[Span] = []
+        self.call_spans: List[Span] = []
+        self.dropped_call_spans = 0
+        self.endpoints: Dict[Tuple[str, str, str], EndpointStats] = {}
+        self.totals = Span(name='total', start_s=0.0)
+
+    def _now(self) -> float:
+        return time.monotonic() - self._origin
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """Mede uma fase; fases aninhadas recebem o nome completo (ex.: complete/issues)"""
+        with self._lock:
+            self._stack.append(name)
+            span = Span(name='/'.join(self._stack), start_s=self._now())
+            before = (self.totals.calls, self.totals.not_modified, self.totals.retries, self.totals.errors)
+            self.spans.append(span)
+        try:
+            yield span
+        finally:
+            with self._lock:
+                span.duration_s = self._now() - span.start_s
+                span.calls = self.totals.calls - before[0]
+                span.not_modified = self.totals.not_modified - before[1]
+                span.retries = self.totals.retries - before[2]
+                span.errors = self.totals.errors - before[3]
+                if self._stack and self._stack[-1] == name:
+                    self._stack.pop()
+
+    def record_http(self, method: str, url: str, status: Optional[int], started: float, duration: float,
+                    bytes_in: int = 0, bytes_out: int = 0, retries: int = 0):
+        """Registra uma chamada HTTP concluída (status None = erro de conexão)"""
+        host = urlparse(url).netloc
+        key = (host, method.upper(), endpoint_of(url))
+        error = status is None or status >= 400
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats(*key)
+            for target in (stats, self.totals):
+                target.calls += 1
+                target.retries += retries
+                target.not_modified += status == 304
+                target.errors += error
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+            stats.seconds += duration
+
+            if len(self.call_spans) < MAX_CALL_SPANS:
+                phase = '/'.join(self._stack) or '-'
+                self.call_spans.append(Span(
+                    name=f"{phase} {key[1]} {key[2]}", start_s=started - self._origin, duration_s=duration,
+                    calls=1, not_modified=int(status == 304), retries=retries, errors=int(error), status=status,
+                ))
+            else:
+                self.dropped_call_spans += 1
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            endpoints = sorted(self.endpoints.values(), key=lambda e: e.calls, reverse=True)
+            return {
+                'started_at': self.started_at,
+                'duration_s': round(self._now(), 3),
+                'totals': {
+                    'calls': self.totals.calls,
+                    'retries': self.totals.retries,
+                    'not_modified': self.totals.not_modified,
+                    'errors': self.totals.errors,
+                    'bytes_in': sum(e.bytes_in for e in endpoints),
+                    'bytes_out': sum(e.bytes_out for e in endpoints),
+                },
+                'phases': [asdict(span) for span in self.spans],
+                'endpoints': [asdict(stats) for stats in endpoints],
+                'http_calls': [asdict(span) for span in self.call_spans],
+                'dropped_http_calls': self.dropped_call_spans,
+            }
+
+    def markdown_summary(self) -> str:
+        """Tabelas Markdown (fases e endpoints mais usados) para o resumo do job"""
+        data = self.to_dict()
+        lines = [
+            "## ⏱️ Métricas da sincronização",
+            "",
+            "| Fase | Duração (s) | Chamadas | 304 | Retries | Erros |",
+            "|---|---:|---:|---:|---:|---:|",
+        ]
+        for phase in data['phases']:
+            lines.append(f"| {phase['name']} | {phase['duration_s']:.2f} | {phase['calls']} | "
+                         f"{phase['not_modified']} | {phase['retries']} | {phase['errors']} |")
+        lines += [
+            "",
+            f"### Endpoints mais chamados (top {TOP_ENDPOINTS})",
+            "",
+            "| Host | Método | Endpoint | Chamadas | 304 | Retries | Erros | Bytes recebidos | Tempo (s) |",
+            "|---|---|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        for e in data['endpoints'][:TOP_ENDPOINTS]:
+            lines.append(f"| {e['host']} | {e['method']} | `{e['endpoint']}` | {e['calls']} | {e['not_modified']} | "
+                         f"{e['retries']} | {e['errors']} | {e['bytes_in']} | {e['seconds']:.2f} |")
+        totals = data['totals']
+        lines += ["", f"**Total**: {totals['calls']} chamadas, {totals['not_modified']} respostas 304, "
+                      f"{totals['retries']} retries, {totals['errors']} erros em {data['duration_s']:.1f}s", ""]
+        return '\n'.join(lines)
+
+    def export(self, path: str = METRICS_FILE) -> Optional[str]:
+        """Grava o JSON de métricas e, no GitHub Actions, acrescenta as tabelas ao resumo do job"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+        summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary_path:
+            with open(summary_path, 'a') as f:
+                f.write(self.markdown_summary())
+        return path
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Registro compartilhado do processo"""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def reset_metrics() -> MetricsRegistry:
+    """Recomeça o registro do processo (workers que sincronizam um repositório por vez)"""
+    global _registry
+    _registry = MetricsRegistry()
+    return _registry
+
+
+def span(name: str):
+    """Atalho para get_metrics().span(name)"""
+    return get_metrics().span(name)
+
+
+def export_metrics() -> Optional[str]:
+    """Exporta as métricas do processo; falhas na exportação não interrompem a sincronização"""
+    try:
+        path = get_metrics().export()
+        print(f"📈 Métricas gravadas em {path}")
+        return path
+    except Exception as e:
+        print(f"⚠️ Erro ao exportar métricas: {str(e)}")
+        return None
@@ -0,0 +1,182 @@
+"""
+Espelhamento incremental do repositório: envia apenas as refs alteradas
+Compara refs locais com `git ls-remote`, monta a lista mínima de refspecs
+e faz um único `git push --porcelain` com o resultado de cada ref
+"""
+
+import os
+import time
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+MIRROR_PRUNE = os.environ.get('MIRROR_PRUNE', '').lower() in ('1', 'true', 'yes')
+REF_NAMESPACES = ('refs/heads/', 'refs/tags/')
+
+# Flags do `git push --porcelain`
+PUSH_FLAGS = {
+    ' ': 'ok',
+    '+': 'ok',
+    '*': 'ok',
+    '-': 'ok',
+    '=': 'up-to-date',
+    '!': 'rejected',
+}
+
+
+@dataclass
+class RefUpdate:
+    """Alteração de uma ref entre o repositório local e o remote"""
+    ref: str
+    action: str  # create | update | delete
+    local_sha: Optional[str] = None
+    remote_sha: Optional[str] = None
+    status: str = 'pending'
+    summary: str = ''
+
+    @property
+    def refspec(self) -> str:
+        if self.action == 'delete':
+            return f":{self.ref}"
+        return f"+{self.ref}:{self.ref}"
+
+
+@dataclass
+class MirrorReport:
+    """Resultado do espelhamento com tempos de cada etapa"""
+    updates: List[RefUpdate] = field(default_factory=list)
+    remote_refs: Dict[str, str] = field(default_factory=dict)
+    compare_seconds: float = 0.0
+    push_seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and all(u.status != 'rejected' for u in self.updates)
+
+    def refs_with_status(self, status: str, action: Optional[str] = None) -> List[str]:
+        return [u.ref for u in self.updates
+                if u.status == status and (action is None or u.action == action)]
+
+
+def _parse_refs(output: str) -> Dict[str, str]:
+    """Converte linhas `<sha> <ref>` (ou separadas por tab) em {ref: sha}"""
+    refs = {}
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        sha, ref = parts
+        if ref.endswith('^{}') or not ref.startswith(REF_NAMESPACES):
+            continue
+        refs[ref] = sha
+    return refs
+
+
+class MirrorEngine:
+    """Calcula e envia o delta de refs para o remote de espelhamento"""
+
+    def __init__(self, remote: str = 'gitlab', prune: bool = MIRROR_PRUNE):
+        self.remote = remote
+        self.prune = prune
+
+    def _git(self, *args) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], capture_output=True, text=True)
+
+    def local_refs(self) -> Dict[str, str]:
+        result = self._git('for-each-ref', '--format=%(objectname) %(refname)', *REF_NAMESPACES)
+        if result.returncode != 0:
+            raise RuntimeError(f"git for-each-ref: {result.stderr.strip()}")
+        return _parse_refs(result.stdout)
+
+    def remote_refs(self) -> Dict[str, str]:
+        result = self._git('ls-remote', '--heads', '--tags', self.remote)
+        if result.returncode != 0:
+            raise RuntimeError(f"git ls-remote: {result.stderr.strip()}")
+        return _parse_refs(result.stdout)
+
+    def plan(self, local: Dict[str, str], remote: Dict[str, str]) -> List[RefUpdate]:
+        """Lista mínima de refs criadas, atualizadas e (com prune) removidas"""
+        updates = []
+        for ref, sha in sorted(local.items()):
+            if ref not in remote:
+                updates.append(RefUpdate(ref, 'create', local_sha=sha))
+            elif remote[ref] != sha:
+                updates.append(RefUpdate(ref, 'update', local_sha=sha, remote_sha=remote[ref]))
+        if self.prune:
+            for ref, sha in sorted(remote.items()):
+                if ref not in local:
+                    updates.append(RefUpdate(ref, 'delete', remote_sha=sha))
+        return updates
+
+    def push(self, updates: List[RefUpdate]) -> subprocess.CompletedProcess:
+        """Envia todas as refspecs em uma única invocação e registra o status de cada ref"""
+        result = self._git('push', '--porcelain', self.remote, *[u.refspec for u in updates])
+        by_ref = {u.ref: u for u in updates}
+        for line in result.stdout.splitlines():
+            parts = line.split('\t')
+            if len(parts) < 3 or not parts[0]:
+                continue
+            flag, refspec, summary = parts[0], parts[1], parts[2]
+            ref = refspec.split(':')[-1]
+            if ref in by_ref:
+                by_ref[ref].status = PUSH_FLAGS.get(flag, 'unknown')
+                by_ref[ref].summary = summary
+        if result.returncode != 0:
+            for update in updates:
+                if update.status == 'pending':
+                    update.status = 'rejected'
+        return result
+
+    def mirror_ref(self, ref: str, deleted: bool = False, source: str = 'origin') -> MirrorReport:
+        """Espelha uma única ref (evento de push): busca em `source` e envia sem comparar as demais"""
+        report = MirrorReport()
+        try:
+            started = time.monotonic()
+            if deleted:
+                if not self.prune:
+                    return report
+                update = RefUpdate(ref, 'delete')
+            else:
+                fetched = self._git('fetch', '--update-head-ok', source, f"+{ref}:{ref}")
+                if fetched.returncode != 0:
+                    raise RuntimeError(f"git fetch: {fetched.stderr.strip()}")
+                update = RefUpdate(ref, 'update', local_sha=self._git('rev-parse', ref).stdout.strip())
+            report.updates = [update]
+            report.compare_seconds = time.monotonic() - started
+
+            started = time.monotonic()
+            result = self.push(report.updates)
+            report.push_seconds = time.monotonic() - started
+            if result.returncode != 0:
+                report.error = result.stderr.strip()
+        except Exception as e:
+            report.error = str(e)
+        return report
+
+    def compare(self) -> MirrorReport:
+        """Calcula o delta de refs sem enviar nada (plano do espelhamento)"""
+        report = MirrorReport()
+        try:
+            started = time.monotonic()
+            local = self.local_refs()
+            report.remote_refs = self.remote_refs()
+            report.updates = self.plan(local, report.remote_refs)
+            report.compare_seconds = time.monotonic() - started
+        except Exception as e:
+            report.error = str(e)
+        return report
+
+    def mirror(self) -> MirrorReport:
+        report = self.compare()
+        if report.error or not report.updates:
+            return report
+        try:
+            started = time.monotonic()
+            result = self.push(report.updates)
+            report.push_seconds = time.monotonic() - started
+            if result.returncode != 0:
+                report.error = result.stderr.strip()
+        except Exception as e:
+            report.error = str(e)
+        return report
@@ -0,0 +1,225 @@
+"""
+Registros compactos (dataclasses com __slots__) com apenas os campos sincronizados
+Convertidos diretamente do JSON das APIs do GitHub (REST/GraphQL) e do GitLab, sem manter os
+payloads completos (usuário, repositórios de head/base, links) nem RESTObjects vivos
+"""
+
+import re
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+MERGEABLE_STATES = {'MERGEABLE': True, 'CONFLICTING': False}
+
+# Marcador gravado pelo sync no rodapé das descrições do GitLab: `- 🔢 **ID GitHub**: #N`
+GITHUB_ID_MARKER = re.compile(r'\*\*ID GitHub\*\*: #(\d+)')
+
+
+@dataclass(frozen=True, slots=True)
+class Label:
+    """Label do GitHub (instâncias compartilhadas entre todas as issues/PRs que a usam)"""
+    name: str
+    color: str = ''
+    description: str = ''
+
+
+_labels: Dict[Tuple[str, str, str], Label] = {}
+
+
+def _label(name: str, color: Optional[str], description: Optional[str] = None) -> Label:
+    key = (name, color or '', description or '')
+    label = _labels.get(key)
+    if label is None:
+        label = _labels.setdefault(key, Label(*key))
+    return label
+
+
+def _labels_from_rest(labels) -> Tuple[Label, ...]:
+    return tuple(_label(label['name'], label.get('color'), label.get('description')) for label in labels or ())
+
+
+def _labels_from_node(node: Dict) -> Tuple[Label, ...]:
+    return tuple(_label(label['name'], label.get('color')) for label in (node.get('labels') or {}).get('nodes', []))
+
+
+def github_id_marker(number: int) -> str:
+    """Texto do marcador de um número do GitHub (termo de busca nas descrições do GitLab)"""
+    return f"**ID GitHub**: #{number}"
+
+
+def github_number_from_description(description: str) -> Optional[int]:
+    """Número do GitHub no marcador da descrição (o último: o rodapé do sync vem depois do corpo original)"""
+    matches = GITHUB_ID_MARKER.findall(description or '')
+    return int(matches[-1]) if matches else None
+
+
+def _login(user: Optional[Dict]) -> str:
+    return sys.intern((user or {}).get('login') or 'ghost')
+
+
+@dataclass(slots=True)
+class GitHubIssue:
+    """Issue do GitHub"""
+    number: int
+    title: str
+    body: str
+    state: str
+    html_url: str
+    created_at: str
+    updated_at: str
+    author: str
+    labels: Tuple[Label, ...] = ()
+
+    @classmethod
+    def from_rest(cls, data: Dict) -> 'GitHubIssue':
+        """Converte um item de /repos/{repo}/issues (ou o `issue` de um webhook)"""
+        return cls(
+            number=int(data['number']),
+            title=data['title'],
+            body=data.get('body') or '',
+            state=sys.intern(data['state']),
+            html_url=data['html_url'],
+            created_at=data['created_at'],
+            updated_at=data['updated_at'],
+            author=_login(data.get('user')),
+            labels=_labels_from_rest(data.get('labels')),
+        )
+
+    @classmethod
+    def from_graphql(cls, node: Dict) -> 'GitHubIssue':
+        """Converte um nó Issue da API GraphQL"""
+        return cls(
+            number=int(node['number']),
+            title=node['title'],
+            body=node.get('body') or '',
+            state='open' if node['state'] == 'OPEN' else 'closed',
+            html_url=node['url'],
+            created_at=node['createdAt'],
+            updated_at=node['updatedAt'],
+            author=_login(node.get('author')),
+            labels=_labels_from_node(node),
+        )
+
+
+@dataclass(slots=True)
+class GitHubPullRequest:
+    """Pull Request do GitHub"""
+    number: int
+    title: str
+    body: str
+    state: str
+    html_url: str
+    created_at: str
+    updated_at: str
+    author: str
+    head_ref: str
+    base_ref: str
+    merged: bool = False
+    merged_at: Optional[str] = None
+    mergeable: Any = 'unknown'
+    labels: Tuple[Label, ...] = ()
+
+    @classmethod
+    def from_rest(cls, data: Dict) -> 'GitHubPullRequest':
+        """Converte um item de /repos/{repo}/pulls (ou o `pull_request` de um webhook)"""
+        return cls(
+            number=int(data['number']),
+            title=data['title'],
+            body=data.get('body') or '',
+            state=sys.intern(data['state']),
+            html_url=data['html_url'],
+            created_at=data['created_at'],
+            updated_at=data['updated_at'],
+            author=_login(data.get('user')),
+            head_ref=sys.intern(data['head']['ref']),
+            base_ref=sys.intern(data['base']['ref']),
+            # A listagem REST só traz `merged_at`; o webhook e o GraphQL trazem `merged`
+            merged=bool(data.get('merged') or data.get('merged_at')),
+            merged_at=data.get('merged_at'),
+            # Webhooks trazem `null` enquanto o GitHub calcula; False (conflito) é mantido
+            mergeable='unknown' if data.get('mergeable') is None else data['mergeable'],
+            labels=_labels_from_rest(data.get('labels')),
+        )
+
+    @classmethod
+    def from_graphql(cls, node: Dict) -> 'GitHubPullRequest':
+        """Converte um nó PullRequest da API GraphQL"""
+        return cls(
+            number=int(node['number']),
+            title=node['title'],
+            body=node.get('body') or '',
+            state='open' if node['state'] == 'OPEN' else 'closed',
+            html_url=node['url'],
+            created_at=node['createdAt'],
+            updated_at=node['updatedAt'],
+            author=_login(node.get('author')),
+            head_ref=sys.intern(node['headRefName']),
+            base_ref=sys.intern(node['baseRefName']),
+            merged=bool(node['merged']),
+            merged_at=node.get('mergedAt'),
+            mergeable=MERGEABLE_STATES.get(node.get('mergeable'), 'unknown'),
+            labels=_labels_from_node(node),
+        )
+
+
+@dataclass(slots=True)
+class GitLabIssue:
+    """Issue do GitLab (campos comparados e atualizados pelo sync)"""
+    iid: int
+    title: str
+    description: str
+    state: str
+    labels: Tuple[str, ...] = ()
+    github_number: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'GitLabIssue':
+        """Converte o JSON de /projects/:id/issues"""
+        description = data.get('description') or ''
+        return cls(
+            iid=int(data['iid']),
+            title=data['title'],
+            description=description,
+            state=sys.intern(data['state']),
+            labels=tuple(sys.intern(name) for name in data.get('labels') or ()),
+            github_number=github_number_from_description(description),
+        )
+
+    def refresh(self, data: Dict):
+        """Aplica a resposta de um PUT (estado e campos já confirmados pelo GitLab)"""
+        updated = GitLabIssue.from_api(data)
+        self.title, self.description = updated.title, updated.description
+        self.state, self.labels = updated.state, updated.labels
+        self.github_number = updated.github_number
+
+
+@dataclass(slots=True)
+class GitLabMergeRequest:
+    """Merge Request do GitLab (campos comparados e atualizados pelo sync)"""
+    iid: int
+    title: str
+    description: str
+    state: str
+    labels: Tuple[str, ...] = ()
+    github_number: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'GitLabMergeRequest':
+        """Converte o JSON de /projects/:id/merge_requests"""
+        description = data.get('description') or ''
+        return cls(
+            iid=int(data['iid']),
+            title=data['title'],
+            description=description,
+            state=sys.intern(data['state']),
+            labels=tuple(sys.intern(name) for name in data.get('labels') or ()),
+            github_number=github_number_from_description(description),
+        )
+
+    def refresh(self, data: Dict):
+        """Aplica a resposta de um PUT (estado e campos já confirmados pelo GitLab)"""
+        updated = GitLabMergeRequest.from_api(data)
+        self.title, self.description, self.state = updated.title, updated.description, updated.state
+        self.labels = updated.labels
+        self.github_number = updated.github_number
+
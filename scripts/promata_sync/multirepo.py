@@ -0,0 +1,100 @@
+"""
+Workers do modo multi-repo: cada repositório é sincronizado por um processo do pool
+O processo pai autentica, resolve os projetos do grupo em uma listagem e cria o orçamento de
+rate limit compartilhado; cada worker mantém um cliente GitLab entre os repositórios que recebe
+"""
+
+import os
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from gitlab.v4.objects import Project
+
+from promata_sync.http_cache import reset_github_cache
+from promata_sync.http_client import build_gitlab_client
+from promata_sync.loader import load_script
+from promata_sync.log import log
+from promata_sync.metrics import export_metrics, reset_metrics, span
+from promata_sync.projects import PROMATA_GROUP_ID, gitlab_repo_name
+from promata_sync.ratelimit import use_shared_budgets
+from promata_sync.results import RepoResult, SyncError
+
+GITHUB_SERVER_URL = os.environ.get('GITHUB_SERVER_URL', 'https://github.com').rstrip('/')
+
+_gl = None
+
+
+@dataclass
+class RepoTask:
+    """Repositório a sincronizar e o JSON do seu projeto na listagem do grupo (None: buscar/criar pelo nome)"""
+    repo: str
+    workdir: str
+    project: Optional[Dict] = None
+    resume: bool = False
+
+
+def init_worker(budgets, lock):
+    """Inicializador do pool: orçamento de rate limit compartilhado e um cliente GitLab por processo"""
+    global _gl
+    use_shared_budgets(budgets, lock)
+    # O resumo do job recebe apenas o relatório combinado, escrito pelo processo pai
+    os.environ.pop('GITHUB_STEP_SUMMARY', None)
+    _gl = build_gitlab_client(os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br'),
+                              os.environ.get('GITLAB_TOKEN'))
+
+
+def _clone_url(repo: str) -> str:
+    server = urlparse(GITHUB_SERVER_URL)
+    return f"{server.scheme}://x-access-token:{os.environ.get('GIT_TOKEN')}@{server.netloc}/{repo}.git"
+
+
+def _prepare_checkout(task: RepoTask):
+    """Usa o checkout em `workdir` se existir; senão um clone espelho ao lado (`workdir`.git) via GIT_DIR"""
+    os.environ.pop('GIT_DIR', None)
+    if os.path.exists(os.path.join(task.workdir, '.git')):
+        return
+    git_dir = f"{task.workdir}.git"
+    if os.path.isdir(git_dir):
+        command = ['git', '--git-dir', git_dir, 'remote', 'update', '--prune']
+    else:
+        command = ['git', 'clone', '--mirror', '--quiet', _clone_url(task.repo), git_dir]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {command[1]}: {result.stderr.strip()}")
+    os.environ['GIT_DIR'] = git_dir
+
+
+def sync_repo(task: RepoTask) -> RepoResult:
+    """Sincronização completa de um repositório dentro do worker (estado e relatórios em `workdir`)"""
+    started = time.monotonic()
+    result = RepoResult(repo=task.repo, gitlab_project=gitlab_repo_name(task.repo))
+    os.makedirs(task.workdir, exist_ok=True)
+    os.chdir(task.workdir)
+    metrics = reset_metrics()
+
+    # Os syncers de cada fase leem o repositório e o projeto do ambiente
+    os.environ['GITHUB_REPOSITORY'] = task.repo
+    os.environ['GITLAB_PROJECT_ID'] = str(task.project['id'] if task.project else PROMATA_GROUP_ID)
+
+    try:
+        _prepare_checkout(task)
+        reset_github_cache()
+        project = Project(_gl.projects, task.project) if task.project else None
+        syncer = load_script('sync-complete.py').ProMataCompleteSyncer(resume=task.resume, gl=_gl, project=project)
+        result.gitlab_project = syncer.project.path_with_namespace
+        with span('complete'):
+            result.ok = syncer.run_complete_sync()
+        result.phases = syncer.phase_results
+        result.mirror_ok = bool(syncer.mirror_report and syncer.mirror_report.ok)
+    except Exception as e:
+        log(f"❌ Erro na sincronização de {task.repo}: {str(e)}", "ERROR")
+        result.errors.append(SyncError.from_exception(task.repo, e))
+    finally:
+        export_metrics()
+        result.http_calls = metrics.totals.calls
+        result.http_retries = metrics.totals.retries
+        result.duration_s = round(time.monotonic() - started, 3)
+    return result
@@ -0,0 +1,102 @@
+"""
+Paginação da API REST do GitHub guiada pelo cabeçalho Link
+Páginas seguintes até rel="last" são buscadas em paralelo (asyncio) e entregues na ordem original;
+a listagem continua por rel="next" depois disso, pois o Link de uma resposta servida do cache (304)
+é o da época em que foi gravada e pode não conhecer páginas acrescentadas desde então
+"""
+
+import os
+import asyncio
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from requests.utils import parse_header_links
+
+PAGE_CONCURRENCY = int(os.environ.get('SYNC_PAGE_CONCURRENCY', '6'))
+
+
+def _link_page(response, rel: str) -> Optional[int]:
+    """Número da página apontada por rel="last"/"next" no cabeçalho Link"""
+    link_header = response.headers.get('Link')
+    if not link_header:
+        return None
+    for link in parse_header_links(link_header):
+        if link.get('rel') == rel:
+            page = parse_qs(urlparse(link['url']).query).get('page')
+            return int(page[0]) if page else None
+    return None
+
+
+def _fetch(get: Callable, url: str, headers: Optional[Dict], params: Dict, page: int):
+    response = get(url, headers=headers, params={**params, 'page': page})
+    response.raise_for_status()
+    return response
+
+
+def _next_page(response, page: int, items: List, per_page: Optional[int]) -> Optional[int]:
+    """Próxima página a buscar depois de `page`, ou None se a listagem terminou
+
+    O Link de uma resposta em cache está possivelmente desatualizado: uma página cheia servida do
+    cache pode ter ganhado uma sucessora, então a página seguinte é sondada diretamente.
+    """
+    if getattr(response, 'from_cache', False):
+        full = per_page is None or len(items) >= per_page
+        return page + 1 if items and full else None
+    return _link_page(response, 'next')
+
+
+async def _fetch_remaining(get: Callable, url: str, headers: Optional[Dict], params: Dict,
+                           first_page: int, last_page: int, concurrency: int, tasks: List):
+    """Agenda as páginas seguintes até last_page com no máximo `concurrency` requisições simultâneas"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_page(page: int):
+        async with semaphore:
+            return await asyncio.to_thread(_fetch, get, url, headers, params, page)
+
+    tasks.extend(asyncio.ensure_future(fetch_page(page)) for page in range(first_page + 1, last_page + 1))
+
+
+def iter_pages(get: Callable, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None,
+               concurrency: int = PAGE_CONCURRENCY, parallel: bool = True) -> Iterator[List[Dict]]:
+    """Gera o conteúdo JSON de cada página, em ordem, sem limite artificial de páginas
+
+    `get` segue a assinatura de requests.Session.get (url, headers=, params=).
+    Com parallel=False as páginas seguem rel="next" uma a uma, o que permite ao
+    chamador interromper a iteração cedo sem buscar páginas desnecessárias.
+    """
+    params = dict(params or {})
+    first_page = int(params.pop('page', 1))
+    per_page = int(params['per_page']) if 'per_page' in params else None
+    response = _fetch(get, url, headers, params, first_page)
+    items = response.json()
+    yield items
+    page = first_page
+
+    last_page = _link_page(response, 'last')
+    if parallel and last_page is not None and last_page > first_page:
+        loop = asyncio.new_event_loop()
+        tasks: List[asyncio.Future] = []
+        try:
+            loop.run_until_complete(_fetch_remaining(get, url, headers, params, first_page, last_page, concurrency, tasks))
+            for task in tasks:
+                response = loop.run_until_complete(task)
+                items = response.json()
+                yield items
+            page = last_page
+        finally:
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    # Páginas além do último rel="last" conhecido (ou uma a uma, com parallel=False)
+    next_page = _next_page(response, page, items, per_page)
+    while next_page:
+        response = _fetch(get, url, headers, params, next_page)
+        items = response.json()
+        if not items:
+            return
+        yield items
+        page = next_page
+        next_page = _next_page(response, page, items, per_page)
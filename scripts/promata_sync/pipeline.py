@@ -0,0 +1,103 @@
+"""
+Pipeline em estágios busca → casamento → escrita
+As páginas são buscadas em uma thread produtora e entregues por uma fila limitada, de modo que
+o casamento e as escritas de um lote acontecem enquanto as páginas seguintes ainda chegam
+"""
+
+import os
+import queue
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+# Páginas em memória entre a busca e o consumidor (teto de memória do estágio de busca)
+PIPELINE_DEPTH = max(1, int(os.environ.get('SYNC_PIPELINE_DEPTH', '4')))
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class PageStream:
+    """Fila limitada alimentada por uma thread produtora que consome `source` (iterável de páginas)
+
+    Erros da busca não interrompem o consumidor com exceção: a iteração termina e o erro fica em
+    `error`, permitindo ao chamador confirmar o que já foi processado. `complete` indica que a
+    listagem chegou ao fim sem erros.
+    """
+
+    def __init__(self, source: Iterable[List], maxsize: int = PIPELINE_DEPTH):
+        self.source = source
+        self.error: Optional[BaseException] = None
+        self.complete = False
+        self.items = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _put(self, item) -> bool:
+        """Enfileira respeitando o limite; desiste se o consumidor encerrou o pipeline"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        iterator = iter(self.source)
+        try:
+            for page in iterator:
+                if not self._put(page):
+                    break
+        except Exception as e:
+            self.error = e
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+            self._put(_DONE)
+
+    def start(self) -> 'PageStream':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._produce, name='sync-fetch', daemon=True)
+            self._thread.start()
+        return self
+
+    def __iter__(self) -> Iterator[List]:
+        self.start()
+        while True:
+            page = self._queue.get()
+            if page is _DONE:
+                self.complete = self.error is None
+                return
+            self.items += len(page)
+            yield page
+
+    def batches(self, size: int) -> Iterator[List]:
+        """Reagrupa as páginas em lotes de `size` itens (o último lote pode ser menor)"""
+        batch: List = []
+        for page in self:
+            batch.extend(page)
+            while len(batch) >= size:
+                yield batch[:size]
+                batch = batch[size:]
+        if batch:
+            yield batch
+
+    def close(self):
+        """Encerra a thread produtora (descartando páginas ainda não consumidas)"""
+        self._stop.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                try:
+                    self._queue.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    pass
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,232 @@
+"""
+Plano serializável de sincronização: gerado com --dry-run e executado com --apply plan.json
+Lista as escritas decididas a partir das listagens (labels, refs, issues, MRs, estados e notas)
+com a estimativa de requisições por host; a execução não consulta o GitHub novamente
+"""
+
+import os
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from promata_sync.checkpoint import CHECKPOINT_BATCH_SIZE
+from promata_sync.executor import WriteExecutor
+from promata_sync.log import log
+from promata_sync.metrics import get_metrics
+from promata_sync.ratelimit import get_scheduler
+from promata_sync.state import utc_now_iso
+
+PLAN_VERSION = 1
+PLAN_FILE = 'sync-plan.json'
+# Ações listadas uma a uma por fase na saída do --dry-run (as demais entram só nas contagens)
+MAX_LISTED_ACTIONS = int(os.environ.get('SYNC_PLAN_MAX_LISTED', '20'))
+
+# Fases do plano, na ordem de execução
+LABELS = 'labels'
+MIRROR = 'mirror'
+ISSUES = 'issues'
+PRS = 'prs'
+PHASE_ORDER = (LABELS, MIRROR, ISSUES, PRS)
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+
+@dataclass
+class PlannedAction:
+    """Escrita planejada; `payload` é enviado ao GitLab como está na execução
+
+    Tipos: create, update (campos e talvez estado), state (apenas estado), note, map (só
+    mapeamento/impressão digital, sem requisição) e push (refs do espelhamento).
+    """
+    phase: str
+    kind: str
+    summary: str
+    payload: Dict = field(default_factory=dict)
+    github_number: Optional[int] = None
+    gitlab_iid: Optional[int] = None
+    fingerprint: Optional[str] = None
+    requests: Dict[str, int] = field(default_factory=dict)
+    status: str = PENDING
+    error: Optional[str] = None
+
+
+@dataclass
+class PhasePlan:
+    """Início da listagem de uma fase e os watermarks que ela avança depois de aplicada por completo"""
+    phase: str
+    run_started_at: str
+    watermarks: List[str] = field(default_factory=list)
+
+
+@dataclass
+class SyncPlan:
+    """Plano de um repositório/projeto; regravado a cada lote aplicado (a execução pode ser retomada)"""
+    repo: str
+    project_id: int
+    created_at: str = field(default_factory=utc_now_iso)
+    phases: Dict[str, PhasePlan] = field(default_factory=dict)
+    actions: List[PlannedAction] = field(default_factory=list)
+    # Requisições feitas pelo próprio planejamento (listagens), por host
+    planning_requests: Dict[str, int] = field(default_factory=dict)
+    version: int = PLAN_VERSION
+
+    def add(self, phase: str, kind: str, summary: str, host: Optional[str] = None, requests: int = 1,
+            **fields) -> PlannedAction:
+        action = PlannedAction(phase=phase, kind=kind, summary=summary,
+                               requests={host: requests} if host and requests else {}, **fields)
+        self.actions.append(action)
+        return action
+
+    def add_label(self, label: Dict, host: str):
+        """Planeja a criação de uma label (uma vez por nome no plano)"""
+        if any(a.phase == LABELS and a.payload['name'] == label['name'] for a in self.actions):
+            return
+        self.add(LABELS, 'create', label['name'], host, payload=label)
+
+    def add_phase(self, phase: str, run_started_at: str, watermarks: List[str]):
+        self.phases[phase] = PhasePlan(phase=phase, run_started_at=run_started_at, watermarks=watermarks)
+
+    def pending(self, phase: str) -> List[PlannedAction]:
+        """Ações da fase ainda não aplicadas (inclui as que falharam em uma execução anterior)"""
+        return [a for a in self.actions if a.phase == phase and a.status != DONE]
+
+    def requests_by_host(self) -> Dict[str, int]:
+        """Requisições estimadas para aplicar as ações pendentes"""
+        totals: Dict[str, int] = {}
+        for action in self.actions:
+            if action.status == DONE:
+                continue
+            for host, count in action.requests.items():
+                totals[host] = totals.get(host, 0) + count
+        return totals
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Ações pendentes por fase e tipo"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for action in self.actions:
+            if action.status != DONE:
+                phase = counts.setdefault(action.phase, {})
+                phase[action.kind] = phase.get(action.kind, 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SyncPlan':
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f"Versão de plano não suportada: {data.get('version')}")
+        return cls(
+            repo=data['repo'],
+            project_id=int(data['project_id']),
+            created_at=data['created_at'],
+            phases={name: PhasePlan(**phase) for name, phase in data.get('phases', {}).items()},
+            actions=[PlannedAction(**action) for action in data.get('actions', [])],
+            planning_requests=data.get('planning_requests', {}),
+        )
+
+    def save(self, path: str):
+        """Grava o plano de forma atômica (arquivo temporário + rename)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, repo: str, project_id: int) -> 'SyncPlan':
+        """Carrega um plano e confere se foi gerado para este repositório e projeto"""
+        with open(path, 'r', encoding='utf-8') as f:
+            plan = cls.from_dict(json.load(f))
+        if plan.repo != repo or plan.project_id != int(project_id):
+            raise ValueError(f"Plano gerado para {plan.repo} (projeto {plan.project_id}), "
+                             f"não para {repo} (projeto {project_id})")
+        return plan
+
+    def render(self) -> str:
+        """Plano em Markdown: contagens, requisições estimadas por host e as primeiras ações de cada fase"""
+        lines = [
+            f"## 🗂️ Plano de sincronização - {self.repo}",
+            "",
+            f"**Gerado em**: {self.created_at} | **Projeto GitLab**: {self.project_id}",
+            "",
+            "| Fase | Ação | Quantidade |",
+            "|---|---|---:|",
+        ]
+        counts = self.counts()
+        for phase in PHASE_ORDER:
+            for kind, count in sorted(counts.get(phase, {}).items()):
+                lines.append(f"| {phase} | {kind} | {count} |")
+        if not counts:
+            lines.append("| — | nenhuma escrita pendente | 0 |")
+
+        lines += [
+            "",
+            "### Requisições estimadas por host",
+            "",
+            "| Host | Aplicar o plano | Feitas no planejamento | Limite por janela | Janelas necessárias |",
+            "|---|---:|---:|---:|---:|",
+        ]
+        estimate = self.requests_by_host()
+        scheduler = get_scheduler()
+        for host in sorted(set(estimate) | set(self.planning_requests)):
+            with scheduler.locked_budget(host) as budget:
+                limit = budget.limit
+            windows = math.ceil(estimate.get(host, 0) / limit) if limit else '—'
+            lines.append(f"| {host} | {estimate.get(host, 0)} | {self.planning_requests.get(host, 0)} | "
+                         f"{int(limit) if limit else '—'} | {windows} |")
+
+        for phase in PHASE_ORDER:
+            actions = self.pending(phase)
+            if not actions:
+                continue
+            lines += ["", f"### {phase} ({len(actions)})", ""]
+            for action in actions[:MAX_LISTED_ACTIONS]:
+                failed = f" ⚠️ {action.error}" if action.status == FAILED else ""
+                lines.append(f"- `{action.kind}` {action.summary}{failed}")
+            if len(actions) > MAX_LISTED_ACTIONS:
+                lines.append(f"- ... e mais {len(actions) - MAX_LISTED_ACTIONS}")
+        lines.append("")
+        return '\n'.join(lines)
+
+    def publish(self, path: str):
+        """Grava o plano, imprime o resumo e, no GitHub Actions, acrescenta-o ao resumo do job"""
+        self.planning_requests = {}
+        for endpoint in get_metrics().to_dict()['endpoints']:
+            self.planning_requests[endpoint['host']] = self.planning_requests.get(endpoint['host'], 0) + endpoint['calls']
+        self.save(path)
+
+        report = self.render()
+        print(report)
+        summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+        if summary_path:
+            with open(summary_path, 'a', encoding='utf-8') as f:
+                f.write(report)
+
+
+def run_actions(actions: List[PlannedAction], host: str, execute: Callable[[PlannedAction], None],
+                record: Callable[[PlannedAction], None], commit: Callable[[], None]) -> int:
+    """Executa ações em lotes pelo WriteExecutor e retorna quantas falharam
+
+    `execute` roda nas threads de escrita; `record` (mapeamentos) e `commit` (flush dos mapeamentos
+    e do plano) rodam nesta thread, na ordem do plano, ao fim de cada lote.
+    """
+    failed = 0
+    with WriteExecutor() as executor:
+        for start in range(0, len(actions), CHECKPOINT_BATCH_SIZE):
+            batch = actions[start:start + CHECKPOINT_BATCH_SIZE]
+            futures = [(action, executor.submit(host, execute, action)) for action in batch]
+            for action, future in futures:
+                error = future.exception()
+                if error is None:
+                    action.status, action.error = DONE, None
+                else:
+                    action.status, action.error = FAILED, str(error)
+                    failed += 1
+                    log(f"❌ Falha ao aplicar {action.phase}/{action.kind} {action.summary}: {str(error)}", "ERROR")
+                record(action)
+            commit()
+    return failed
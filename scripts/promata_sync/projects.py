@@ -0,0 +1,31 @@
+"""
+Projetos do grupo Pró-Mata no GitLab AGES
+Nome do projeto GitLab correspondente a cada repositório do GitHub e resolução de todos os
+projetos do grupo com uma única listagem
+"""
+
+from typing import Dict
+
+from promata_sync.gitlab_pagination import iter_gitlab
+
+PROMATA_GROUP_ID = 1735
+
+# Repositórios do GitHub cujo projeto no GitLab tem outro nome
+REPO_MAPPING = {
+    'frontend': 'frontend',
+    'backend': 'backend',
+    'infrastructure': 'infra',
+    'database': 'database',
+}
+
+
+def gitlab_repo_name(repo_name: str) -> str:
+    """Nome do projeto GitLab para `owner/repo` do GitHub"""
+    repo_path = repo_name.split('/')[-1]
+    return REPO_MAPPING.get(repo_path, repo_path)
+
+
+def list_group_projects(gl, group_id: int = PROMATA_GROUP_ID) -> Dict[str, Dict]:
+    """JSON dos projetos diretos do grupo indexado pelo path (uma listagem para todos os repositórios)"""
+    group = gl.groups.get(group_id, lazy=True)
+    return {project['path']: project for project in iter_gitlab(group.projects, with_shared=False)}
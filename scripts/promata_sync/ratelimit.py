@@ -0,0 +1,189 @@
+"""
+Agendador de requisições ciente de rate limit para GitHub e GitLab
+Acompanha o orçamento restante por host, distribui as chamadas até o reset
+e repete respostas 429/403 de rate limit com backoff exponencial com jitter
+No modo multi-repo o orçamento fica em um Manager de multiprocessing, compartilhado pelos workers
+"""
+
+import os
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from promata_sync.log import log
+
+MAX_RETRIES = int(os.environ.get('SYNC_RATE_LIMIT_RETRIES', '5'))
+MAX_WAIT = float(os.environ.get('SYNC_RATE_LIMIT_MAX_WAIT', '900'))
+# Abaixo desta fração do limite as chamadas passam a ser espaçadas até o reset
+PACING_THRESHOLD = float(os.environ.get('SYNC_RATE_LIMIT_PACING', '0.2'))
+BASE_DELAY = 1.0
+SECONDARY_MIN_DELAY = 60.0
+
+# GitHub usa X-RateLimit-*, GitLab usa RateLimit-*
+REMAINING_HEADERS = ('X-RateLimit-Remaining', 'RateLimit-Remaining')
+LIMIT_HEADERS = ('X-RateLimit-Limit', 'RateLimit-Limit')
+RESET_HEADERS = ('X-RateLimit-Reset', 'RateLimit-Reset')
+
+
+def _header_number(headers, names) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class HostBudget:
+    """Orçamento de requisições conhecido para um host"""
+
+    def __init__(self):
+        self.limit: Optional[float] = None
+        self.remaining: Optional[float] = None
+        self.reset_at: Optional[float] = None
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def to_state(self) -> Dict[str, Optional[float]]:
+        return {'limit': self.limit, 'remaining': self.remaining, 'reset_at': self.reset_at,
+                'next_slot': self.next_slot}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Optional[float]]]) -> 'HostBudget':
+        budget = cls()
+        if state:
+            budget.limit = state['limit']
+            budget.remaining = state['remaining']
+            budget.reset_at = state['reset_at']
+            budget.next_slot = state['next_slot']
+        return budget
+
+
+class RateLimitScheduler:
+    """Ponto central por onde passam todas as requisições HTTP dos syncers"""
+
+    def __init__(self, max_retries: int = MAX_RETRIES, max_wait: float = MAX_WAIT,
+                 pacing_threshold: float = PACING_THRESHOLD):
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.pacing_threshold = pacing_threshold
+        self.retries = 0
+        self._budgets: Dict[str, HostBudget] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, host: str) -> HostBudget:
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = HostBudget()
+            return self._budgets[host]
+
+    @contextmanager
+    def locked_budget(self, host: str) -> Iterator[HostBudget]:
+        """Orçamento do host com acesso exclusivo para leitura e atualização"""
+        budget = self.budget(host)
+        with budget.lock:
+            yield budget
+
+    def before_request(self, host: str):
+        """Aguarda o próximo horário disponível quando o orçamento está baixo"""
+        with self.locked_budget(host) as budget:
+            now = time.time()
+            if budget.remaining is None or budget.reset_at is None or budget.reset_at <= now:
+                return
+            window = budget.reset_at - now
+            if budget.remaining <= 0:
+                wait = window
+            elif budget.limit and budget.remaining < budget.limit * self.pacing_threshold:
+                # Espalhar o orçamento restante até o reset
+                interval = window / budget.remaining
+                wait = max(0.0, budget.next_slot - now)
+                budget.next_slot = max(now, budget.next_slot) + interval
+            else:
+                return
+            budget.remaining -= 1
+        if wait > 0:
+            wait = min(wait, self.max_wait)
+            if wait >= 1:
+                log(f"⏳ Rate limit de {host}: aguardando {wait:.0f}s", "WARN")
+            time.sleep(wait)
+
+    def after_response(self, host: str, response):
+        """Atualiza o orçamento a partir dos cabeçalhos de rate limit da resposta"""
+        remaining = _header_number(response.headers, REMAINING_HEADERS)
+        if remaining is None:
+            return
+        with self.locked_budget(host) as budget:
+            budget.remaining = remaining
+            budget.limit = _header_number(response.headers, LIMIT_HEADERS) or budget.limit
+            reset = _header_number(response.headers, RESET_HEADERS)
+            if reset is not None:
+                budget.reset_at = reset
+
+    def retry_delay(self, response, attempt: int) -> Optional[float]:
+        """Tempo de espera antes de repetir a requisição, ou None se não for rate limit"""
+        if response.status_code not in (403, 429) or attempt >= self.max_retries:
+            return None
+
+        retry_after = _header_number(response.headers, ('Retry-After',))
+        remaining = _header_number(response.headers, REMAINING_HEADERS)
+        reset = _header_number(response.headers, RESET_HEADERS)
+        backoff = min(self.max_wait, BASE_DELAY * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+        if retry_after is not None:
+            delay = retry_after
+        elif remaining == 0 and reset is not None:
+            # Limite primário esgotado: esperar o reset
+            delay = max(0.0, reset - time.time()) + random.uniform(0, 1)
+        elif response.status_code == 429:
+            delay = backoff
+        elif 'secondary rate limit' in response.text.lower() or 'abuse' in response.text.lower():
+            # Limite secundário sem Retry-After: GitHub recomenda aguardar ao menos um minuto
+            delay = max(SECONDARY_MIN_DELAY, backoff)
+        else:
+            # 403 comum (permissão): não repetir
+            return None
+
+        self.retries += 1
+        return min(delay, self.max_wait)
+
+
+class SharedRateLimitScheduler(RateLimitScheduler):
+    """Agendador cujo orçamento por host vive em um dict de multiprocessing.Manager
+
+    Todos os processos que usam o mesmo token enxergam as mesmas respostas de rate limit e
+    reservam horários da mesma fila, em vez de cada um espaçar as chamadas só pelas suas.
+    """
+
+    def __init__(self, budgets, lock, **kwargs):
+        super().__init__(**kwargs)
+        self.shared_budgets = budgets
+        self.shared_lock = lock
+
+    @contextmanager
+    def locked_budget(self, host: str) -> Iterator[HostBudget]:
+        with self.shared_lock:
+            budget = HostBudget.from_state(self.shared_budgets.get(host))
+            yield budget
+            self.shared_budgets[host] = budget.to_state()
+
+
+_scheduler: Optional[RateLimitScheduler] = None
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Agendador compartilhado do processo"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RateLimitScheduler()
+    return _scheduler
+
+
+def use_shared_budgets(budgets, lock) -> RateLimitScheduler:
+    """Passa o processo a usar o orçamento compartilhado (chamar antes de criar a Session)"""
+    global _scheduler
+    _scheduler = SharedRateLimitScheduler(budgets, lock)
+    return _scheduler
@@ -0,0 +1,61 @@
+"""
+Resultados estruturados das fases de sincronização
+"""
+
+import traceback
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class SyncError:
+    """Erro capturado em uma fase, sem depender de texto do stderr"""
+    phase: str
+    message: str
+    error_type: str
+    detail: Optional[str] = None
+
+    @classmethod
+    def from_exception(cls, phase: str, exc: BaseException) -> 'SyncError':
+        return cls(
+            phase=phase,
+            message=str(exc),
+            error_type=type(exc).__name__,
+            detail=''.join(traceback.format_exception_only(type(exc), exc)).strip(),
+        )
+
+
+@dataclass
+class SyncSummary:
+    """Contadores de uma fase de sincronização de issues ou PRs"""
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    unchanged: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.created + self.updated + self.skipped + self.unchanged
+
+
+@dataclass
+class PhaseResult:
+    """Resultado de uma fase executada pelo syncer completo"""
+    phase: str
+    ok: bool
+    summary: Optional[SyncSummary] = None
+    errors: List[SyncError] = field(default_factory=list)
+
+
+@dataclass
+class RepoResult:
+    """Resultado da sincronização completa de um repositório no modo multi-repo"""
+    repo: str
+    gitlab_project: str
+    ok: bool = False
+    mirror_ok: bool = False
+    duration_s: float = 0.0
+    http_calls: int = 0
+    http_retries: int = 0
+    phases: List[PhaseResult] = field(default_factory=list)
+    errors: List[SyncError] = field(default_factory=list)
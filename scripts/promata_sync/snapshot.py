@@ -0,0 +1,85 @@
+"""
+Contagens obtidas uma única vez por execução e compartilhadas entre as fases de sync e relatório
+Os relatórios só precisam de totais: nenhuma listagem completa é guardada em memória
+"""
+
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional
+
+from promata_sync.gitlab_pagination import gitlab_total
+
+
+class ItemCounts:
+    """Contagens agregadas de issues, PRs ou MRs: por estado, merged, por label e por branch de origem"""
+
+    def __init__(self):
+        self.states: Counter = Counter()
+        self.merged = 0
+        self.labels: Counter = Counter()
+        self.branches: Counter = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self.states.values())
+
+    def add(self, item):
+        """Conta um registro de promata_sync.models"""
+        self.states[item.state] += 1
+        if getattr(item, 'merged', False):
+            self.merged += 1
+        for label in item.labels:
+            self.labels[getattr(label, 'name', label)] += 1
+        head_ref = getattr(item, 'head_ref', None)
+        if head_ref:
+            self.branches[head_ref] += 1
+
+    @classmethod
+    def from_items(cls, items: Iterable) -> 'ItemCounts':
+        counts = cls()
+        for item in items:
+            counts.add(item)
+        return counts
+
+
+class RunSnapshot:
+    """Contagens de GitHub e GitLab (ItemCounts); None indica que ainda não foram obtidas"""
+
+    def __init__(self):
+        self.github_issues: Optional[ItemCounts] = None
+        self.gitlab_issues: Optional[ItemCounts] = None
+        self.github_prs: Optional[ItemCounts] = None
+        self.gitlab_mrs: Optional[ItemCounts] = None
+
+    def get_or_fetch(self, name: str, fetch: Callable[[], Dict[str, ItemCounts]]) -> ItemCounts:
+        """Retorna as contagens de `name`, obtendo-as apenas na primeira vez
+
+        `fetch` devolve contagens por nome e pode trazer mais de uma coleção (a consulta do GitHub conta
+        issues e PRs de uma vez); só as ainda ausentes são guardadas.
+        """
+        if getattr(self, name) is None:
+            for key, counts in fetch().items():
+                if getattr(self, key) is None:
+                    setattr(self, key, counts)
+        return getattr(self, name)
+
+    def add(self, name: str, item):
+        """Conta um objeto recém-criado (sem nova consulta); ignorado se as contagens não foram obtidas"""
+        counts = getattr(self, name)
+        if counts is not None:
+            counts.add(item)
+
+
+def count_gitlab_issues(project) -> Dict[str, ItemCounts]:
+    """Contagens das issues do GitLab pelo endpoint issues_statistics (uma chamada)"""
+    statistics = project.issues_statistics.get().statistics['counts']
+    counts = ItemCounts()
+    counts.states.update(opened=statistics['opened'], closed=statistics['closed'])
+    return {'gitlab_issues': counts}
+
+
+def count_gitlab_mrs(project) -> Dict[str, ItemCounts]:
+    """Contagens dos MRs do GitLab pelo X-Total de cada estado (uma chamada por estado)"""
+    counts = ItemCounts()
+    for state in ('opened', 'closed', 'merged'):
+        counts.states[state] = gitlab_total(project.mergerequests, state=state)
+    return {'gitlab_mrs': counts}
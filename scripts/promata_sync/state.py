@@ -0,0 +1,81 @@
+"""
+Estado persistido entre execuções da sincronização (watermarks e itens pendentes por entidade)
+"""
+
+import os
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DATA_DIR = '.github/data'
+STATE_FILE = os.path.join(DATA_DIR, 'sync-state.json')
+
+# Entidades com watermark próprio
+GITHUB_ISSUES = 'github_issues'
+GITHUB_PRS = 'github_prs'
+GITLAB_ISSUES = 'gitlab_issues'
+GITLAB_MRS = 'gitlab_mrs'
+GITHUB_COMMENTS = 'github_comments'
+
+
+def utc_now_iso() -> str:
+    """Timestamp UTC no formato ISO 8601 aceito por GitHub e GitLab"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def incremental_enabled() -> bool:
+    """Modo incremental é o padrão; SYNC_MODE=full força varredura completa"""
+    return os.environ.get('SYNC_MODE', 'incremental').lower() != 'full'
+
+
+class SyncState:
+    """Watermarks da última sincronização bem-sucedida por tipo de entidade
+
+    Itens que falharam antes do watermark avançar ficam em `pending` (ids por entidade) e são
+    retentados individualmente, sem que um item problemático prenda o watermark da entidade.
+    """
+
+    def __init__(self, path: str = STATE_FILE):
+        self.path = path
+        data = self._load()
+        self.watermarks: Dict[str, str] = data.get('watermarks', {})
+        self.pending: Dict[str, List[int]] = data.get('pending', {})
+
+    def _load(self) -> Dict:
+        """Carrega o estado salvo (vazio na primeira execução)"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def get_watermark(self, entity: str) -> Optional[str]:
+        """Retorna o watermark da entidade ou None se nunca sincronizada"""
+        return self.watermarks.get(entity)
+
+    def set_watermark(self, entity: str, value: str):
+        """Atualiza o watermark da entidade (persistido apenas em save())"""
+        self.watermarks[entity] = value
+
+    def get_pending(self, entity: str) -> List[int]:
+        """Ids da entidade pendentes de uma execução anterior"""
+        return list(self.pending.get(entity, []))
+
+    def set_pending(self, entity: str, ids: List[int]):
+        """Substitui os ids pendentes da entidade (persistido apenas em save())"""
+        self.pending[entity] = sorted(set(ids))
+
+    def save(self):
+        """Grava o estado de forma atômica, preservando watermarks e pendências de outros syncers"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        data = self._load()
+        watermarks = data.get('watermarks', {})
+        watermarks.update(self.watermarks)
+        pending = data.get('pending', {})
+        pending.update(self.pending)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'watermarks': watermarks, 'pending': pending}, f, indent=2)
+        os.replace(tmp_path, self.path)
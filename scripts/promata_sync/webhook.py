@@ -0,0 +1,26 @@
+"""
+Assinatura e verificação de webhooks do GitHub (HMAC-SHA256 do corpo bruto)
+Usado pelo receptor `sync-webhook.py` e pelo remetente local de testes
+"""
+
+import hmac
+import hashlib
+from typing import Optional
+
+SIGNATURE_HEADER = 'X-Hub-Signature-256'
+EVENT_HEADER = 'X-GitHub-Event'
+DELIVERY_HEADER = 'X-GitHub-Delivery'
+SIGNATURE_PREFIX = 'sha256='
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Valor do cabeçalho X-Hub-Signature-256 para o corpo informado"""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"{SIGNATURE_PREFIX}{digest}"
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Compara a assinatura recebida em tempo constante"""
+    if not signature or not signature.startswith(SIGNATURE_PREFIX):
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Script específico para sincronização de comentários GitHub → GitLab AGES
+Comentários de issues e PRs viram notas na issue/MR mapeada
+Para uso no projeto Pro-Mata PUCRS
+"""
+
+import os
+import argparse
+from datetime import datetime
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
+
+from promata_sync.executor import WriteExecutor
+from promata_sync.fingerprint import text_fingerprint
+from promata_sync.http_cache import get_github_cache
+from promata_sync.http_client import GITHUB_API_URL, build_gitlab_client
+from promata_sync.mapping_store import COMMENT_MAPPING_FILE, ISSUE_MAPPING_FILE, PR_MAPPING_FILE, MappingStore
+from promata_sync.metrics import export_metrics, span
+from promata_sync.pagination import iter_pages
+from promata_sync.results import SyncSummary
+from promata_sync.snapshot import RunSnapshot
+from promata_sync.state import (
+    GITHUB_COMMENTS,
+    SyncState,
+    incremental_enabled,
+    utc_now_iso,
+)
+
+class GitHubCommentsSyncer:
+    def __init__(self, gl=None, project=None, snapshot: Optional[RunSnapshot] = None):
+        """Inicializa o sincronizador de comentários"""
+        self.git_token = os.environ.get('GIT_TOKEN')
+        self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
+        self.gitlab_token = os.environ.get('GITLAB_TOKEN')
+        self.gitlab_project_id = os.environ.get('GITLAB_PROJECT_ID')
+        self.repo_name = os.environ.get('GITHUB_REPOSITORY')
+        
+        # Validar configurações (projeto pode ser injetado pelo syncer completo)
+        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id or project, self.repo_name]):
+            raise ValueError("Configurações incompletas. Verifique os secrets.")
+        
+        # Clientes API (reutiliza cliente/projeto já autenticados quando fornecidos)
+        self.gl = gl or build_gitlab_client(self.gitlab_url, self.gitlab_token)
+        self.project = project or self.gl.projects.get(self.gitlab_project_id)
+        self.snapshot = snapshot or RunSnapshot()
+        self.gitlab_host = urlparse(self.gitlab_url).netloc
+        
+        self.github_headers = {
+            'Authorization': f'token {self.git_token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+        self.github_cache = get_github_cache()
+        
+        # Mapeamentos de issues/PRs (somente leitura) e de comentários → notas
+        self.issue_mappings = MappingStore(ISSUE_MAPPING_FILE)
+        self.pr_mappings = MappingStore(PR_MAPPING_FILE)
+        self.comment_mappings = MappingStore(COMMENT_MAPPING_FILE)
+        
+        # Estado incremental (watermark da última execução)
+        self.incremental = incremental_enabled()
+        self.state = SyncState()
+        self.last_summary: Optional[SyncSummary] = None
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log com timestamp"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] {level}: {message}")
+
+    def get_github_comments(self, since: Optional[str] = None) -> Tuple[List[Dict], bool]:
+        """Busca comentários de todas as issues e PRs do repositório em uma única listagem
+
+        Retorna os comentários recebidos e se a listagem chegou ao fim (como `PageStream.complete`):
+        uma falha no meio da paginação não pode avançar o watermark.
+        """
+        url = f"{GITHUB_API_URL}/repos/{self.repo_name}/issues/comments"
+        params = {'sort': 'created', 'direction': 'asc', 'per_page': 100}
+        if since:
+            params['since'] = since
+        
+        comments = []
+        try:
+            for page_comments in iter_pages(self.github_cache.get, url, headers=self.github_headers, params=params):
+                comments.extend(page_comments)
+            
+            self.log(f"Encontrados {len(comments)} comentários no GitHub")
+            return comments, True
+        
+        except Exception as e:
+            self.log(f"❌ Erro ao buscar comentários do GitHub (listagem incompleta, {len(comments)} recebidos): {str(e)}", "ERROR")
+            return comments, False
+
+    def get_pending_comments(self, comment_ids: List[int]) -> Tuple[List[Dict], List[int]]:
+        """Busca individualmente comentários pendentes de execuções anteriores
+
+        Retorna os comentários encontrados e os ids que falharam (continuam pendentes); comentários
+        apagados no GitHub (404) são descartados.
+        """
+        comments, failed = [], []
+        for comment_id in comment_ids:
+            url = f"{GITHUB_API_URL}/repos/{self.repo_name}/issues/comments/{comment_id}"
+            try:
+                response = self.github_cache.get(url, headers=self.github_headers)
+                if response.status_code == 404:
+                    continue
+                response.raise_for_status()
+                comments.append(response.json())
+            except Exception as e:
+                self.log(f"⚠️ Erro ao buscar comentário pendente {comment_id}: {str(e)}", "WARN")
+                failed.append(comment_id)
+        if comment_ids:
+            self.log(f"Recuperados {len(comments)} de {len(comment_ids)} comentários pendentes")
+        return comments, failed
+
+    def build_note_body(self, comment: Dict) -> str:
+        """Corpo da nota no GitLab preservando o comentário original"""
+        return f"""{comment.get('body', '') or ''}
+
+---
+💬 *Comentário de @{comment['user']['login']} no GitHub em {comment['created_at']}* — {comment['html_url']}
+"""
+
+    def _parent_of(self, comment: Dict) -> Optional[Tuple[str, int]]:
+        """Issue ou MR do GitLab mapeado para a issue/PR comentado no GitHub"""
+        github_number = int(comment['issue_url'].rstrip('/').rsplit('/', 1)[-1])
+        if github_number in self.issue_mappings:
+            return 'issue', self.issue_mappings.get_iid(github_number)
+        if github_number in self.pr_mappings:
+            return 'mr', self.pr_mappings.get_iid(github_number)
+        return None
+
+    def _notes_manager(self, kind: str, iid: int):
+        """Gerenciador de notas sem buscar a issue/MR (objeto lazy)"""
+        if kind == 'issue':
+            return self.project.issues.get(iid, lazy=True).notes
+        return self.project.mergerequests.get(iid, lazy=True).notes
+
+    def _sync_thread(self, kind: str, iid: int, comments: List[Dict]) -> List[Tuple[Dict, Optional[int]]]:
+        """Cria/edita as notas de uma issue/MR em ordem cronológica; retorna (comentário, id da nota)"""
+        notes = self._notes_manager(kind, iid)
+        results = []
+        for comment in comments:
+            body = self.build_note_body(comment)
+            note_id = self.comment_mappings.get_iid(comment['id'])
+            try:
+                if note_id:
+                    notes.update(note_id, {'body': body})
+                else:
+                    note_id = notes.create({'body': body}).id
+                results.append((comment, note_id))
+            except Exception as e:
+                reference = f"#{iid}" if kind == 'issue' else f"!{iid}"
+                self.log(f"❌ Erro ao sincronizar comentário {comment['id']} em {reference}: {str(e)}", "ERROR")
+                results.append((comment, None))
+        return results
+
+    def sync_comments(self, resume: bool = False) -> SyncSummary:
+        """Função principal de sincronização de comentários"""
+        # `resume` mantém a assinatura das demais fases: notas já confirmadas nunca são
+        # reenviadas (mapeamento + impressão digital) e o watermark só avança sem pendências
+        self.log("🔄 Iniciando sincronização de comentários GitHub → GitLab...")
+        
+        # Watermark da última execução (None = varredura completa)
+        run_started_at = utc_now_iso()
+        since = self.state.get_watermark(GITHUB_COMMENTS) if self.incremental else None
+        if since:
+            self.log(f"⏩ Modo incremental: comentários alterados desde {since}")
+        
+        with span('github-fetch'):
+            comments, listing_complete = self.get_github_comments(since=since)
+            
+            # Comentários que falharam em execuções anteriores (já atrás do watermark)
+            listed = {comment['id'] for comment in comments}
+            previous_pending = [cid for cid in self.state.get_pending(GITHUB_COMMENTS) if cid not in listed]
+            retried, still_pending = self.get_pending_comments(previous_pending if since else [])
+            comments.extend(retried)
+        
+        # Carregar mapeamentos existentes
+        try:
+            self.issue_mappings.load()
+            self.pr_mappings.load()
+            self.comment_mappings.load()
+        except Exception as e:
+            self.log(f"⚠️ Erro ao carregar mapeamentos: {str(e)}", "WARN")
+        
+        created_count = 0
+        updated_count = 0
+        skipped_count = 0
+        unchanged_count = 0
+        
+        # Agrupar por issue/MR: notas de um mesmo item em ordem, itens diferentes em paralelo
+        threads: Dict[Tuple[str, int], List[Dict]] = {}
+        for comment in comments:
+            parent = self._parent_of(comment)
+            if parent is None:
+                # Issue/PR ainda não sincronizado: tentar novamente na próxima execução
+                skipped_count += 1
+                still_pending.append(comment['id'])
+                continue
+            if self.comment_mappings.get_fingerprint(comment['id']) == text_fingerprint(self.build_note_body(comment)):
+                unchanged_count += 1
+                continue
+            threads.setdefault(parent, []).append(comment)
+        
+        pending = []
+        try:
+            with WriteExecutor() as executor:
+                for (kind, iid), thread_comments in threads.items():
+                    future = executor.submit(self.gitlab_host, self._sync_thread, kind, iid, thread_comments)
+                    pending.append((thread_comments, future))
+        finally:
+            # Coletar resultados na ordem de submissão (contadores determinísticos)
+            for thread_comments, future in pending:
+                results = future.result() if future.done() and not future.exception() else []
+                skipped_count += len(thread_comments) - len(results)
+                still_pending.extend(comment['id'] for comment in thread_comments[len(results):])
+                for comment, note_id in results:
+                    if note_id is None:
+                        skipped_count += 1
+                        still_pending.append(comment['id'])
+                        continue
+                    if comment['id'] in self.comment_mappings:
+                        updated_count += 1
+                    else:
+                        self.comment_mappings.set(comment['id'], note_id)
+                        created_count += 1
+                    self.comment_mappings.set_fingerprint(comment['id'], text_fingerprint(self.build_note_body(comment)))
+            
+            # Commit em lote dos mapeamentos ao final da fase
+            try:
+                self.comment_mappings.flush()
+                mappings_saved = True
+            except Exception as e:
+                self.log(f"❌ Erro ao salvar mapeamento de comentários: {str(e)}", "ERROR")
+                mappings_saved = False
+        
+        # Watermark avança após uma listagem completa; comentários que falharam ficam pendentes por id
+        # e são retentados na próxima execução, sem prender o watermark dos demais
+        if mappings_saved:
+            if listing_complete:
+                self.state.set_watermark(GITHUB_COMMENTS, run_started_at)
+            else:
+                self.log("⚠️ Listagem de comentários incompleta - watermark mantido para nova tentativa", "WARN")
+            self.state.set_pending(GITHUB_COMMENTS, still_pending)
+            self.state.save()
+            if still_pending:
+                self.log(f"⚠️ {len(set(still_pending))} comentários pendentes para a próxima execução", "WARN")
+        else:
+            self.log("⚠️ Mapeamentos de comentários não gravados - watermark mantido para nova tentativa", "WARN")
+        
+        # Relatório final
+        total_processed = created_count + updated_count + skipped_count + unchanged_count
+        self.log(f"✅ Sincronização de comentários concluída:")
+        self.log(f"   📊 Total processados: {total_processed}")
+        self.log(f"   ➕ Criados: {created_count}")
+        self.log(f"   🔄 Editados: {updated_count}")
+        self.log(f"   ✔️ Sem alterações: {unchanged_count}")
+        self.log(f"   ⏭️ Ignorados: {skipped_count}")
+        
+        self.last_summary = SyncSummary(created=created_count, updated=updated_count, skipped=skipped_count,
+                                        unchanged=unchanged_count)
+        return self.last_summary
+
+    def generate_comments_report(self):
+        """Gera relatório específico de comentários"""
+        summary = self.last_summary or SyncSummary()
+        report = f"""## 💬 Relatório de Comentários - {datetime.now().strftime('%d/%m/%Y %H:%M')}
+
+### Notas no GitLab
+- **Comentários mapeados**: {len(self.comment_mappings)}
+- **Criadas nesta execução**: {summary.created}
+- **Editadas nesta execução**: {summary.updated}
+- **Pendentes**: {summary.skipped}
+"""
+        print(report)
+        return report
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Sincronização de comentários GitHub → GitLab AGES")
+    parser.add_argument('--resume', action='store_true',
+                        help="aceito por compatibilidade; comentários já confirmados nunca são reenviados")
+    args = parser.parse_args()
+
+    try:
+        syncer = GitHubCommentsSyncer()
+        with span('comments'):
+            syncer.sync_comments(resume=args.resume)
+        syncer.generate_comments_report()
+
+    except Exception as e:
+        print(f"❌ ERRO CRÍTICO na sincronização de comentários: {str(e)}")
+        exit(1)
+
+    finally:
+        export_metrics()
+
+if __name__ == "__main__":
+    main()
@@ -7,67 +7,84 @@ Para uso no projeto Pro-Mata PUCRS
 
 import os
 import json
-import requests
+import argparse
 import gitlab
 import subprocess
 import sys
+from dataclasses import asdict
 from datetime import datetime
+from urllib.parse import urlparse
 from typing import Dict, List, Optional
 
+from promata_sync.branches import BranchIndex
+from promata_sync.github_graphql import GitHubGraphQLFetcher
+from promata_sync.http_cache import get_github_cache
+from promata_sync.http_client import GITHUB_API_URL, build_gitlab_client, get_session
+from promata_sync.labels import DEFAULT_LABELS, LabelIndex
+from promata_sync.loader import load_script
+from promata_sync.metrics import export_metrics, span
+from promata_sync.mirror import MirrorEngine, MirrorReport, RefUpdate
+from promata_sync.plan import LABELS, MIRROR, PLAN_FILE, PlannedAction, SyncPlan, run_actions
+from promata_sync.projects import PROMATA_GROUP_ID, gitlab_repo_name
+from promata_sync.results import PhaseResult, SyncError
+from promata_sync.snapshot import ItemCounts, RunSnapshot, count_gitlab_issues, count_gitlab_mrs
+
 class ProMataCompleteSyncer:
-    def __init__(self):
+    def __init__(self, resume: bool = False, gl=None, project=None, dry_run: bool = False):
         """Inicializa o sincronizador completo"""
+        self.resume = resume
+        self.dry_run = dry_run
         self.git_token = os.environ.get('GIT_TOKEN')
         self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
         self.gitlab_token = os.environ.get('GITLAB_TOKEN')
         self.gitlab_project_id = os.environ.get('GITLAB_PROJECT_ID')
         self.repo_name = os.environ.get('GITHUB_REPOSITORY')
         
-        # Validar configurações
-        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id, self.repo_name]):
+        # Validar configurações (projeto pode ser injetado pelo modo multi-repo)
+        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id or project, self.repo_name]):
             raise ValueError("Configurações incompletas. Verifique os secrets.")
         
-        # Clientes API
-        self.gl = gitlab.Gitlab(self.gitlab_url, private_token=self.gitlab_token)
-        
-        # Validar acesso ao GitLab antes de buscar o projeto
-        try:
-            self.gl.auth()
-            self.log(f"✅ Conectado ao GitLab: {self.gitlab_url}")
-        except Exception as e:
-            raise ValueError(f"❌ Erro de autenticação GitLab: {str(e)}")
+        # Clientes API (cliente injetado já foi autenticado pelo processo que resolveu os projetos)
+        if gl is not None:
+            self.gl = gl
+        else:
+            self.gl = build_gitlab_client(self.gitlab_url, self.gitlab_token)
+            
+            # Validar acesso ao GitLab antes de buscar o projeto
+            try:
+                self.gl.auth()
+                self.log(f"✅ Conectado ao GitLab: {self.gitlab_url}")
+            except Exception as e:
+                raise ValueError(f"❌ Erro de autenticação GitLab: {str(e)}")
         
         # Determinar nome do projeto baseado no repositório
-        repo_path = self.repo_name.split('/')[-1]
-        repo_mapping = {
-            'frontend': 'frontend',
-            'backend': 'backend', 
-            'infrastructure': 'infra',
-            'database': 'database'
-        }
-        self.gitlab_repo_name = repo_mapping.get(repo_path, repo_path)
+        self.gitlab_repo_name = gitlab_repo_name(self.repo_name)
         
         # Tentar acessar o projeto ou criar se não existir
         try:
+            self.project = project
+            
             # Se GITLAB_PROJECT_ID for fornecido, tentar usar
-            if self.gitlab_project_id and self.gitlab_project_id != '1735':
+            if not self.project and self.gitlab_project_id != str(PROMATA_GROUP_ID):
                 try:
                     self.project = self.gl.projects.get(self.gitlab_project_id)
                     self.log(f"✅ Projeto encontrado: {self.project.name}")
                 except gitlab.exceptions.GitlabGetError:
                     self.log(f"⚠️ Projeto ID {self.gitlab_project_id} não encontrado, tentando buscar por nome...")
                     self.project = None
-            else:
-                self.project = None
             
             # Se não encontrou projeto, buscar por nome no grupo
             if not self.project:
-                group = self.gl.groups.get(1735)  # Group ID do Pró-Mata
+                group = self.gl.groups.get(PROMATA_GROUP_ID)  # Group ID do Pró-Mata
                 projects = group.projects.list(search=self.gitlab_repo_name)
                 
                 if projects:
                     self.project = self.gl.projects.get(projects[0].id)
                     self.log(f"✅ Projeto encontrado por nome: {self.project.name} (ID: {self.project.id})")
+                elif self.dry_run:
+                    # Sem projeto não há o que planejar: a criação fica para uma execução real
+                    raise ValueError(f"projeto '{self.gitlab_repo_name}' não existe no grupo Pró-Mata e seria "
+                                     f"criado; --dry-run não cria projetos, execute sem --dry-run primeiro")
                 else:
                     # Criar projeto automaticamente
                     self.log(f"📝 Criando projeto '{self.gitlab_repo_name}' no grupo Pró-Mata...")
@@ -80,6 +97,16 @@ class ProMataCompleteSyncer:
             'Authorization': f'token {self.git_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
+        self.http = get_session()
+        self.github_cache = get_github_cache()
+        self.gitlab_host = urlparse(self.gitlab_url).netloc
+        
+        # Estado compartilhado com os syncers de issues/PRs executados em processo
+        self.snapshot = RunSnapshot()
+        self.phase_results: List[PhaseResult] = []
+        self.branch_index = BranchIndex(self.project)
+        self.label_index = LabelIndex(self.project)
+        self.mirror_report: Optional[MirrorReport] = None
 
     def _create_project_in_group(self, group):
         """Cria um novo projeto no grupo GitLab"""
@@ -132,154 +159,142 @@ class ProMataCompleteSyncer:
         elif level == "SUCCESS":
             print(f"::notice::{message}")
 
+    def _gitlab_remote_url(self) -> str:
+        """URL autenticada do projeto no GitLab"""
+        return f"https://oauth2:{self.gitlab_token}@{self.gitlab_url.replace('https://', '')}/pro-mata/{self.gitlab_repo_name}.git"
+
+    def _configure_gitlab_remote(self):
+        """(Re)cria o remote `gitlab` apontando para o projeto já identificado/criado"""
+        gitlab_remote_url = self._gitlab_remote_url()
+                            
+        # Remover remote se existir
+        subprocess.run(['git', 'remote', 'remove', 'gitlab'], capture_output=True, check=False)
+        
+        # Adicionar remote GitLab
+        result = subprocess.run(['git', 'remote', 'add', 'gitlab', gitlab_remote_url], 
+                             capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            self.log(f"Aviso ao adicionar remote: {result.stderr}")
+        
+        self.log(f"🔗 Remote GitLab configurado: {self.project.web_url}")
+
     def mirror_repository(self):
         """Espelha o repositório completo para o GitLab"""
         self.log("🔄 Iniciando espelhamento do repositório...")
         
         try:
-            # Usar o projeto GitLab correto já identificado/criado
-            gitlab_remote_url = f"https://oauth2:{self.gitlab_token}@{self.gitlab_url.replace('https://', '')}/pro-mata/{self.gitlab_repo_name}.git"
-                                
-            # Remover remote se existir
-            subprocess.run(['git', 'remote', 'remove', 'gitlab'], capture_output=True, check=False)
+            self._configure_gitlab_remote()
             
-            # Adicionar remote GitLab
-            result = subprocess.run(['git', 'remote', 'add', 'gitlab', gitlab_remote_url], 
-                                 capture_output=True, text=True)
+            # Enviar apenas as refs que mudaram desde o último espelhamento
+            report = MirrorEngine(remote='gitlab').mirror()
+            self.mirror_report = report
             
-            if result.returncode != 0:
-                self.log(f"Aviso ao adicionar remote: {result.stderr}")
+            if report.error and not report.updates:
+                self.log(f"❌ Erro ao comparar refs com o GitLab: {report.error}", "ERROR")
+                return
             
-            self.log(f"🔗 Remote GitLab configurado: {self.project.web_url}")
+            self.log(f"🔍 Refs comparadas em {report.compare_seconds:.1f}s: {len(report.updates)} alteradas")
+            for update in report.updates:
+                self.log(f"   {update.action:<6} {update.ref}: {update.status} {update.summary}".rstrip())
             
-            # Push de todas as branches
-            result = subprocess.run(['git', 'push', 'gitlab', '--all', '--force'], 
-                                  capture_output=True, text=True)
+            if report.updates:
+                self.log(f"⏱️ Push em lote concluído em {report.push_seconds:.1f}s")
             
-            if result.returncode == 0:
-                self.log("✅ Branches sincronizadas com sucesso")
+            if report.ok:
+                self.log("✅ Branches e tags sincronizadas com sucesso")
             else:
-                self.log(f"❌ Erro ao sincronizar branches: {result.stderr}", "ERROR")
-            
-            # Push de todas as tags
-            result = subprocess.run(['git', 'push', 'gitlab', '--tags', '--force'], 
-                                  capture_output=True, text=True)
+                self.log(f"❌ Erro ao sincronizar refs: {report.error or 'refs rejeitadas'}", "ERROR")
             
-            if result.returncode == 0:
-                self.log("✅ Tags sincronizadas com sucesso")
-            else:
-                self.log(f"Aviso ao sincronizar tags: {result.stderr}")
+            # Índice de branches do GitLab derivado do ls-remote + refs enviadas
+            self.branch_index.seed(report.remote_refs)
+            self.branch_index.apply_ref_updates(
+                [u.ref for u in report.updates if u.status == 'ok' and u.action != 'delete'],
+                report.refs_with_status('ok', 'delete'),
+            )
                 
         except Exception as e:
             self.log(f"❌ Erro no espelhamento: {str(e)}", "ERROR")
 
     def setup_gitlab_labels(self):
-        """Configura labels padrão no GitLab (seguindo padrão CP-Planta)"""
+        """Configura labels padrão no GitLab (seguindo padrão CP-Planta), criando apenas as ausentes"""
         self.log("🏷️ Configurando labels no GitLab...")
         
-        default_labels = [
-            {'name': 'bug', 'color': '#d73a4a', 'description': 'Erro ou problema no sistema'},
-            {'name': 'enhancement', 'color': '#a2eeef', 'description': 'Nova funcionalidade ou melhoria'},
-            {'name': 'documentation', 'color': '#0075ca', 'description': 'Relacionado à documentação'},
-            {'name': 'IMPORTANTE', 'color': '#b60205', 'description': 'Alta prioridade'},
-            {'name': 'Débito Técnico', 'color': '#fbca04', 'description': 'Débito técnico'},
-            {'name': 'frontend', 'color': '#7057ff', 'description': 'Frontend React'},
-            {'name': 'backend', 'color': '#ff6b00', 'description': 'Backend Spring Boot'},
-            {'name': 'infraestrutura', 'color': '#006b75', 'description': 'Infraestrutura e DevOps'},
-            {'name': 'Finalizada', 'color': '#0e8a16', 'description': 'Tarefa finalizada'},
-            {'name': 'Integração', 'color': '#1d76db', 'description': 'Integração entre sistemas'},
-            {'name': 'github-sync', 'color': '#24292f', 'description': 'Sincronizado do GitHub'},
-        ]
-        
-        created_count = 0
-        
-        for label_data in default_labels:
-            try:
-                self.project.labels.create(label_data)
-                created_count += 1
-                self.log(f"Label criada: {label_data['name']}")
-            except Exception:
-                # Label já existe
-                pass
+        try:
+            created = self.label_index.ensure(DEFAULT_LABELS)
+        except Exception as e:
+            self.log(f"❌ Erro ao configurar labels: {str(e)}", "ERROR")
+            return
         
-        self.log(f"✅ Labels configuradas: {created_count} novas criadas")
-
-    def run_issues_sync(self):
-        """Executa sincronização de issues via script separado"""
-        self.log("📋 Executando sincronização de issues...")
+        for name in created:
+            self.log(f"Label criada: {name}")
         
+        self.log(f"✅ Labels configuradas: {len(created)} novas criadas ({len(self.label_index)} no projeto)")
+
+    def _phase_syncer(self, script: str, syncer_class: str, **syncer_kwargs):
+        """Instancia um syncer de fase reutilizando cliente GitLab, projeto e snapshot"""
+        module = load_script(script)
+        return getattr(module, syncer_class)(gl=self.gl, project=self.project, snapshot=self.snapshot,
+                                             **syncer_kwargs)
+
+    def _run_sync_phase(self, phase: str, script: str, syncer_class: str, sync_method: str, report_method: str,
+                        **syncer_kwargs) -> PhaseResult:
+        """Executa um syncer no mesmo processo reutilizando cliente GitLab, projeto e snapshot"""
         try:
-            result = subprocess.run([
-                sys.executable, 
-                'scripts/sync-issues.py'
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                self.log("✅ Sincronização de issues concluída")
-                # Mostrar saída do script
-                if result.stdout:
-                    print(result.stdout)
-                return True
-            else:
-                # Se não há issues para sincronizar, não é erro crítico
-                if "no issues found" in result.stderr.lower() or not result.stderr.strip():
-                    self.log("ℹ️ Nenhuma issue encontrada para sincronizar (normal para repositórios novos)")
-                    return True
-                else:
-                    self.log(f"⚠️ Aviso na sincronização de issues: {result.stderr}", "WARN")
-                    return True  # Não falhar por issues
-                
-        except FileNotFoundError:
-            self.log("ℹ️ Script sync-issues.py não encontrado - pulando sincronização de issues")
-            return True
+            syncer = self._phase_syncer(script, syncer_class, **syncer_kwargs)
+            summary = getattr(syncer, sync_method)(resume=self.resume)
+            getattr(syncer, report_method)()
+            result = PhaseResult(phase=phase, ok=True, summary=summary)
         except Exception as e:
-            self.log(f"⚠️ Erro na sincronização de issues: {str(e)}", "WARN")
-            return True  # Não falhar por issues
+            error = SyncError.from_exception(phase, e)
+            self.log(f"⚠️ Erro na sincronização de {phase}: {error.error_type}: {error.message}", "WARN")
+            result = PhaseResult(phase=phase, ok=False, errors=[error])
+        
+        self.phase_results.append(result)
+        return result
+
+    def run_issues_sync(self) -> PhaseResult:
+        """Executa sincronização de issues no mesmo processo"""
+        self.log("📋 Executando sincronização de issues...")
+        
+        result = self._run_sync_phase('issues', 'sync-issues.py', 'GitHubIssuesSyncer',
+                                      'sync_issues', 'generate_issues_report',
+                                      label_index=self.label_index)
+        if result.ok:
+            self.log("✅ Sincronização de issues concluída")
+        return result
 
-    def run_prs_sync(self):
-        """Executa sincronização de PRs via script separado"""
+    def run_prs_sync(self) -> PhaseResult:
+        """Executa sincronização de PRs no mesmo processo"""
         self.log("🔄 Executando sincronização de Pull Requests...")
         
-        try:
-            result = subprocess.run([
-                sys.executable, 
-                'scripts/sync-prs.py'
-            ], capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                self.log("✅ Sincronização de PRs concluída")
-                # Mostrar saída do script
-                if result.stdout:
-                    print(result.stdout)
-                return True
-            else:
-                # Se não há PRs para sincronizar, não é erro crítico
-                if "no pull requests found" in result.stderr.lower() or not result.stderr.strip():
-                    self.log("ℹ️ Nenhum PR encontrado para sincronizar (normal para repositórios novos)")
-                    return True
-                else:
-                    self.log(f"⚠️ Aviso na sincronização de PRs: {result.stderr}", "WARN")
-                    return True  # Não falhar por PRs
-                
-        except FileNotFoundError:
-            self.log("ℹ️ Script sync-prs.py não encontrado - pulando sincronização de PRs")
-            return True
-        except Exception as e:
-            self.log(f"⚠️ Erro na sincronização de PRs: {str(e)}", "WARN")
-            return True  # Não falhar por PRs
+        result = self._run_sync_phase('pull requests', 'sync-prs.py', 'GitHubPRSyncer',
+                                      'sync_pull_requests', 'generate_prs_report',
+                                      branch_index=self.branch_index, label_index=self.label_index)
+        if result.ok:
+            self.log("✅ Sincronização de PRs concluída")
+        return result
+
+    def run_comments_sync(self) -> PhaseResult:
+        """Executa sincronização de comentários no mesmo processo (após issues e PRs mapeados)"""
+        self.log("🔄 Executando sincronização de comentários...")
+        
+        result = self._run_sync_phase('comentários', 'sync-comments.py', 'GitHubCommentsSyncer',
+                                      'sync_comments', 'generate_comments_report')
+        if result.ok:
+            self.log("✅ Sincronização de comentários concluída")
+        return result
 
     def generate_complete_report(self):
         """Gera relatório completo de sincronização"""
         self.log("📊 Gerando relatório completo de sincronização...")
         
         try:
-            # Obter estatísticas do GitHub
-            github_issues = self._get_github_stats('issues')
-            github_prs = self._get_github_stats('pulls')
-            
-            # Obter estatísticas do GitLab
-            gitlab_issues = self.project.issues.list(all=True)
-            gitlab_mrs = self.project.mergerequests.list(all=True)
+            # Contagens das fases de issues/PRs ou, em modo incremental, dos endpoints de contagem
+            github_issues = self.snapshot.get_or_fetch('github_issues', self._get_github_stats)
+            github_prs = self.snapshot.get_or_fetch('github_prs', self._get_github_stats)
+            gitlab_issues = self.snapshot.get_or_fetch('gitlab_issues', lambda: count_gitlab_issues(self.project))
+            gitlab_mrs = self.snapshot.get_or_fetch('gitlab_mrs', lambda: count_gitlab_mrs(self.project))
             
             # Informações do repositório
             repo_info = self._get_repo_info()
@@ -300,30 +315,30 @@ class ProMataCompleteSyncer:
 ## 📋 Issues
 
 ### GitHub Issues
-- **Total**: {len(github_issues)}
-- **Abertas**: {sum(1 for i in github_issues if i['state'] == 'open')}
-- **Fechadas**: {sum(1 for i in github_issues if i['state'] == 'closed')}
+- **Total**: {github_issues.total}
+- **Abertas**: {github_issues.states['open']}
+- **Fechadas**: {github_issues.states['closed']}
 
 ### GitLab Issues  
-- **Total**: {len(gitlab_issues)}
-- **Abertas**: {sum(1 for i in gitlab_issues if i.state == 'opened')}
-- **Fechadas**: {sum(1 for i in gitlab_issues if i.state == 'closed')}
+- **Total**: {gitlab_issues.total}
+- **Abertas**: {gitlab_issues.states['opened']}
+- **Fechadas**: {gitlab_issues.states['closed']}
 
-**Status de Sincronização**: {'✅ Sincronizado' if len(gitlab_issues) >= len(github_issues) else '⚠️ Pendente'}
+**Status de Sincronização**: {'✅ Sincronizado' if gitlab_issues.total >= github_issues.total else '⚠️ Pendente'}
 
 ## 🔄 Pull/Merge Requests
 
 ### GitHub Pull Requests
-- **Total**: {len(github_prs)}
-- **Abertos**: {sum(1 for p in github_prs if p['state'] == 'open')}
-- **Fechados**: {sum(1 for p in github_prs if p['state'] == 'closed')}
+- **Total**: {github_prs.total}
+- **Abertos**: {github_prs.states['open']}
+- **Fechados**: {github_prs.states['closed']}
 
 ### GitLab Merge Requests
-- **Total**: {len(gitlab_mrs)}
-- **Abertos**: {sum(1 for m in gitlab_mrs if m.state == 'opened')}
-- **Fechados**: {sum(1 for m in gitlab_mrs if m.state == 'closed')}
+- **Total**: {gitlab_mrs.total}
+- **Abertos**: {gitlab_mrs.states['opened']}
+- **Fechados**: {gitlab_mrs.states['closed']}
 
-**Status de Sincronização**: {'✅ Sincronizado' if len(gitlab_mrs) >= len(github_prs) else '⚠️ Pendente'}
+**Status de Sincronização**: {'✅ Sincronizado' if gitlab_mrs.total >= github_prs.total else '⚠️ Pendente'}
 
 ## 🔗 Links Úteis
 
@@ -337,8 +352,8 @@ class ProMataCompleteSyncer:
 
 - **Repositório**: ✅ Espelhado
 - **Labels**: ✅ Configuradas
-- **Issues**: {'✅ Sincronizadas' if len(gitlab_issues) >= len(github_issues) else '⚠️ Pendentes'}
-- **Pull Requests**: {'✅ Sincronizados' if len(gitlab_mrs) >= len(github_prs) else '⚠️ Pendentes'}
+- **Issues**: {'✅ Sincronizadas' if gitlab_issues.total >= github_issues.total else '⚠️ Pendentes'}
+- **Pull Requests**: {'✅ Sincronizados' if gitlab_mrs.total >= github_prs.total else '⚠️ Pendentes'}
 
 ---
 *Última sincronização: {datetime.now().isoformat()}*
@@ -355,74 +370,163 @@ class ProMataCompleteSyncer:
         except Exception as e:
             self.log(f"❌ Erro ao gerar relatório: {str(e)}", "ERROR")
 
-    def _get_github_stats(self, endpoint: str) -> List[Dict]:
-        """Helper para obter estatísticas do GitHub"""
-        try:
-            url = f"https://api.github.com/repos/{self.repo_name}/{endpoint}"
-            params = {'state': 'all', 'per_page': 100}
-            
-            items = []
-            page = 1
-            
-            while page <= 5:  # Limitar a 5 páginas
-                params['page'] = page
-                response = requests.get(url, headers=self.github_headers, params=params)
-                response.raise_for_status()
-                
-                page_items = response.json()
-                if not page_items:
-                    break
-                    
-                if endpoint == 'issues':
-                    # Filtrar apenas issues (não PRs)
-                    items.extend([item for item in page_items if 'pull_request' not in item])
-                else:
-                    items.extend(page_items)
-                    
-                page += 1
-                
-            return items
-            
-        except Exception as e:
-            self.log(f"❌ Erro ao buscar {endpoint}: {str(e)}", "ERROR")
-            return []
+    def _get_github_stats(self) -> Dict[str, ItemCounts]:
+        """Helper para obter estatísticas do GitHub (contagens de issues e PRs em uma consulta GraphQL)"""
+        github_issues, github_prs = GitHubGraphQLFetcher(self.http, self.github_headers, self.repo_name).fetch_counts()
+        return {'github_issues': github_issues, 'github_prs': github_prs}
 
     def _get_repo_info(self) -> Dict:
         """Obtém informações básicas do repositório"""
         try:
-            url = f"https://api.github.com/repos/{self.repo_name}"
-            response = requests.get(url, headers=self.github_headers)
+            url = f"{GITHUB_API_URL}/repos/{self.repo_name}"
+            response = self.http.get(url, headers=self.github_headers)
             response.raise_for_status()
             return response.json()
         except Exception:
             return {}
 
+    def plan_gitlab_labels(self, plan: SyncPlan):
+        """Planeja a criação das labels padrão ausentes no GitLab"""
+        try:
+            for label in self.label_index.missing(DEFAULT_LABELS):
+                plan.add_label(label, self.gitlab_host)
+        except Exception as e:
+            self.log(f"❌ Erro ao listar labels: {str(e)}", "ERROR")
+
+    def plan_mirror(self, plan: SyncPlan):
+        """Planeja o push das refs alteradas; o índice de branches passa a refletir o estado após o push"""
+        try:
+            # ls-remote direto na URL: o dry-run não altera a configuração git do checkout
+            report = MirrorEngine(remote=self._gitlab_remote_url()).compare()
+            if report.error:
+                self.log(f"❌ Erro ao comparar refs com o GitLab: {report.error}", "ERROR")
+                return
+            
+            self.log(f"🔍 Refs comparadas em {report.compare_seconds:.1f}s: {len(report.updates)} alteradas")
+            if report.updates:
+                refs = ', '.join(f"{u.action} {u.ref}" for u in report.updates[:5])
+                more = f" e mais {len(report.updates) - 5}" if len(report.updates) > 5 else ""
+                plan.add(MIRROR, 'push', f"{len(report.updates)} refs: {refs}{more}", self.gitlab_host,
+                         payload={'updates': [asdict(update) for update in report.updates]})
+            
+            # MRs planejados usam as branches que existirão no GitLab após o push
+            self.branch_index.seed(report.remote_refs)
+            self.branch_index.apply_ref_updates(
+                [u.ref for u in report.updates if u.action != 'delete'],
+                [u.ref for u in report.updates if u.action == 'delete'],
+            )
+                
+        except Exception as e:
+            self.log(f"❌ Erro ao planejar espelhamento: {str(e)}", "ERROR")
+
+    def build_plan(self) -> SyncPlan:
+        """Monta o plano completo (labels, refs, issues, MRs e notas) sem escrever no GitLab"""
+        self.log("🗂️ Planejando sincronização completa GitHub → GitLab AGES (dry-run)")
+        plan = SyncPlan(repo=self.repo_name, project_id=self.project.id)
+        
+        with span('labels'):
+            self.plan_gitlab_labels(plan)
+        
+        with span('mirror'):
+            self.plan_mirror(plan)
+        
+        phases = (
+            ('issues', 'sync-issues.py', 'GitHubIssuesSyncer', 'plan_issues', {'label_index': self.label_index}),
+            ('prs', 'sync-prs.py', 'GitHubPRSyncer', 'plan_pull_requests', {'branch_index': self.branch_index, 'label_index': self.label_index}),
+        )
+        for phase, script, syncer_class, plan_method, syncer_kwargs in phases:
+            with span(phase):
+                try:
+                    getattr(self._phase_syncer(script, syncer_class, **syncer_kwargs), plan_method)(plan)
+                except Exception as e:
+                    self.log(f"⚠️ Erro ao planejar {phase}: {str(e)}", "WARN")
+        
+        return plan
+
+    def _apply_label(self, action: PlannedAction):
+        self.label_index.ensure([action.payload])
+
+    def _apply_mirror(self, action: PlannedAction):
+        """Envia as refs planejadas em um único push"""
+        self._configure_gitlab_remote()
+        updates = [RefUpdate(**update) for update in action.payload['updates']]
+        result = MirrorEngine(remote='gitlab').push(updates)
+        rejected = [u.ref for u in updates if u.status == 'rejected']
+        if result.returncode != 0 or rejected:
+            raise RuntimeError(result.stderr.strip() or f"refs rejeitadas: {', '.join(rejected)}")
+        self.log(f"✅ {len(updates)} refs enviadas ao GitLab")
+
+    def apply_plan(self, plan: SyncPlan, plan_path: str) -> bool:
+        """Aplica o plano na ordem labels → refs → issues → MRs; retorna True se nada falhou"""
+        self.log(f"▶️ Aplicando plano gerado em {plan.created_at}...")
+        
+        def save():
+            plan.save(plan_path)
+        
+        with span('labels'):
+            failed = run_actions(plan.pending(LABELS), self.gitlab_host, self._apply_label, lambda action: None, save)
+        
+        with span('mirror'):
+            failed += run_actions(plan.pending(MIRROR), self.gitlab_host, self._apply_mirror, lambda action: None, save)
+        
+        phases = (
+            ('issues', 'sync-issues.py', 'GitHubIssuesSyncer', {'label_index': self.label_index}),
+            ('prs', 'sync-prs.py', 'GitHubPRSyncer', {'branch_index': self.branch_index, 'label_index': self.label_index}),
+        )
+        for phase, script, syncer_class, syncer_kwargs in phases:
+            with span(phase):
+                try:
+                    if not self._phase_syncer(script, syncer_class, **syncer_kwargs).apply_plan(plan, plan_path):
+                        failed += 1
+                except Exception as e:
+                    self.log(f"⚠️ Erro ao aplicar {phase}: {str(e)}", "WARN")
+                    failed += 1
+        
+        if failed:
+            self.log(f"⚠️ Plano aplicado com falhas - execute --apply {plan_path} novamente para repetir as pendentes", "WARN")
+        else:
+            self.log("🎉 Plano aplicado com TOTAL sucesso!")
+        return failed == 0
+
     def run_complete_sync(self):
         """Executa sincronização completa"""
         self.log("🚀 Iniciando sincronização completa GitHub → GitLab AGES")
         
         success_count = 0
-        total_steps = 5
+        total_steps = 6
         
         try:
             # 1. Configurar labels
-            self.setup_gitlab_labels()
+            with span('labels'):
+                self.setup_gitlab_labels()
             success_count += 1
             
             # 2. Espelhar repositório
-            self.mirror_repository()
+            with span('mirror'):
+                self.mirror_repository()
             success_count += 1
             
-            # 3. Sincronizar issues (sempre conta como sucesso)
-            if self.run_issues_sync():
+            # 3. Sincronizar issues (falhas não interrompem a execução)
+            with span('issues'):
+                issues_ok = self.run_issues_sync().ok
+            if issues_ok:
                 success_count += 1
             
-            # 4. Sincronizar PRs (sempre conta como sucesso)
-            if self.run_prs_sync():
+            # 4. Sincronizar PRs (falhas não interrompem a execução)
+            with span('prs'):
+                prs_ok = self.run_prs_sync().ok
+            if prs_ok:
                 success_count += 1
                 
-            # 5. Gerar relatório
-            self.generate_complete_report()
+            # 5. Sincronizar comentários nas issues/MRs mapeados
+            with span('comments'):
+                comments_ok = self.run_comments_sync().ok
+            if comments_ok:
+                success_count += 1
+            
+            # 6. Gerar relatório
+            with span('report'):
+                self.generate_complete_report()
             success_count += 1
             
             # Resultado final
@@ -443,9 +547,34 @@ class ProMataCompleteSyncer:
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Sincronização completa GitHub → GitLab AGES")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', action='store_true',
+                      help="retoma as fases de issues/PRs interrompidas a partir dos checkpoints")
+    mode.add_argument('--dry-run', nargs='?', const=PLAN_FILE, metavar='PLAN',
+                      help=f"apenas planeja labels, refs, issues e MRs e grava o plano em PLAN (padrão: {PLAN_FILE})")
+    mode.add_argument('--apply', metavar='PLAN',
+                      help="executa um plano gerado com --dry-run")
+    args = parser.parse_args()
+    
     try:
-        syncer = ProMataCompleteSyncer()
-        success = syncer.run_complete_sync()
+        syncer = ProMataCompleteSyncer(resume=args.resume, dry_run=bool(args.dry_run))
+        
+        if args.dry_run:
+            with span('plan'):
+                plan = syncer.build_plan()
+            plan.publish(args.dry_run)
+            syncer.log(f"🗂️ Plano gravado em {args.dry_run}")
+            return
+        
+        if args.apply:
+            plan = SyncPlan.load(args.apply, syncer.repo_name, syncer.project.id)
+            with span('apply'):
+                success = syncer.apply_plan(plan, args.apply)
+            print(plan.render())
+        else:
+            with span('complete'):
+                success = syncer.run_complete_sync()
         
         if not success:
             sys.exit(1)
@@ -453,6 +582,9 @@ def main():
     except Exception as e:
         print(f"❌ ERRO CRÍTICO: {str(e)}")
         sys.exit(1)
+    
+    finally:
+        export_metrics()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
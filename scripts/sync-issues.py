@@ -5,14 +5,38 @@ Para uso no projeto Pro-Mata PUCRS
 """
 
 import os
-import json
-import requests
-import gitlab
+import argparse
 from datetime import datetime
-from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from promata_sync.checkpoint import CHECKPOINT_BATCH_SIZE, ISSUES_CHECKPOINT_FILE, Checkpoint
+from promata_sync.executor import WriteExecutor
+from promata_sync.fingerprint import content_fingerprint
+from promata_sync.github_graphql import GitHubGraphQLFetcher, graphql_backend_enabled
+from promata_sync.gitlab_pagination import GitLabIndex, find_synced_item, iter_gitlab
+from promata_sync.http_cache import get_github_cache
+from promata_sync.http_client import GITHUB_API_URL, build_gitlab_client, get_session
+from promata_sync.labels import SYNC_LABEL, SYNC_LABEL_SPEC, LabelIndex, labels_from_items
+from promata_sync.mapping_store import ISSUE_MAPPING_FILE, MappingStore
+from promata_sync.metrics import export_metrics, span
+from promata_sync.models import GitHubIssue, GitLabIssue
+from promata_sync.pagination import iter_pages
+from promata_sync.pipeline import PageStream
+from promata_sync.plan import DONE, ISSUES, LABELS, PLAN_FILE, PlannedAction, SyncPlan, run_actions
+from promata_sync.results import SyncSummary
+from promata_sync.snapshot import ItemCounts, RunSnapshot, count_gitlab_issues
+from promata_sync.state import (
+    GITHUB_ISSUES,
+    GITLAB_ISSUES,
+    SyncState,
+    incremental_enabled,
+    utc_now_iso,
+)
 
 class GitHubIssuesSyncer:
-    def __init__(self):
+    def __init__(self, gl=None, project=None, snapshot: Optional[RunSnapshot] = None,
+                 label_index: Optional[LabelIndex] = None):
         """Inicializa o sincronizador de issues"""
         self.git_token = os.environ.get('GIT_TOKEN')
         self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
@@ -20,267 +44,596 @@ class GitHubIssuesSyncer:
         self.gitlab_project_id = os.environ.get('GITLAB_PROJECT_ID')
         self.repo_name = os.environ.get('GITHUB_REPOSITORY')
         
-        # Validar configurações
-        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id, self.repo_name]):
+        # Validar configurações (projeto pode ser injetado pelo syncer completo)
+        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id or project, self.repo_name]):
             raise ValueError("Configurações incompletas. Verifique os secrets.")
         
-        # Clientes API
-        self.gl = gitlab.Gitlab(self.gitlab_url, private_token=self.gitlab_token)
-        self.project = self.gl.projects.get(self.gitlab_project_id)
+        # Clientes API (reutiliza cliente/projeto já autenticados quando fornecidos)
+        self.gl = gl or build_gitlab_client(self.gitlab_url, self.gitlab_token)
+        self.project = project or self.gl.projects.get(self.gitlab_project_id)
+        self.snapshot = snapshot or RunSnapshot()
+        self.gitlab_host = urlparse(self.gitlab_url).netloc
         
         self.github_headers = {
             'Authorization': f'token {self.git_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
+        self.http = get_session()
+        self.github_cache = get_github_cache()
+        
+        # Backend GraphQL opcional (GITHUB_BACKEND=graphql)
+        self.graphql = GitHubGraphQLFetcher(self.http, self.github_headers, self.repo_name) if graphql_backend_enabled() else None
+        
+        # Labels do GitLab (listadas uma vez; compartilhadas com o syncer completo)
+        self.label_index = label_index if label_index is not None else LabelIndex(self.project)
+        
+        # Mapeamentos GitHub ↔ GitLab (flush único por fase)
+        self.issue_mappings = MappingStore(ISSUE_MAPPING_FILE)
+        
+        # Estado incremental (watermarks da última execução)
+        self.incremental = incremental_enabled()
+        self.state = SyncState()
 
     def log(self, message: str, level: str = "INFO"):
         """Log com timestamp"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] {level}: {message}")
 
-    def get_github_issues(self) -> List[Dict]:
-        """Busca issues do GitHub"""
+    def iter_github_issue_pages(self, since: Optional[str] = None) -> Iterator[List[GitHubIssue]]:
+        """Gera as issues do GitHub página a página, à medida que chegam (apenas as alteradas após `since`)"""
+        if self.graphql:
+            yield from self.graphql.iter_issue_pages(since=since)
+            return
+        
+        url = f"{GITHUB_API_URL}/repos/{self.repo_name}/issues"
+        params = {'state': 'all', 'per_page': 100}
+        if since:
+            params['since'] = since
+        
+        for page_issues in iter_pages(self.github_cache.get, url, headers=self.github_headers, params=params):
+            # Filtrar apenas issues (não PRs)
+            yield [GitHubIssue.from_rest(issue) for issue in page_issues if 'pull_request' not in issue]
+
+    def get_github_issues(self, since: Optional[str] = None) -> List[GitHubIssue]:
+        """Busca issues do GitHub (apenas as alteradas após `since`, se informado)"""
         try:
-            url = f"https://api.github.com/repos/{self.repo_name}/issues"
-            params = {'state': 'all', 'per_page': 100}
-            
-            issues = []
-            page = 1
-            
-            while True:
-                params['page'] = page
-                response = requests.get(url, headers=self.github_headers, params=params)
-                response.raise_for_status()
-                
-                page_issues = response.json()
-                if not page_issues:
-                    break
-                    
-                # Filtrar apenas issues (não PRs)
-                issues.extend([issue for issue in page_issues if 'pull_request' not in issue])
-                page += 1
-                
-                if page > 10:  # Limitar para evitar loops infinitos
-                    break
-                
-            self.log(f"Encontradas {len(issues)} issues no GitHub")
+            issues = [issue for page in self.iter_github_issue_pages(since=since) for issue in page]
+            self.log(f"Encontradas {len(issues)} issues no GitHub{' (GraphQL)' if self.graphql else ''}")
             return issues
             
         except Exception as e:
             self.log(f"❌ Erro ao buscar issues do GitHub: {str(e)}", "ERROR")
             return []
 
-    def get_gitlab_issues(self) -> List:
-        """Busca issues do GitLab"""
+    def iter_gitlab_issues(self, updated_after: Optional[str] = None) -> Iterator[GitLabIssue]:
+        """Itera as issues do GitLab sob demanda (apenas as alteradas após `updated_after`, se informado)"""
+        filters = {'updated_after': updated_after} if updated_after else {}
+        return (GitLabIssue.from_api(issue) for issue in iter_gitlab(self.project.issues, **filters))
+
+    def get_gitlab_issues(self, updated_after: Optional[str] = None) -> List[GitLabIssue]:
+        """Busca issues do GitLab (apenas as alteradas após `updated_after`, se informado)"""
         try:
-            issues = self.project.issues.list(all=True)
+            issues = list(self.iter_gitlab_issues(updated_after=updated_after))
             self.log(f"Encontradas {len(issues)} issues no GitLab")
             return issues
         except Exception as e:
             self.log(f"❌ Erro ao buscar issues do GitLab: {str(e)}", "ERROR")
             return []
 
-    def create_gitlab_issue(self, github_issue: Dict) -> Optional[object]:
-        """Cria issue no GitLab baseada na issue do GitHub"""
+    def count_github_items(self) -> Dict[str, ItemCounts]:
+        """Contagens de issues e PRs do GitHub em uma consulta GraphQL, sem listar os itens"""
+        fetcher = self.graphql or GitHubGraphQLFetcher(self.http, self.github_headers, self.repo_name)
+        github_issues, github_prs = fetcher.fetch_counts()
+        return {'github_issues': github_issues, 'github_prs': github_prs}
+
+    def get_gitlab_issue_index(self, updated_after: Optional[str] = None) -> GitLabIndex:
+        """Indexa as issues do GitLab por iid, marcador do GitHub e título à medida que as páginas chegam"""
         try:
-            # Manter título original
-            title = github_issue['title']
-            
-            # Criar descrição preservando conteúdo original
-            original_body = github_issue.get('body', '') or ''
-            
-            description = f"""{original_body}
+            index = GitLabIndex(self.iter_gitlab_issues(updated_after=updated_after))
+            self.log(f"Encontradas {len(index)} issues no GitLab ({len(index.by_github)} com marcador do GitHub)")
+            return index
+        except Exception as e:
+            self.log(f"❌ Erro ao buscar issues do GitLab: {str(e)}", "ERROR")
+            return GitLabIndex()
+
+    def provision_labels(self, github_issues: List[GitHubIssue]):
+        """Cria no GitLab apenas as labels ausentes entre as usadas pelas issues do GitHub"""
+        wanted = labels_from_items(github_issues) + [SYNC_LABEL_SPEC]
+        try:
+            created = self.label_index.ensure(wanted)
+            if created:
+                self.log(f"🏷️ Labels criadas no GitLab: {', '.join(created)}")
+        except Exception as e:
+            self.log(f"⚠️ Erro ao provisionar labels: {str(e)}", "WARN")
+
+    def _get_gitlab_issue(self, iid: int) -> Optional[GitLabIssue]:
+        """Busca uma única issue do GitLab pelo iid"""
+        try:
+            return GitLabIssue.from_api(self.project.issues.get(iid).attributes)
+        except Exception as e:
+            self.log(f"⚠️ Issue #{iid} não encontrada no GitLab: {str(e)}", "WARN")
+            return None
+
+    def build_issue_description(self, github_issue: GitHubIssue) -> str:
+        """Descrição da issue no GitLab preservando o conteúdo original"""
+        original_body = github_issue.body
+        
+        return f"""{original_body}
 
 ---
 ## 📋 Sincronizado do GitHub
 
-- 🔗 **Issue original**: {github_issue['html_url']}
-- 👤 **Autor**: @{github_issue['user']['login']} 
-- 📅 **Criado**: {github_issue['created_at']}
-- 🔢 **ID GitHub**: #{github_issue['number']}
-- 🏷️ **Estado**: {github_issue['state']}
+- 🔗 **Issue original**: {github_issue.html_url}
+- 👤 **Autor**: @{github_issue.author} 
+- 📅 **Criado**: {github_issue.created_at}
+- 🔢 **ID GitHub**: #{github_issue.number}
+- 🏷️ **Estado**: {github_issue.state}
 
 *Sincronizado automaticamente do GitHub para GitLab AGES*
 """
 
-            # Processar labels - manter originais + adicionar github-sync
-            labels = []
-            for label in github_issue.get('labels', []):
-                labels.append(label['name'])
-            
-            # Adicionar label de identificação
-            labels.append('github-sync')
-            
-            # Mapear estado para GitLab
-            state_event = 'close' if github_issue['state'] == 'closed' else None
-            
-            # Dados da issue para GitLab
-            issue_data = {
-                'title': title,
-                'description': description,
-                'labels': ','.join(labels) if labels else None,
-            }
-            
-            # Aplicar estado se necessário
-            if state_event:
-                issue_data['state_event'] = state_event
-            
-            # Criar issue no GitLab
-            gitlab_issue = self.project.issues.create(issue_data)
-            
-            self.log(f"✅ Issue criada: #{gitlab_issue.iid} - {title[:50]}...")
-            return gitlab_issue
+    def build_issue_labels(self, github_issue: GitHubIssue) -> List[str]:
+        """Labels originais + label de identificação github-sync"""
+        labels = [label.name for label in github_issue.labels]
+        labels.append(SYNC_LABEL)
+        return labels
+
+    def issue_fingerprint(self, github_issue: GitHubIssue) -> str:
+        """Impressão digital dos campos sincronizados (título, corpo, labels, estado)"""
+        return content_fingerprint(github_issue.title, github_issue.body,
+                                   self.build_issue_labels(github_issue), github_issue.state)
+
+    def issue_create_data(self, github_issue: GitHubIssue) -> Dict:
+        """Dados de criação da issue no GitLab (título original, descrição e labels)"""
+        return {
+            'title': github_issue.title,
+            'description': self.build_issue_description(github_issue),
+            'labels': ','.join(self.build_issue_labels(github_issue)),
+        }
+
+    def issue_changes(self, gitlab_issue: GitLabIssue, github_issue: GitHubIssue) -> Dict:
+        """Campos alterados a enviar em um único PUT (vazio se a issue já está sincronizada)"""
+        changes = {}
+        
+        if gitlab_issue.title != github_issue.title:
+            changes['title'] = github_issue.title
+        
+        description = self.build_issue_description(github_issue)
+        if gitlab_issue.description != description:
+            changes['description'] = description
+        
+        labels = self.build_issue_labels(github_issue)
+        if sorted(gitlab_issue.labels) != sorted(labels):
+            changes['labels'] = ','.join(labels)
+        
+        # Mapear estados GitHub → GitLab
+        should_be_closed = github_issue.state == 'closed'
+        is_closed = gitlab_issue.state == 'closed'
+        if should_be_closed and not is_closed:
+            changes['state_event'] = 'close'
+        elif not should_be_closed and is_closed:
+            changes['state_event'] = 'reopen'
+        
+        return changes
+
+    def _create_issue(self, issue_data: Dict, close: bool) -> GitLabIssue:
+        """Cria a issue e, se necessário, fecha em seguida (GitLab ignora state_event na criação)"""
+        gitlab_issue = GitLabIssue.from_api(self.project.issues.create(issue_data).attributes)
+        if close:
+            gitlab_issue.refresh(self.project.issues.update(gitlab_issue.iid, {'state_event': 'close'}))
+        self.log(f"✅ Issue criada: #{gitlab_issue.iid} - {issue_data['title'][:50]}...")
+        return gitlab_issue
+
+    def _send_issue_changes(self, iid: int, changes: Dict) -> Dict:
+        """Envia as alterações da issue em um único PUT e retorna a resposta do GitLab"""
+        response = self.project.issues.update(iid, changes)
+        
+        if changes.get('state_event') == 'close':
+            self.log(f"✅ Issue #{iid} fechada para sincronizar com GitHub")
+        elif changes.get('state_event') == 'reopen':
+            self.log(f"✅ Issue #{iid} reaberta para sincronizar com GitHub")
+        fields = [field for field in changes if field != 'state_event']
+        if fields:
+            self.log(f"✅ Issue #{iid} atualizada: {', '.join(fields)}")
+        return response
+
+    def create_gitlab_issue(self, github_issue: GitHubIssue) -> Optional[GitLabIssue]:
+        """Cria issue no GitLab baseada na issue do GitHub"""
+        try:
+            return self._create_issue(self.issue_create_data(github_issue), github_issue.state == 'closed')
             
         except Exception as e:
             self.log(f"❌ Erro ao criar issue GitLab: {str(e)}", "ERROR")
             return None
 
-    def update_gitlab_issue(self, gitlab_issue, github_issue: Dict):
-        """Atualiza issue existente no GitLab se necessário"""
+    def update_gitlab_issue(self, gitlab_issue: GitLabIssue, github_issue: GitHubIssue) -> bool:
+        """Atualiza issue existente no GitLab enviando todos os campos alterados em um único PUT"""
         try:
-            # Verificar se precisa atualizar estado
-            github_state = github_issue['state']
-            gitlab_state = gitlab_issue.state
-            
-            # Mapear estados GitHub → GitLab
-            should_be_closed = github_state == 'closed'
-            is_closed = gitlab_state == 'closed'
-            
-            if should_be_closed and not is_closed:
-                gitlab_issue.state_event = 'close'
-                gitlab_issue.save()
-                self.log(f"✅ Issue #{gitlab_issue.iid} fechada para sincronizar com GitHub")
-            elif not should_be_closed and is_closed:
-                gitlab_issue.state_event = 'reopen'
-                gitlab_issue.save()
-                self.log(f"✅ Issue #{gitlab_issue.iid} reaberta para sincronizar com GitHub")
+            changes = self.issue_changes(gitlab_issue, github_issue)
+            if changes:
+                gitlab_issue.refresh(self._send_issue_changes(gitlab_issue.iid, changes))
+            return True
                 
         except Exception as e:
             self.log(f"❌ Erro ao atualizar issue: {str(e)}", "ERROR")
+            return False
 
-    def save_issue_mapping(self, github_id: int, gitlab_iid: int):
-        """Salva mapeamento entre issues GitHub e GitLab"""
-        mapping_file = '.github/data/issue-mapping.json'
-        
+    def _load_issue_mapping(self):
+        """Carrega mapeamentos existentes para o store em memória"""
         try:
-            # Criar diretório se não existir
-            os.makedirs('.github/data', exist_ok=True)
-            
-            # Carregar mapeamentos existentes
-            if os.path.exists(mapping_file):
-                with open(mapping_file, 'r') as f:
-                    mappings = json.load(f)
-            else:
-                mappings = {}
-            
-            # Adicionar novo mapeamento
-            mappings[str(github_id)] = gitlab_iid
-            
-            # Salvar arquivo atualizado
-            with open(mapping_file, 'w') as f:
-                json.dump(mappings, f, indent=2)
-                
+            self.issue_mappings.load()
+        except Exception as e:
+            self.log(f"⚠️ Erro ao carregar mapeamentos: {str(e)}", "WARN")
+
+    def _flush_issue_mapping(self) -> bool:
+        """Grava todos os mapeamentos pendentes em um único flush atômico"""
+        try:
+            self.issue_mappings.flush()
+            return True
         except Exception as e:
             self.log(f"❌ Erro ao salvar mapeamento: {str(e)}", "ERROR")
+            return False
 
-    def load_issue_mapping(self) -> Dict[str, int]:
-        """Carrega mapeamento existente entre issues"""
-        mapping_file = '.github/data/issue-mapping.json'
+    def sync_issue(self, github_issue: GitHubIssue) -> Optional[str]:
+        """Sincroniza uma única issue (evento de webhook): 'created', 'updated', 'unchanged' ou None em erro"""
+        github_id = github_issue.number
+        self._load_issue_mapping()
+        self.provision_labels([github_issue])
+        fingerprint = self.issue_fingerprint(github_issue)
+        
+        if github_id in self.issue_mappings:
+            if self.issue_mappings.get_fingerprint(github_id) == fingerprint:
+                return 'unchanged'
+            gitlab_issue = self._get_gitlab_issue(self.issue_mappings.get_iid(github_id))
+        else:
+            # Receptor sem o JSON de mapeamentos: procurar no GitLab antes de criar um duplicado
+            try:
+                gitlab_issue = find_synced_item(self.project.issues, github_id, github_issue.title,
+                                                GitLabIssue.from_api)
+            except Exception as e:
+                self.log(f"❌ Erro ao procurar no GitLab a issue #{github_id}: {str(e)}", "ERROR")
+                return None
+            if gitlab_issue:
+                self.issue_mappings.set(github_id, gitlab_issue.iid)
         
+        if gitlab_issue:
+            if not self.update_gitlab_issue(gitlab_issue, github_issue):
+                return None
+            self.issue_mappings.set_fingerprint(github_id, fingerprint)
+            return 'updated' if self._flush_issue_mapping() else None
+        
+        gitlab_issue = self.create_gitlab_issue(github_issue)
+        if not gitlab_issue:
+            return None
+        self.issue_mappings.set(github_id, gitlab_issue.iid)
+        self.issue_mappings.set_fingerprint(github_id, fingerprint)
+        return 'created' if self._flush_issue_mapping() else None
+
+    def _load_checkpoint(self, checkpoint: Checkpoint) -> bool:
+        """Carrega o checkpoint da última execução interrompida, se houver"""
         try:
-            if os.path.exists(mapping_file):
-                with open(mapping_file, 'r') as f:
-                    return json.load(f)
+            return checkpoint.load()
         except Exception as e:
-            self.log(f"⚠️ Erro ao carregar mapeamentos: {str(e)}", "WARN")
+            self.log(f"⚠️ Erro ao carregar checkpoint de issues: {str(e)}", "WARN")
+            return False
+
+    def _commit_checkpoint(self, checkpoint: Checkpoint, processed: int, remaining: Dict[int, None]):
+        """Grava o cursor e a fila pendente após um lote confirmado"""
+        try:
+            checkpoint.commit(processed, remaining)
+        except Exception as e:
+            self.log(f"⚠️ Erro ao gravar checkpoint de issues: {str(e)}", "WARN")
+
+    def match_issue(self, github_issue: GitHubIssue, gitlab_index: GitLabIndex,
+                    gitlab_since: Optional[str]) -> Tuple[str, Optional[GitLabIssue]]:
+        """Decide o destino de uma issue: 'unchanged', 'update' (mapeada), 'link' (marcador ou mesmo título) ou 'create'"""
+        github_id = github_issue.number
+        
+        # Verificar se já existe mapeamento
+        if github_id in self.issue_mappings:
+            gitlab_iid = self.issue_mappings.get_iid(github_id)
+            if self.issue_mappings.get_fingerprint(github_id) == self.issue_fingerprint(github_issue):
+                return 'unchanged', None
+            if gitlab_iid not in gitlab_index.by_iid and gitlab_since:
+                # Fora do delta do GitLab: buscar apenas a issue mapeada
+                mapped_issue = self._get_gitlab_issue(gitlab_iid)
+                if mapped_issue:
+                    gitlab_index.by_iid[gitlab_iid] = mapped_issue
+            if gitlab_iid in gitlab_index.by_iid:
+                return 'update', gitlab_index.by_iid[gitlab_iid]
+        
+        # Mapeamento ausente (ex.: JSON perdido em um checkout novo): marcador do GitHub na descrição
+        if github_id in gitlab_index.by_github:
+            return 'link', gitlab_index.by_github[github_id]
+        
+        # Último recurso: issue sem marcador com o mesmo título
+        if github_issue.title in gitlab_index.by_title:
+            return 'link', gitlab_index.by_title[github_issue.title]
         
-        return {}
+        return 'create', None
 
-    def sync_issues(self):
-        """Função principal de sincronização de issues"""
+    def sync_issues(self, resume: bool = False) -> SyncSummary:
+        """Função principal de sincronização de issues (checkpoint gravado a cada lote confirmado)"""
         self.log("🔄 Iniciando sincronização de issues GitHub → GitLab...")
         
-        # Buscar issues de ambas as plataformas
-        github_issues = self.get_github_issues()
-        gitlab_issues = self.get_gitlab_issues()
+        # Retomar execução interrompida com os mesmos watermarks e apenas a fila pendente
+        checkpoint = Checkpoint(ISSUES_CHECKPOINT_FILE)
+        resuming = resume and self._load_checkpoint(checkpoint)
+        if resuming:
+            run_started_at = checkpoint.run_started_at
+            github_since, gitlab_since = checkpoint.github_since, checkpoint.gitlab_since
+            self.log(f"⏯️ Retomando execução de {run_started_at}: {len(checkpoint.pending)} issues pendentes "
+                     f"({checkpoint.cursor} já processadas)")
+        else:
+            if resume:
+                self.log("ℹ️ Nenhum checkpoint de issues para retomar - execução completa")
+            # Watermarks da última execução (None = varredura completa)
+            run_started_at = utc_now_iso()
+            github_since = self.state.get_watermark(GITHUB_ISSUES) if self.incremental else None
+            gitlab_since = self.state.get_watermark(GITLAB_ISSUES) if self.incremental else None
+        if github_since:
+            self.log(f"⏩ Modo incremental: issues alteradas desde {github_since}")
         
-        # Carregar mapeamentos existentes
-        existing_mappings = self.load_issue_mapping()
+        # GitLab primeiro: o índice por título/iid precisa estar completo antes do casamento
+        with span('gitlab-fetch'):
+            gitlab_index = self.get_gitlab_issue_index(updated_after=gitlab_since)
+        if gitlab_since is None:
+            self.snapshot.gitlab_issues = ItemCounts.from_items(gitlab_index.by_iid.values())
+        
+        # Fila durável: números GitHub ainda não confirmados nesta execução. Em uma retomada com a
+        # listagem já concluída, apenas a fila pendente é processada; com a listagem interrompida,
+        # tudo é reprocessado (itens já confirmados caem na impressão digital, sem escrita)
+        pending_filter = set(checkpoint.pending) if resuming and checkpoint.listed else None
+        if resuming:
+            remaining = dict.fromkeys(checkpoint.pending)
+        else:
+            remaining = {}
+            checkpoint.begin(run_started_at, github_since, gitlab_since)
         
-        # Criar índices para busca rápida
-        gitlab_titles = {issue.title: issue for issue in gitlab_issues}
-        gitlab_by_iid = {issue.iid: issue for issue in gitlab_issues}
+        # Varredura completa: o relatório usa as contagens acumuladas durante a listagem
+        github_counts = ItemCounts() if github_since is None else None
+        
+        # Carregar mapeamentos existentes
+        self._load_issue_mapping()
+        existing_mappings = self.issue_mappings
         
         created_count = 0
         updated_count = 0
         skipped_count = 0
+        unchanged_count = 0
+        mappings_saved = True
         
-        for github_issue in github_issues:
-            github_id = str(github_issue['number'])
-            original_title = github_issue['title']
-            
-            # Verificar se já existe mapeamento
-            if github_id in existing_mappings:
-                gitlab_iid = existing_mappings[github_id]
-                if gitlab_iid in gitlab_by_iid:
-                    # Issue já mapeada, verificar se precisa atualizar
-                    self.update_gitlab_issue(gitlab_by_iid[gitlab_iid], github_issue)
-                    updated_count += 1
-                    continue
-            
-            # Verificar se já existe pelo título
-            if original_title in gitlab_titles:
-                # Issue existe mas não está mapeada, criar mapeamento
-                gitlab_issue = gitlab_titles[original_title]
-                self.save_issue_mapping(github_issue['number'], gitlab_issue.iid)
-                self.update_gitlab_issue(gitlab_issue, github_issue)
-                updated_count += 1
-                continue
-            
-            # Issue não existe, criar nova
-            gitlab_issue = self.create_gitlab_issue(github_issue)
-            if gitlab_issue:
-                self.save_issue_mapping(github_issue['number'], gitlab_issue.iid)
-                created_count += 1
-            else:
-                skipped_count += 1
+        # Páginas do GitHub chegam por uma fila limitada enquanto os lotes anteriores são escritos.
+        # Escritas executadas em paralelo; cada item segue criação → estado → notas em ordem.
+        # Ao fim de cada lote: mapeamentos gravados e checkpoint avançado
+        with PageStream(self.iter_github_issue_pages(since=github_since)) as stream, WriteExecutor() as executor:
+            for batch in stream.batches(CHECKPOINT_BATCH_SIZE):
+                if github_counts is not None:
+                    for item in batch:
+                        github_counts.add(item)
+                if pending_filter is not None:
+                    batch = [issue for issue in batch if issue.number in pending_filter]
+                remaining.update(dict.fromkeys(issue.number for issue in batch))
+                
+                # Garantir que as labels usadas no lote existam no GitLab (com as cores originais)
+                self.provision_labels(batch)
+                
+                pending = []
+                try:
+                    for github_issue in batch:
+                        action, gitlab_issue = self.match_issue(github_issue, gitlab_index, gitlab_since)
+                        if action == 'unchanged':
+                            # Conteúdo idêntico ao último sincronizado: nenhuma chamada ao GitLab
+                            unchanged_count += 1
+                            remaining.pop(github_issue.number, None)
+                            continue
+                        
+                        if action == 'link':
+                            # Issue existe mas não está mapeada, criar mapeamento
+                            existing_mappings.set(github_issue.number, gitlab_issue.iid)
+                        
+                        if gitlab_issue:
+                            # Issue já mapeada (ou casada pelo título), verificar se precisa atualizar
+                            future = executor.submit(self.gitlab_host, self.update_gitlab_issue, gitlab_issue, github_issue)
+                            pending.append(('update', github_issue, future))
+                        else:
+                            # Issue não existe, criar nova
+                            future = executor.submit(self.gitlab_host, self.create_gitlab_issue, github_issue)
+                            pending.append(('create', github_issue, future))
+                finally:
+                    # Coletar resultados na ordem de submissão (contadores determinísticos)
+                    for action, github_issue, future in pending:
+                        result = None if future.exception() else future.result()
+                        if action == 'update':
+                            if result:
+                                existing_mappings.set_fingerprint(github_issue.number, self.issue_fingerprint(github_issue))
+                                remaining.pop(github_issue.number, None)
+                                updated_count += 1
+                            else:
+                                skipped_count += 1
+                            continue
+                        gitlab_issue = result
+                        if gitlab_issue:
+                            self.snapshot.add('gitlab_issues', gitlab_issue)
+                            existing_mappings.set(github_issue.number, gitlab_issue.iid)
+                            existing_mappings.set_fingerprint(github_issue.number, self.issue_fingerprint(github_issue))
+                            remaining.pop(github_issue.number, None)
+                            created_count += 1
+                        else:
+                            skipped_count += 1
+                    
+                    # Commit do lote: mapeamentos primeiro, depois o checkpoint que os referencia
+                    if self._flush_issue_mapping():
+                        self._commit_checkpoint(checkpoint, len(batch), remaining)
+                    else:
+                        mappings_saved = False
+        
+        if stream.error:
+            self.log(f"❌ Erro ao buscar issues do GitHub: {str(stream.error)}", "ERROR")
+        self.log(f"Encontradas {stream.items} issues no GitHub{' (GraphQL)' if self.graphql else ''}")
+        if stream.complete:
+            if github_counts is not None:
+                self.snapshot.github_issues = github_counts
+            checkpoint.listed = True
+            self._commit_checkpoint(checkpoint, 0, remaining)
+        
+        if remaining or not stream.complete:
+            self.log(f"⏸️ {len(remaining)} issues pendentes no checkpoint - use --resume para retomar", "WARN")
+        else:
+            checkpoint.clear()
+        
+        # Avançar watermarks apenas se nenhuma issue ficou pendente
+        if skipped_count == 0 and mappings_saved and stream.complete and not remaining:
+            self.state.set_watermark(GITHUB_ISSUES, run_started_at)
+            self.state.set_watermark(GITLAB_ISSUES, run_started_at)
+            self.state.save()
+        else:
+            self.log("⚠️ Issues ignoradas nesta execução - watermark mantido para nova tentativa", "WARN")
         
         # Relatório final
-        total_processed = created_count + updated_count + skipped_count
+        total_processed = created_count + updated_count + skipped_count + unchanged_count
         self.log(f"✅ Sincronização de issues concluída:")
         self.log(f"   📊 Total processadas: {total_processed}")
         self.log(f"   ➕ Criadas: {created_count}")
         self.log(f"   🔄 Atualizadas: {updated_count}")
+        self.log(f"   ✔️ Sem alterações: {unchanged_count}")
         self.log(f"   ⏭️ Ignoradas: {skipped_count}")
+        
+        return SyncSummary(created=created_count, updated=updated_count, skipped=skipped_count,
+                           unchanged=unchanged_count)
+
+    def plan_labels(self, plan: SyncPlan, github_issues: List[GitHubIssue]):
+        """Planeja a criação das labels ausentes usadas pelas issues (sem escrever no GitLab)"""
+        wanted = labels_from_items(github_issues) + [SYNC_LABEL_SPEC]
+        try:
+            for label in self.label_index.missing(wanted):
+                plan.add_label(label, self.gitlab_host)
+        except Exception as e:
+            self.log(f"⚠️ Erro ao listar labels: {str(e)}", "WARN")
+
+    def _plan_issue(self, plan: SyncPlan, github_issue: GitHubIssue, gitlab_index: GitLabIndex,
+                    gitlab_since: Optional[str]):
+        """Adiciona ao plano a escrita decidida para uma issue"""
+        action, gitlab_issue = self.match_issue(github_issue, gitlab_index, gitlab_since)
+        if action == 'unchanged':
+            return
+        
+        fingerprint = self.issue_fingerprint(github_issue)
+        summary = f"#{github_issue.number} {github_issue.title[:50]}"
+        if gitlab_issue is None:
+            close = github_issue.state == 'closed'
+            plan.add(ISSUES, 'create', summary, self.gitlab_host, 1 + close,
+                     payload={'data': self.issue_create_data(github_issue), 'close': close},
+                     github_number=github_issue.number, fingerprint=fingerprint)
+            return
+        
+        changes = self.issue_changes(gitlab_issue, github_issue)
+        if not changes:
+            kind = 'map'
+        elif set(changes) == {'state_event'}:
+            kind = 'state'
+        else:
+            kind = 'update'
+        fields = ', '.join(changes) if changes else 'mapeamento'
+        plan.add(ISSUES, kind, f"{summary} → #{gitlab_issue.iid} ({fields})", self.gitlab_host, 1 if changes else 0,
+                 payload={'changes': changes}, github_number=github_issue.number,
+                 gitlab_iid=gitlab_issue.iid, fingerprint=fingerprint)
+
+    def plan_issues(self, plan: SyncPlan):
+        """Planeja labels e escritas de issues a partir das listagens, sem escrever no GitLab (--dry-run)"""
+        self.log("🗂️ Planejando sincronização de issues GitHub → GitLab...")
+        
+        run_started_at = utc_now_iso()
+        github_since = self.state.get_watermark(GITHUB_ISSUES) if self.incremental else None
+        gitlab_since = self.state.get_watermark(GITLAB_ISSUES) if self.incremental else None
+        if github_since:
+            self.log(f"⏩ Modo incremental: issues alteradas desde {github_since}")
+        
+        with span('gitlab-fetch'):
+            gitlab_index = self.get_gitlab_issue_index(updated_after=gitlab_since)
+        self._load_issue_mapping()
+        
+        listed = 0
+        complete = True
+        try:
+            for page in self.iter_github_issue_pages(since=github_since):
+                listed += len(page)
+                self.plan_labels(plan, page)
+                for github_issue in page:
+                    self._plan_issue(plan, github_issue, gitlab_index, gitlab_since)
+        except Exception as e:
+            complete = False
+            self.log(f"❌ Erro ao buscar issues do GitHub: {str(e)}", "ERROR")
+        
+        # Watermarks só avançam ao aplicar um plano montado sobre a listagem completa
+        plan.add_phase(ISSUES, run_started_at, [GITHUB_ISSUES, GITLAB_ISSUES] if complete else [])
+        self.log(f"🗂️ {len(plan.pending(ISSUES))} escritas planejadas para {listed} issues do GitHub")
+
+    def _apply_label(self, action: PlannedAction):
+        self.label_index.ensure([action.payload])
+
+    def _apply_issue(self, action: PlannedAction):
+        """Executa uma ação de issue do plano (criação seguida do fechamento vira ação de estado)"""
+        if action.kind == 'create':
+            close = action.payload['close']
+            gitlab_issue = self._create_issue(action.payload['data'], close=False)
+            # A partir daqui a issue existe: uma nova tentativa apenas aplica o estado
+            action.gitlab_iid = gitlab_issue.iid
+            action.kind, action.payload = 'state', {'changes': {'state_event': 'close'} if close else {}}
+        if action.payload['changes']:
+            self._send_issue_changes(action.gitlab_iid, action.payload['changes'])
+
+    def _record_issue(self, action: PlannedAction):
+        """Mapeamento de toda issue existente; impressão digital apenas das ações concluídas"""
+        if action.gitlab_iid is not None:
+            self.issue_mappings.set(action.github_number, action.gitlab_iid)
+        if action.status == DONE:
+            self.issue_mappings.set_fingerprint(action.github_number, action.fingerprint)
+
+    def apply_plan(self, plan: SyncPlan, plan_path: str) -> bool:
+        """Aplica as labels e issues pendentes do plano; retorna True se nada falhou (--apply)"""
+        self.log(f"▶️ Aplicando plano de issues gerado em {plan.created_at}...")
+        self._load_issue_mapping()
+        
+        def commit():
+            if self._flush_issue_mapping():
+                plan.save(plan_path)
+        
+        failed = run_actions(plan.pending(LABELS), self.gitlab_host, self._apply_label, lambda action: None,
+                             lambda: plan.save(plan_path))
+        failed += run_actions(plan.pending(ISSUES), self.gitlab_host, self._apply_issue, self._record_issue, commit)
+        
+        phase = plan.phases.get(ISSUES)
+        if phase and phase.watermarks and not plan.pending(ISSUES):
+            for entity in phase.watermarks:
+                self.state.set_watermark(entity, phase.run_started_at)
+            self.state.save()
+        
+        self.log(f"{'✅' if not failed else '⚠️'} Plano de issues aplicado: {failed} falhas")
+        return failed == 0
 
     def generate_issues_report(self):
         """Gera relatório específico de issues"""
         try:
-            github_issues = self.get_github_issues()
-            gitlab_issues = self.get_gitlab_issues()
-            
-            # Estatísticas por estado
-            github_open = sum(1 for issue in github_issues if issue['state'] == 'open')
-            github_closed = len(github_issues) - github_open
-            
-            gitlab_open = sum(1 for issue in gitlab_issues if issue.state == 'opened')
-            gitlab_closed = len(gitlab_issues) - gitlab_open
+            # Contagens da fase de sincronização ou, em modo incremental, dos endpoints de contagem
+            github_issues = self.snapshot.get_or_fetch('github_issues', self.count_github_items)
+            gitlab_issues = self.snapshot.get_or_fetch('gitlab_issues', lambda: count_gitlab_issues(self.project))
             
             report = f"""## 📋 Relatório de Issues - {datetime.now().strftime('%d/%m/%Y %H:%M')}
 
 ### GitHub Issues
-- **Total**: {len(github_issues)}
-- **Abertas**: {github_open}
-- **Fechadas**: {github_closed}
+- **Total**: {github_issues.total}
+- **Abertas**: {github_issues.states['open']}
+- **Fechadas**: {github_issues.states['closed']}
 
 ### GitLab Issues  
-- **Total**: {len(gitlab_issues)}
-- **Abertas**: {gitlab_open}
-- **Fechadas**: {gitlab_closed}
+- **Total**: {gitlab_issues.total}
+- **Abertas**: {gitlab_issues.states['opened']}
+- **Fechadas**: {gitlab_issues.states['closed']}
 
 ### Status de Sincronização
-- **Sincronização**: {'✅ OK' if len(gitlab_issues) >= len(github_issues) else '⚠️ Pendente'}
-- **Diferença**: {len(github_issues) - len(gitlab_issues)} issues
+- **Sincronização**: {'✅ OK' if gitlab_issues.total >= github_issues.total else '⚠️ Pendente'}
+- **Diferença**: {github_issues.total - gitlab_issues.total} issues
 
 ### Labels Mais Usadas
 {self._get_top_labels(github_issues)}
@@ -293,34 +646,56 @@ class GitHubIssuesSyncer:
             self.log(f"❌ Erro ao gerar relatório: {str(e)}", "ERROR")
             return ""
 
-    def _get_top_labels(self, issues: List[Dict], top_n: int = 5) -> str:
+    def _get_top_labels(self, counts: ItemCounts, top_n: int = 5) -> str:
         """Obtém as labels mais usadas"""
-        label_count = {}
-        
-        for issue in issues:
-            for label in issue.get('labels', []):
-                label_name = label['name']
-                label_count[label_name] = label_count.get(label_name, 0) + 1
-        
-        # Ordenar por uso
-        sorted_labels = sorted(label_count.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        for label, count in sorted_labels[:top_n]:
+        for label, count in counts.labels.most_common(top_n):
             result.append(f"- **{label}**: {count} issues")
         
         return '\n'.join(result) if result else "- Nenhuma label encontrada"
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Sincronização de issues GitHub → GitLab AGES")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', action='store_true',
+                      help="retoma a última execução interrompida a partir do checkpoint")
+    mode.add_argument('--dry-run', nargs='?', const=PLAN_FILE, metavar='PLAN',
+                      help=f"apenas planeja as escritas e grava o plano em PLAN (padrão: {PLAN_FILE})")
+    mode.add_argument('--apply', metavar='PLAN',
+                      help="executa um plano gerado com --dry-run")
+    args = parser.parse_args()
+    
     try:
         syncer = GitHubIssuesSyncer()
-        syncer.sync_issues()
+        
+        if args.dry_run:
+            plan = SyncPlan(repo=syncer.repo_name, project_id=syncer.project.id)
+            with span('plan'):
+                syncer.plan_issues(plan)
+            plan.publish(args.dry_run)
+            print(f"🗂️ Plano gravado em {args.dry_run}")
+            return
+        
+        if args.apply:
+            plan = SyncPlan.load(args.apply, syncer.repo_name, syncer.project.id)
+            with span('apply'):
+                applied = syncer.apply_plan(plan, args.apply)
+            print(plan.render())
+            if not applied:
+                exit(1)
+            return
+        
+        with span('issues'):
+            syncer.sync_issues(resume=args.resume)
         syncer.generate_issues_report()
         
     except Exception as e:
         print(f"❌ ERRO CRÍTICO na sincronização de issues: {str(e)}")
         exit(1)
+    
+    finally:
+        export_metrics()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
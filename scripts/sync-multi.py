@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Script de sincronização multi-repo GitHub → GitLab AGES
+Resolve os projetos de todos os repositórios com uma listagem do grupo Pró-Mata, executa a
+sincronização completa de cada um em um pool de processos com orçamento de rate limit
+compartilhado e gera um relatório combinado
+Para uso no projeto Pro-Mata PUCRS
+"""
+
+import os
+import re
+import sys
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, Optional
+
+from promata_sync.http_client import build_gitlab_client
+from promata_sync.metrics import export_metrics, span
+from promata_sync.multirepo import RepoTask, init_worker, sync_repo
+from promata_sync.projects import gitlab_repo_name, list_group_projects
+from promata_sync.ratelimit import use_shared_budgets
+from promata_sync.results import PhaseResult, RepoResult, SyncError
+
+DEFAULT_WORKERS = int(os.environ.get('SYNC_MULTI_WORKERS', '4'))
+DEFAULT_WORKDIR = os.environ.get('SYNC_MULTI_WORKDIR', 'repos')
+REPORT_FILE = 'sync-report.md'
+
+# Workers iniciados do zero: nada do processo pai (conexões, locks) é herdado
+MP_CONTEXT = multiprocessing.get_context('spawn')
+
+class ProMataMultiRepoSyncer:
+    def __init__(self, repos: List[str], workers: int = DEFAULT_WORKERS, workdir: str = DEFAULT_WORKDIR,
+                 resume: bool = False):
+        """Inicializa o sincronizador multi-repo"""
+        self.repos = repos
+        self.workers = max(1, min(workers, len(repos)))
+        self.workdir = os.path.abspath(workdir)
+        self.resume = resume
+        self.git_token = os.environ.get('GIT_TOKEN')
+        self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
+        self.gitlab_token = os.environ.get('GITLAB_TOKEN')
+        
+        # Validar configurações
+        if not all([self.git_token, self.gitlab_token, self.repos]):
+            raise ValueError("Configurações incompletas. Verifique os secrets e a lista de repositórios.")
+        
+        # Orçamento de rate limit compartilhado entre este processo e todos os workers
+        self.manager = MP_CONTEXT.Manager()
+        self.budgets = self.manager.dict()
+        self.budget_lock = self.manager.Lock()
+        use_shared_budgets(self.budgets, self.budget_lock)
+        
+        # Autenticar uma única vez; os workers recebem os projetos já resolvidos
+        self.gl = build_gitlab_client(self.gitlab_url, self.gitlab_token)
+        try:
+            self.gl.auth()
+            self.log(f"✅ Conectado ao GitLab: {self.gitlab_url}")
+        except Exception as e:
+            self.manager.shutdown()
+            raise ValueError(f"❌ Erro de autenticação GitLab: {str(e)}")
+        
+        self.results: List[RepoResult] = []
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log com timestamp e cores"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Emojis e cores por nível
+        level_config = {
+            "INFO": "ℹ️",
+            "WARN": "⚠️",
+            "ERROR": "❌",
+            "SUCCESS": "✅"
+        }
+        
+        emoji = level_config.get(level, "ℹ️")
+        print(f"[{timestamp}] {level}: {emoji} {message}")
+        
+        # Para GitHub Actions, usar commands específicos
+        if level == "WARN":
+            print(f"::warning::{message}")
+        elif level == "ERROR":
+            print(f"::error::{message}")
+        elif level == "SUCCESS":
+            print(f"::notice::{message}")
+
+    def resolve_projects(self) -> List[RepoTask]:
+        """Resolve o projeto GitLab de cada repositório com uma única listagem do grupo"""
+        self.log(f"🔍 Resolvendo projetos de {len(self.repos)} repositórios no grupo Pró-Mata...")
+        
+        projects = list_group_projects(self.gl)
+        tasks = []
+        for repo in self.repos:
+            project = projects.get(gitlab_repo_name(repo))
+            if project:
+                self.log(f"✅ {repo} → {project['path_with_namespace']} (ID: {project['id']})")
+            else:
+                self.log(f"⚠️ {repo}: projeto '{gitlab_repo_name(repo)}' ausente no grupo, será buscado/criado pelo worker", "WARN")
+            tasks.append(RepoTask(repo=repo, workdir=os.path.join(self.workdir, repo.split('/')[-1]),
+                                  project=project, resume=self.resume))
+        return tasks
+
+    def run_repos(self, tasks: List[RepoTask]):
+        """Sincroniza os repositórios em paralelo, um processo do pool por repositório"""
+        self.log(f"🚀 Sincronizando {len(tasks)} repositórios com {self.workers} workers...")
+        
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=MP_CONTEXT, initializer=init_worker,
+                                 initargs=(self.budgets, self.budget_lock)) as pool:
+            futures = {pool.submit(sync_repo, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Worker encerrado de forma anormal (ex.: BrokenProcessPool)
+                    result = RepoResult(repo=task.repo, gitlab_project=gitlab_repo_name(task.repo),
+                                        errors=[SyncError.from_exception(task.repo, e)])
+                
+                self.results.append(result)
+                status = "✅" if result.ok else "❌"
+                self.log(f"{status} {result.repo} finalizado em {result.duration_s:.1f}s ({result.http_calls} chamadas HTTP)")
+        
+        self.results.sort(key=lambda r: self.repos.index(r.repo))
+
+    @staticmethod
+    def _phase_cell(result: RepoResult, phase: str) -> str:
+        """Contadores criados/atualizados/inalterados de uma fase do repositório"""
+        phase_result: Optional[PhaseResult] = next((p for p in result.phases if p.phase == phase), None)
+        if phase_result is None:
+            return '—'
+        if not phase_result.ok:
+            return '❌'
+        summary = phase_result.summary
+        if summary is None:
+            return '✅'
+        return f"{summary.created}/{summary.updated}/{summary.unchanged}"
+
+    def generate_combined_report(self) -> str:
+        """Gera o relatório combinado de todos os repositórios"""
+        self.log("📊 Gerando relatório combinado...")
+        
+        synced = sum(1 for r in self.results if r.ok)
+        rows = []
+        for r in self.results:
+            rows.append(f"| {r.repo} | {r.gitlab_project} | {'✅' if r.ok else '❌'} | {'✅' if r.mirror_ok else '❌'} | "
+                        f"{self._phase_cell(r, 'issues')} | {self._phase_cell(r, 'pull requests')} | "
+                        f"{self._phase_cell(r, 'comentários')} | {r.http_calls} | {r.http_retries} | {r.duration_s:.1f} |")
+        
+        errors = []
+        for r in self.results:
+            for error in r.errors + [e for p in r.phases for e in p.errors]:
+                errors.append(f"- **{r.repo}** ({error.phase}): {error.error_type}: {error.message}")
+        
+        report = f"""# 📊 Relatório Multi-Repo de Sincronização - Pro-Mata AGES
+
+**Data/Hora**: {datetime.now().strftime('%d/%m/%Y às %H:%M:%S')}
+**Repositórios**: {synced}/{len(self.results)} sincronizados
+**Workers**: {self.workers}
+
+## 📦 Repositórios
+
+Issues, PRs e comentários: criados/atualizados/inalterados
+
+| Repositório | Projeto GitLab | Status | Espelho | Issues | PRs | Comentários | Chamadas HTTP | Retries | Duração (s) |
+|---|---|---|---|---|---|---|---:|---:|---:|
+{chr(10).join(rows)}
+
+**Total**: {sum(r.http_calls for r in self.results)} chamadas HTTP, {sum(r.http_retries for r in self.results)} retries
+
+## ⚠️ Erros
+
+{chr(10).join(errors) if errors else 'Nenhum erro registrado'}
+
+Relatórios e métricas por repositório em `{os.path.relpath(self.workdir)}/<repositório>/`
+
+---
+*Última sincronização: {datetime.now().isoformat()}*
+*Sistema de Sincronização Automática Pro-Mata AGES v2.0*
+"""
+        
+        try:
+            with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+                f.write(report)
+            
+            summary_path = os.environ.get('GITHUB_STEP_SUMMARY')
+            if summary_path:
+                with open(summary_path, 'a', encoding='utf-8') as f:
+                    f.write(report)
+            
+            print(report)
+            self.log(f"✅ Relatório combinado gerado: {REPORT_FILE}")
+        
+        except Exception as e:
+            self.log(f"❌ Erro ao gerar relatório: {str(e)}", "ERROR")
+        
+        return report
+
+    def run_multi_sync(self) -> bool:
+        """Executa a sincronização completa de todos os repositórios"""
+        try:
+            with span('resolve'):
+                tasks = self.resolve_projects()
+            
+            with span('repos'):
+                self.run_repos(tasks)
+            
+            with span('report'):
+                self.generate_combined_report()
+            
+            failed = [r.repo for r in self.results if not r.ok]
+            if failed:
+                self.log(f"⚠️ Sincronização com problemas em {len(failed)} repositórios: {', '.join(failed)}", "WARN")
+                return False
+            
+            self.log("🎉 Sincronização multi-repo finalizada com TOTAL sucesso!")
+            return True
+        
+        except Exception as e:
+            self.log(f"❌ Erro crítico na sincronização multi-repo: {str(e)}", "ERROR")
+            return False
+        
+        finally:
+            self.manager.shutdown()
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Sincronização multi-repo GitHub → GitLab AGES")
+    parser.add_argument('--repos', default=os.environ.get('SYNC_REPOSITORIES', ''),
+                        help="repositórios owner/nome separados por vírgula ou espaço (padrão: SYNC_REPOSITORIES)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="processos sincronizando repositórios em paralelo")
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR,
+                        help="diretório com um checkout (ou clone espelho) e os dados de cada repositório")
+    parser.add_argument('--resume', action='store_true',
+                        help="retoma as fases de issues/PRs interrompidas a partir dos checkpoints")
+    args = parser.parse_args()
+    
+    repos = [repo for repo in re.split(r'[,\s]+', args.repos) if repo]
+    
+    try:
+        syncer = ProMataMultiRepoSyncer(repos, workers=args.workers, workdir=args.workdir, resume=args.resume)
+        with span('multi'):
+            success = syncer.run_multi_sync()
+        
+        if not success:
+            sys.exit(1)
+    
+    except Exception as e:
+        print(f"❌ ERRO CRÍTICO: {str(e)}")
+        sys.exit(1)
+    
+    finally:
+        export_metrics()
+
+if __name__ == "__main__":
+    main()
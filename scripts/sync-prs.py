@@ -5,14 +5,41 @@ Para uso no projeto Pro-Mata PUCRS
 """
 
 import os
-import json
-import requests
-import gitlab
+import argparse
 from datetime import datetime
-from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from promata_sync.branches import BranchIndex
+from promata_sync.checkpoint import CHECKPOINT_BATCH_SIZE, PRS_CHECKPOINT_FILE, Checkpoint
+from promata_sync.executor import WriteExecutor
+from promata_sync.fingerprint import content_fingerprint
+from promata_sync.github_graphql import GitHubGraphQLFetcher, graphql_backend_enabled
+from promata_sync.gitlab_pagination import GitLabIndex, find_synced_item, iter_gitlab
+from promata_sync.http_cache import get_github_cache
+from promata_sync.http_client import GITHUB_API_URL, build_gitlab_client, get_session
+from promata_sync.labels import SYNC_LABEL, SYNC_LABEL_SPEC, LabelIndex, labels_from_items
+from promata_sync.mapping_store import PR_MAPPING_FILE, MappingStore
+from promata_sync.metrics import export_metrics, span
+from promata_sync.models import GitHubPullRequest, GitLabMergeRequest
+from promata_sync.pagination import iter_pages
+from promata_sync.pipeline import PageStream
+from promata_sync.plan import DONE, LABELS, PLAN_FILE, PRS, PlannedAction, SyncPlan, run_actions
+from promata_sync.results import SyncSummary
+from promata_sync.snapshot import ItemCounts, RunSnapshot, count_gitlab_mrs
+from promata_sync.state import (
+    GITHUB_PRS,
+    GITLAB_MRS,
+    SyncState,
+    incremental_enabled,
+    utc_now_iso,
+)
+
+MERGE_NOTE_PREFIX = "✅ Este PR foi merged no GitHub em"
 
 class GitHubPRSyncer:
-    def __init__(self):
+    def __init__(self, gl=None, project=None, snapshot: Optional[RunSnapshot] = None,
+                 branch_index: Optional[BranchIndex] = None, label_index: Optional[LabelIndex] = None):
         """Inicializa o sincronizador de Pull Requests"""
         self.git_token = os.environ.get('GIT_TOKEN')
         self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
@@ -20,303 +47,684 @@ class GitHubPRSyncer:
         self.gitlab_project_id = os.environ.get('GITLAB_PROJECT_ID')
         self.repo_name = os.environ.get('GITHUB_REPOSITORY')
         
-        # Validar configurações
-        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id, self.repo_name]):
+        # Validar configurações (projeto pode ser injetado pelo syncer completo)
+        if not all([self.git_token, self.gitlab_token, self.gitlab_project_id or project, self.repo_name]):
             raise ValueError("Configurações incompletas. Verifique os secrets.")
         
-        # Clientes API
-        self.gl = gitlab.Gitlab(self.gitlab_url, private_token=self.gitlab_token)
-        self.project = self.gl.projects.get(self.gitlab_project_id)
+        # Clientes API (reutiliza cliente/projeto já autenticados quando fornecidos)
+        self.gl = gl or build_gitlab_client(self.gitlab_url, self.gitlab_token)
+        self.project = project or self.gl.projects.get(self.gitlab_project_id)
+        self.snapshot = snapshot or RunSnapshot()
+        self.gitlab_host = urlparse(self.gitlab_url).netloc
         
         self.github_headers = {
             'Authorization': f'token {self.git_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
+        self.http = get_session()
+        self.github_cache = get_github_cache()
+        
+        # Backend GraphQL opcional (GITHUB_BACKEND=graphql)
+        self.graphql = GitHubGraphQLFetcher(self.http, self.github_headers, self.repo_name) if graphql_backend_enabled() else None
+        
+        # Branches do GitLab (carregadas sob demanda, uma vez por execução,
+        # ou já preenchidas pelo espelhamento do syncer completo)
+        self.branch_index = branch_index if branch_index is not None else BranchIndex(self.project)
+        
+        # Labels do GitLab (listadas uma vez por execução, compartilhadas com as issues)
+        self.label_index = label_index if label_index is not None else LabelIndex(self.project)
+        
+        # Mapeamentos GitHub ↔ GitLab (flush único por fase)
+        self.pr_mappings = MappingStore(PR_MAPPING_FILE)
+        
+        # Estado incremental (watermarks da última execução)
+        self.incremental = incremental_enabled()
+        self.state = SyncState()
 
     def log(self, message: str, level: str = "INFO"):
         """Log com timestamp"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         print(f"[{timestamp}] {level}: {message}")
 
-    def get_github_prs(self) -> List[Dict]:
-        """Busca Pull Requests do GitHub"""
+    def iter_github_pr_pages(self, since: Optional[str] = None) -> Iterator[List[GitHubPullRequest]]:
+        """Gera os Pull Requests do GitHub página a página, à medida que chegam (apenas os alterados após `since`)"""
+        if self.graphql:
+            yield from self.graphql.iter_pr_pages(since=since)
+            return
+        
+        url = f"{GITHUB_API_URL}/repos/{self.repo_name}/pulls"
+        params = {'state': 'all', 'per_page': 100}
+        if since:
+            # /pulls não aceita `since`: ordenar por atualização e parar no watermark
+            params.update({'sort': 'updated', 'direction': 'desc'})
+        
+        # Com watermark as páginas são lidas em sequência para parar cedo
+        pages = iter_pages(self.github_cache.get, url, headers=self.github_headers,
+                           params=params, parallel=not since)
+        for page_prs in pages:
+            if not since:
+                yield [GitHubPullRequest.from_rest(pr) for pr in page_prs]
+                continue
+            recent_prs = [GitHubPullRequest.from_rest(pr) for pr in page_prs if pr['updated_at'] >= since]
+            if recent_prs:
+                yield recent_prs
+            if len(recent_prs) < len(page_prs):
+                pages.close()
+                return
+
+    def get_github_prs(self, since: Optional[str] = None) -> List[GitHubPullRequest]:
+        """Busca Pull Requests do GitHub (apenas os alterados após `since`, se informado)"""
         try:
-            url = f"https://api.github.com/repos/{self.repo_name}/pulls"
-            params = {'state': 'all', 'per_page': 100}
-            
-            prs = []
-            page = 1
-            
-            while True:
-                params['page'] = page
-                response = requests.get(url, headers=self.github_headers, params=params)
-                response.raise_for_status()
-                
-                page_prs = response.json()
-                if not page_prs:
-                    break
-                    
-                prs.extend(page_prs)
-                page += 1
-                
-                if page > 10:  # Limitar para evitar loops infinitos
-                    break
-                
-            self.log(f"Encontrados {len(prs)} Pull Requests no GitHub")
+            prs = [pr for page in self.iter_github_pr_pages(since=since) for pr in page]
+            self.log(f"Encontrados {len(prs)} Pull Requests no GitHub{' (GraphQL)' if self.graphql else ''}")
             return prs
             
         except Exception as e:
             self.log(f"❌ Erro ao buscar PRs do GitHub: {str(e)}", "ERROR")
             return []
 
-    def get_gitlab_mrs(self) -> List:
-        """Busca Merge Requests do GitLab"""
+    def count_github_items(self) -> Dict[str, ItemCounts]:
+        """Contagens de issues e PRs do GitHub em uma consulta GraphQL, sem listar os itens"""
+        fetcher = self.graphql or GitHubGraphQLFetcher(self.http, self.github_headers, self.repo_name)
+        github_issues, github_prs = fetcher.fetch_counts()
+        return {'github_issues': github_issues, 'github_prs': github_prs}
+
+    def iter_gitlab_mrs(self, updated_after: Optional[str] = None) -> Iterator[GitLabMergeRequest]:
+        """Itera os MRs do GitLab sob demanda (apenas os alterados após `updated_after`, se informado)"""
+        filters = {'updated_after': updated_after} if updated_after else {}
+        mrs = iter_gitlab(self.project.mergerequests, **filters)
+        return (GitLabMergeRequest.from_api(mr) for mr in mrs)
+
+    def get_gitlab_mrs(self, updated_after: Optional[str] = None) -> List[GitLabMergeRequest]:
+        """Busca Merge Requests do GitLab (apenas os alterados após `updated_after`, se informado)"""
         try:
-            mrs = self.project.mergerequests.list(all=True)
+            mrs = list(self.iter_gitlab_mrs(updated_after=updated_after))
             self.log(f"Encontrados {len(mrs)} Merge Requests no GitLab")
             return mrs
         except Exception as e:
             self.log(f"❌ Erro ao buscar MRs do GitLab: {str(e)}", "ERROR")
             return []
 
-    def get_gitlab_branches(self) -> List[str]:
-        """Busca branches disponíveis no GitLab"""
+    def get_gitlab_mr_index(self, updated_after: Optional[str] = None) -> GitLabIndex:
+        """Indexa os MRs do GitLab por iid, marcador do GitHub e título à medida que as páginas chegam"""
         try:
-            branches = self.project.branches.list(all=True)
-            branch_names = [branch.name for branch in branches]
-            self.log(f"Encontradas {len(branch_names)} branches no GitLab")
-            return branch_names
+            index = GitLabIndex(self.iter_gitlab_mrs(updated_after=updated_after))
+            self.log(f"Encontrados {len(index)} Merge Requests no GitLab ({len(index.by_github)} com marcador do GitHub)")
+            return index
         except Exception as e:
-            self.log(f"❌ Erro ao buscar branches do GitLab: {str(e)}", "ERROR")
-            return []
+            self.log(f"❌ Erro ao buscar MRs do GitLab: {str(e)}", "ERROR")
+            return GitLabIndex()
 
-    def create_gitlab_mr(self, github_pr: Dict) -> Optional[object]:
-        """Cria Merge Request no GitLab baseado no PR do GitHub"""
+    def provision_labels(self, github_prs: List[GitHubPullRequest]):
+        """Cria no GitLab apenas as labels ausentes entre as usadas pelos PRs do GitHub"""
+        wanted = labels_from_items(github_prs) + [SYNC_LABEL_SPEC]
         try:
-            # Preparar título - manter original
-            title = github_pr['title']
-            
-            # Criar descrição preservando conteúdo original
-            original_body = github_pr.get('body', '') or ''
-            
-            description = f"""{original_body}
+            created = self.label_index.ensure(wanted)
+            if created:
+                self.log(f"🏷️ Labels criadas no GitLab: {', '.join(created)}")
+        except Exception as e:
+            self.log(f"⚠️ Erro ao provisionar labels: {str(e)}", "WARN")
+
+    def _get_gitlab_mr(self, iid: int) -> Optional[GitLabMergeRequest]:
+        """Busca um único Merge Request do GitLab pelo iid"""
+        try:
+            return GitLabMergeRequest.from_api(self.project.mergerequests.get(iid).attributes)
+        except Exception as e:
+            self.log(f"⚠️ MR !{iid} não encontrado no GitLab: {str(e)}", "WARN")
+            return None
+
+    def get_gitlab_branches(self) -> BranchIndex:
+        """Índice de branches do GitLab (listado uma única vez por execução)"""
+        try:
+            if self.branch_index.ensure_loaded():
+                self.log(f"Encontradas {len(self.branch_index)} branches no GitLab")
+        except Exception as e:
+            self.log(f"❌ Erro ao buscar branches do GitLab: {str(e)}", "ERROR")
+        return self.branch_index
+
+    def build_mr_description(self, github_pr: GitHubPullRequest) -> str:
+        """Descrição do MR no GitLab preservando o conteúdo original"""
+        original_body = github_pr.body
+        
+        return f"""{original_body}
 
 ---
 ## 🔄 Sincronizado do GitHub
 
-- 🔗 **PR original**: {github_pr['html_url']}
-- 👤 **Autor**: @{github_pr['user']['login']}
-- 📅 **Criado**: {github_pr['created_at']}
-- 🔢 **ID GitHub**: #{github_pr['number']}
-- 🌿 **Branches**: `{github_pr['head']['ref']}` → `{github_pr['base']['ref']}`
-- 📊 **Estado**: {github_pr['state']}
-- 🔀 **Mergeable**: {github_pr.get('mergeable', 'unknown')}
+- 🔗 **PR original**: {github_pr.html_url}
+- 👤 **Autor**: @{github_pr.author}
+- 📅 **Criado**: {github_pr.created_at}
+- 🔢 **ID GitHub**: #{github_pr.number}
+- 🌿 **Branches**: `{github_pr.head_ref}` → `{github_pr.base_ref}`
+- 📊 **Estado**: {github_pr.state}
+- 🔀 **Mergeable**: {github_pr.mergeable}
 
 *Sincronizado automaticamente do GitHub para GitLab AGES*
 """
 
-            # Verificar se as branches existem no GitLab
-            gitlab_branches = self.get_gitlab_branches()
-            source_branch = github_pr['head']['ref']
-            target_branch = github_pr['base']['ref']
-            
-            # Validar branches
-            if source_branch not in gitlab_branches:
-                self.log(f"⚠️ Branch origem '{source_branch}' não existe no GitLab", "WARN")
-                # Tentar usar branch padrão como fallback
-                source_branch = 'main' if 'main' in gitlab_branches else gitlab_branches[0] if gitlab_branches else 'main'
-                
-            if target_branch not in gitlab_branches:
-                self.log(f"⚠️ Branch destino '{target_branch}' não existe no GitLab", "WARN") 
-                # Usar branch padrão como fallback
-                target_branch = 'main' if 'main' in gitlab_branches else gitlab_branches[0] if gitlab_branches else 'main'
-
-            # Dados do Merge Request
-            mr_data = {
-                'source_branch': source_branch,
-                'target_branch': target_branch,
-                'title': title,
-                'description': description,
-                'remove_source_branch': False,
-                'squash': False
-            }
-            
-            # Criar MR no GitLab
-            gitlab_mr = self.project.mergerequests.create(mr_data)
-            
-            # Aplicar estado se necessário
-            if github_pr['state'] == 'closed':
-                if github_pr.get('merged', False):
-                    # PR foi merged - não podemos "merge" retroativamente, mas podemos fechar
-                    pass  # GitLab MR fica aberto mas com nota de que foi merged no GitHub
-                else:
-                    # PR foi fechado sem merge
-                    gitlab_mr.state_event = 'close'
-                    gitlab_mr.save()
+    def build_mr_labels(self, github_pr: GitHubPullRequest) -> List[str]:
+        """Labels originais + label de identificação github-sync"""
+        labels = [label.name for label in github_pr.labels]
+        labels.append(SYNC_LABEL)
+        return labels
+
+    def pr_fingerprint(self, github_pr: GitHubPullRequest) -> str:
+        """Impressão digital dos campos sincronizados (título, corpo, labels, estado)"""
+        state = 'merged' if github_pr.merged else github_pr.state
+        return content_fingerprint(github_pr.title, github_pr.body, self.build_mr_labels(github_pr), state)
+
+    def _mr_notes(self, iid: int):
+        """Gerenciador de notas do MR sem buscá-lo (objeto lazy)"""
+        return self.project.mergerequests.get(iid, lazy=True).notes
+
+    def mr_create_data(self, github_pr: GitHubPullRequest) -> Dict:
+        """Dados de criação do MR no GitLab (branches ausentes no GitLab trocadas pela branch padrão)"""
+        # Verificar se as branches existem no GitLab
+        gitlab_branches = self.get_gitlab_branches()
+        source_branch = github_pr.head_ref
+        target_branch = github_pr.base_ref
+        
+        # Validar branches
+        if source_branch not in gitlab_branches:
+            self.log(f"⚠️ Branch origem '{source_branch}' não existe no GitLab", "WARN")
+            # Tentar usar branch padrão como fallback
+            source_branch = gitlab_branches.fallback()
             
-            self.log(f"✅ MR criado: !{gitlab_mr.iid} - {title[:50]}...")
-            return gitlab_mr
+        if target_branch not in gitlab_branches:
+            self.log(f"⚠️ Branch destino '{target_branch}' não existe no GitLab", "WARN") 
+            # Usar branch padrão como fallback
+            target_branch = gitlab_branches.fallback()
+        
+        return {
+            'source_branch': source_branch,
+            'target_branch': target_branch,
+            'title': github_pr.title,
+            'description': self.build_mr_description(github_pr),
+            'labels': ','.join(self.build_mr_labels(github_pr)),
+            'remove_source_branch': False,
+            'squash': False
+        }
+
+    def merge_note(self, github_pr: GitHubPullRequest) -> str:
+        """Nota registrando o merge feito no GitHub"""
+        return f"{MERGE_NOTE_PREFIX} {github_pr.merged_at or 'data desconhecida'}"
+
+    def mr_changes(self, gitlab_mr: GitLabMergeRequest, github_pr: GitHubPullRequest) -> Dict:
+        """Campos alterados a enviar em um único PUT (vazio se o MR já está sincronizado)"""
+        changes = {}
+        
+        if gitlab_mr.title != github_pr.title:
+            changes['title'] = github_pr.title
+        
+        description = self.build_mr_description(github_pr)
+        if gitlab_mr.description != description:
+            changes['description'] = description
+        
+        labels = self.build_mr_labels(github_pr)
+        if sorted(gitlab_mr.labels) != sorted(labels):
+            changes['labels'] = ','.join(labels)
+        
+        # Sincronizar estados (PR merged não fecha o MR: recebe nota de merge)
+        if github_pr.state == 'closed' and gitlab_mr.state != 'closed' and not github_pr.merged:
+            changes['state_event'] = 'close'
+        elif github_pr.state == 'open' and gitlab_mr.state == 'closed':
+            changes['state_event'] = 'reopen'
+        
+        return changes
+
+    def needs_merge_note(self, gitlab_mr: GitLabMergeRequest, github_pr: GitHubPullRequest) -> bool:
+        """PR merged no GitHub cujo MR aberto ainda não recebeu a nota de merge (apenas uma vez)"""
+        if github_pr.state != 'closed' or gitlab_mr.state == 'closed' or not github_pr.merged:
+            return False
+        return not self._has_merge_note(gitlab_mr)
+
+    def _create_mr(self, mr_data: Dict, close: bool = False, note: Optional[str] = None) -> GitLabMergeRequest:
+        """Cria o MR e aplica o estado: fechado, ou aberto com a nota de merge (não há merge retroativo)"""
+        gitlab_mr = GitLabMergeRequest.from_api(self.project.mergerequests.create(mr_data).attributes)
+        if note:
+            self._mr_notes(gitlab_mr.iid).create({'body': note})
+        elif close:
+            gitlab_mr.refresh(self.project.mergerequests.update(gitlab_mr.iid, {'state_event': 'close'}))
+        self.log(f"✅ MR criado: !{gitlab_mr.iid} - {mr_data['title'][:50]}...")
+        return gitlab_mr
+
+    def _send_mr_changes(self, iid: int, changes: Dict) -> Dict:
+        """Envia as alterações do MR em um único PUT e retorna a resposta do GitLab"""
+        response = self.project.mergerequests.update(iid, changes)
+        
+        if changes.get('state_event') == 'close':
+            self.log(f"✅ MR !{iid} fechado para sincronizar com GitHub")
+        elif changes.get('state_event') == 'reopen':
+            self.log(f"✅ MR !{iid} reaberto para sincronizar com GitHub")
+        fields = [field for field in changes if field != 'state_event']
+        if fields:
+            self.log(f"✅ MR !{iid} atualizado: {', '.join(fields)}")
+        return response
+
+    def _add_merge_note(self, iid: int, note: str):
+        self._mr_notes(iid).create({'body': note})
+        self.log(f"✅ Nota de merge adicionada ao MR !{iid}")
+
+    def create_gitlab_mr(self, github_pr: GitHubPullRequest) -> Optional[GitLabMergeRequest]:
+        """Cria Merge Request no GitLab baseado no PR do GitHub"""
+        try:
+            closed = github_pr.state == 'closed'
+            return self._create_mr(self.mr_create_data(github_pr), close=closed,
+                                   note=self.merge_note(github_pr) if closed and github_pr.merged else None)
             
         except Exception as e:
             self.log(f"❌ Erro ao criar MR no GitLab: {str(e)}", "ERROR")
             return None
 
-    def update_gitlab_mr(self, gitlab_mr, github_pr: Dict):
-        """Atualiza MR existente no GitLab se necessário"""
+    def _has_merge_note(self, gitlab_mr: GitLabMergeRequest) -> bool:
+        """Verifica se o MR já recebeu a nota de merge do GitHub"""
+        notes = self._mr_notes(gitlab_mr.iid).list(iterator=True, sort='desc')
+        return any(note.body.startswith(MERGE_NOTE_PREFIX) for note in notes)
+
+    def update_gitlab_mr(self, gitlab_mr: GitLabMergeRequest, github_pr: GitHubPullRequest) -> bool:
+        """Atualiza MR existente no GitLab enviando todos os campos alterados em um único PUT"""
         try:
-            # Verificar se precisa atualizar estado
-            github_state = github_pr['state']
-            gitlab_state = gitlab_mr.state
+            # Estado anterior ao PUT decide a nota de merge
+            needs_note = self.needs_merge_note(gitlab_mr, github_pr)
             
-            # Sincronizar estados
-            if github_state == 'closed' and gitlab_state != 'closed':
-                if github_pr.get('merged', False):
-                    # Adicionar nota de que foi merged no GitHub
-                    note = f"✅ Este PR foi merged no GitHub em {github_pr.get('merged_at', 'data desconhecida')}"
-                    gitlab_mr.notes.create({'body': note})
-                    self.log(f"✅ Nota de merge adicionada ao MR !{gitlab_mr.iid}")
-                else:
-                    # Fechar MR
-                    gitlab_mr.state_event = 'close'
-                    gitlab_mr.save()
-                    self.log(f"✅ MR !{gitlab_mr.iid} fechado para sincronizar com GitHub")
-                    
-            elif github_state == 'open' and gitlab_state == 'closed':
-                gitlab_mr.state_event = 'reopen'
-                gitlab_mr.save()
-                self.log(f"✅ MR !{gitlab_mr.iid} reaberto para sincronizar com GitHub")
+            changes = self.mr_changes(gitlab_mr, github_pr)
+            if changes:
+                gitlab_mr.refresh(self._send_mr_changes(gitlab_mr.iid, changes))
+            
+            if needs_note:
+                self._add_merge_note(gitlab_mr.iid, self.merge_note(github_pr))
+            return True
                 
         except Exception as e:
             self.log(f"❌ Erro ao atualizar MR: {str(e)}", "ERROR")
+            return False
 
-    def save_pr_mapping(self, github_id: int, gitlab_iid: int):
-        """Salva mapeamento entre PRs GitHub e MRs GitLab"""
-        mapping_file = '.github/data/pr-mapping.json'
-        
+    def _load_pr_mapping(self):
+        """Carrega mapeamentos existentes para o store em memória"""
         try:
-            # Criar diretório se não existir
-            os.makedirs('.github/data', exist_ok=True)
-            
-            # Carregar mapeamentos existentes
-            if os.path.exists(mapping_file):
-                with open(mapping_file, 'r') as f:
-                    mappings = json.load(f)
-            else:
-                mappings = {}
-            
-            # Adicionar novo mapeamento
-            mappings[str(github_id)] = gitlab_iid
-            
-            # Salvar arquivo atualizado
-            with open(mapping_file, 'w') as f:
-                json.dump(mappings, f, indent=2)
-                
+            self.pr_mappings.load()
+        except Exception as e:
+            self.log(f"⚠️ Erro ao carregar mapeamentos de PR: {str(e)}", "WARN")
+
+    def _flush_pr_mapping(self) -> bool:
+        """Grava todos os mapeamentos pendentes em um único flush atômico"""
+        try:
+            self.pr_mappings.flush()
+            return True
         except Exception as e:
             self.log(f"❌ Erro ao salvar mapeamento de PR: {str(e)}", "ERROR")
+            return False
 
-    def load_pr_mapping(self) -> Dict[str, int]:
-        """Carrega mapeamento existente entre PRs e MRs"""
-        mapping_file = '.github/data/pr-mapping.json'
+    def sync_pull_request(self, github_pr: GitHubPullRequest) -> Optional[str]:
+        """Sincroniza um único PR (evento de webhook): 'created', 'updated', 'unchanged' ou None em erro"""
+        github_id = github_pr.number
+        self._load_pr_mapping()
+        self.provision_labels([github_pr])
+        fingerprint = self.pr_fingerprint(github_pr)
+        
+        if github_id in self.pr_mappings:
+            if self.pr_mappings.get_fingerprint(github_id) == fingerprint:
+                return 'unchanged'
+            gitlab_mr = self._get_gitlab_mr(self.pr_mappings.get_iid(github_id))
+        else:
+            # Receptor sem o JSON de mapeamentos: procurar no GitLab antes de criar um duplicado
+            try:
+                gitlab_mr = find_synced_item(self.project.mergerequests, github_id, github_pr.title,
+                                             GitLabMergeRequest.from_api)
+            except Exception as e:
+                self.log(f"❌ Erro ao procurar no GitLab o MR do PR #{github_id}: {str(e)}", "ERROR")
+                return None
+            if gitlab_mr:
+                self.pr_mappings.set(github_id, gitlab_mr.iid)
         
+        if gitlab_mr:
+            if not self.update_gitlab_mr(gitlab_mr, github_pr):
+                return None
+            self.pr_mappings.set_fingerprint(github_id, fingerprint)
+            return 'updated' if self._flush_pr_mapping() else None
+        
+        gitlab_mr = self.create_gitlab_mr(github_pr)
+        if not gitlab_mr:
+            return None
+        self.pr_mappings.set(github_id, gitlab_mr.iid)
+        self.pr_mappings.set_fingerprint(github_id, fingerprint)
+        return 'created' if self._flush_pr_mapping() else None
+
+    def _load_checkpoint(self, checkpoint: Checkpoint) -> bool:
+        """Carrega o checkpoint da última execução interrompida, se houver"""
         try:
-            if os.path.exists(mapping_file):
-                with open(mapping_file, 'r') as f:
-                    return json.load(f)
+            return checkpoint.load()
         except Exception as e:
-            self.log(f"⚠️ Erro ao carregar mapeamentos de PR: {str(e)}", "WARN")
+            self.log(f"⚠️ Erro ao carregar checkpoint de PRs: {str(e)}", "WARN")
+            return False
+
+    def _commit_checkpoint(self, checkpoint: Checkpoint, processed: int, remaining: Dict[int, None]):
+        """Grava o cursor e a fila pendente após um lote confirmado"""
+        try:
+            checkpoint.commit(processed, remaining)
+        except Exception as e:
+            self.log(f"⚠️ Erro ao gravar checkpoint de PRs: {str(e)}", "WARN")
+
+    def match_pr(self, github_pr: GitHubPullRequest, gitlab_index: GitLabIndex,
+                 gitlab_since: Optional[str]) -> Tuple[str, Optional[GitLabMergeRequest]]:
+        """Decide o destino de um PR: 'unchanged', 'update' (mapeado), 'link' (marcador ou mesmo título) ou 'create'"""
+        github_id = github_pr.number
         
-        return {}
+        # Verificar se já existe mapeamento
+        if github_id in self.pr_mappings:
+            gitlab_iid = self.pr_mappings.get_iid(github_id)
+            if self.pr_mappings.get_fingerprint(github_id) == self.pr_fingerprint(github_pr):
+                return 'unchanged', None
+            if gitlab_iid not in gitlab_index.by_iid and gitlab_since:
+                # Fora do delta do GitLab: buscar apenas o MR mapeado
+                mapped_mr = self._get_gitlab_mr(gitlab_iid)
+                if mapped_mr:
+                    gitlab_index.by_iid[gitlab_iid] = mapped_mr
+            if gitlab_iid in gitlab_index.by_iid:
+                return 'update', gitlab_index.by_iid[gitlab_iid]
+        
+        # Mapeamento ausente (ex.: JSON perdido em um checkout novo): marcador do GitHub na descrição
+        if github_id in gitlab_index.by_github:
+            return 'link', gitlab_index.by_github[github_id]
+        
+        # Último recurso: MR sem marcador com o mesmo título
+        if github_pr.title in gitlab_index.by_title:
+            return 'link', gitlab_index.by_title[github_pr.title]
+        
+        return 'create', None
 
-    def sync_pull_requests(self):
-        """Função principal de sincronização de Pull Requests"""
+    def sync_pull_requests(self, resume: bool = False) -> SyncSummary:
+        """Função principal de sincronização de Pull Requests (checkpoint gravado a cada lote confirmado)"""
         self.log("🔄 Iniciando sincronização de Pull Requests GitHub → GitLab...")
         
-        # Buscar PRs/MRs de ambas as plataformas
-        github_prs = self.get_github_prs()
-        gitlab_mrs = self.get_gitlab_mrs()
+        # Retomar execução interrompida com os mesmos watermarks e apenas a fila pendente
+        checkpoint = Checkpoint(PRS_CHECKPOINT_FILE)
+        resuming = resume and self._load_checkpoint(checkpoint)
+        if resuming:
+            run_started_at = checkpoint.run_started_at
+            github_since, gitlab_since = checkpoint.github_since, checkpoint.gitlab_since
+            self.log(f"⏯️ Retomando execução de {run_started_at}: {len(checkpoint.pending)} PRs pendentes "
+                     f"({checkpoint.cursor} já processados)")
+        else:
+            if resume:
+                self.log("ℹ️ Nenhum checkpoint de PRs para retomar - execução completa")
+            # Watermarks da última execução (None = varredura completa)
+            run_started_at = utc_now_iso()
+            github_since = self.state.get_watermark(GITHUB_PRS) if self.incremental else None
+            gitlab_since = self.state.get_watermark(GITLAB_MRS) if self.incremental else None
+        if github_since:
+            self.log(f"⏩ Modo incremental: PRs alterados desde {github_since}")
         
-        # Carregar mapeamentos existentes
-        existing_mappings = self.load_pr_mapping()
+        # GitLab primeiro: o índice por título/iid precisa estar completo antes do casamento
+        with span('gitlab-fetch'):
+            gitlab_index = self.get_gitlab_mr_index(updated_after=gitlab_since)
+        if gitlab_since is None:
+            self.snapshot.gitlab_mrs = ItemCounts.from_items(gitlab_index.by_iid.values())
         
-        # Criar índices para busca rápida
-        gitlab_titles = {mr.title: mr for mr in gitlab_mrs}
-        gitlab_by_iid = {mr.iid: mr for mr in gitlab_mrs}
+        # Fila durável: números GitHub ainda não confirmados nesta execução. Em uma retomada com a
+        # listagem já concluída, apenas a fila pendente é processada; com a listagem interrompida,
+        # tudo é reprocessado (itens já confirmados caem na impressão digital, sem escrita)
+        pending_filter = set(checkpoint.pending) if resuming and checkpoint.listed else None
+        if resuming:
+            remaining = dict.fromkeys(checkpoint.pending)
+        else:
+            remaining = {}
+            checkpoint.begin(run_started_at, github_since, gitlab_since)
+        
+        # Varredura completa: o relatório usa as contagens acumuladas durante a listagem
+        github_counts = ItemCounts() if github_since is None else None
+        
+        # Carregar mapeamentos existentes
+        self._load_pr_mapping()
+        existing_mappings = self.pr_mappings
         
         created_count = 0
         updated_count = 0
         skipped_count = 0
+        unchanged_count = 0
+        mappings_saved = True
         
-        for github_pr in github_prs:
-            github_id = str(github_pr['number'])
-            original_title = github_pr['title']
-            
-            # Verificar se já existe mapeamento
-            if github_id in existing_mappings:
-                gitlab_iid = existing_mappings[github_id]
-                if gitlab_iid in gitlab_by_iid:
-                    # MR já mapeado, verificar se precisa atualizar
-                    self.update_gitlab_mr(gitlab_by_iid[gitlab_iid], github_pr)
-                    updated_count += 1
-                    continue
-            
-            # Verificar se já existe pelo título
-            if original_title in gitlab_titles:
-                # MR existe mas não está mapeado, criar mapeamento
-                gitlab_mr = gitlab_titles[original_title]
-                self.save_pr_mapping(github_pr['number'], gitlab_mr.iid)
-                self.update_gitlab_mr(gitlab_mr, github_pr)
-                updated_count += 1
-                continue
-            
-            # MR não existe, criar novo
-            gitlab_mr = self.create_gitlab_mr(github_pr)
-            if gitlab_mr:
-                self.save_pr_mapping(github_pr['number'], gitlab_mr.iid)
-                created_count += 1
-            else:
-                skipped_count += 1
+        # Páginas do GitHub chegam por uma fila limitada enquanto os lotes anteriores são escritos.
+        # Escritas executadas em paralelo; cada item segue criação → estado → notas em ordem.
+        # Ao fim de cada lote: mapeamentos gravados e checkpoint avançado
+        with PageStream(self.iter_github_pr_pages(since=github_since)) as stream, WriteExecutor() as executor:
+            for batch in stream.batches(CHECKPOINT_BATCH_SIZE):
+                if github_counts is not None:
+                    for item in batch:
+                        github_counts.add(item)
+                if pending_filter is not None:
+                    batch = [pr for pr in batch if pr.number in pending_filter]
+                remaining.update(dict.fromkeys(pr.number for pr in batch))
+                
+                # Garantir que as labels usadas no lote existam no GitLab (com as cores originais)
+                self.provision_labels(batch)
+                
+                pending = []
+                try:
+                    for github_pr in batch:
+                        action, gitlab_mr = self.match_pr(github_pr, gitlab_index, gitlab_since)
+                        if action == 'unchanged':
+                            # Conteúdo idêntico ao último sincronizado: nenhuma chamada ao GitLab
+                            unchanged_count += 1
+                            remaining.pop(github_pr.number, None)
+                            continue
+                        
+                        if action == 'link':
+                            # MR existe mas não está mapeado, criar mapeamento
+                            existing_mappings.set(github_pr.number, gitlab_mr.iid)
+                        
+                        if gitlab_mr:
+                            # MR já mapeado (ou casado pelo título), verificar se precisa atualizar
+                            future = executor.submit(self.gitlab_host, self.update_gitlab_mr, gitlab_mr, github_pr)
+                            pending.append(('update', github_pr, future))
+                        else:
+                            # MR não existe, criar novo
+                            future = executor.submit(self.gitlab_host, self.create_gitlab_mr, github_pr)
+                            pending.append(('create', github_pr, future))
+                finally:
+                    # Coletar resultados na ordem de submissão (contadores determinísticos)
+                    for action, github_pr, future in pending:
+                        result = None if future.exception() else future.result()
+                        if action == 'update':
+                            if result:
+                                existing_mappings.set_fingerprint(github_pr.number, self.pr_fingerprint(github_pr))
+                                remaining.pop(github_pr.number, None)
+                                updated_count += 1
+                            else:
+                                skipped_count += 1
+                            continue
+                        gitlab_mr = result
+                        if gitlab_mr:
+                            self.snapshot.add('gitlab_mrs', gitlab_mr)
+                            existing_mappings.set(github_pr.number, gitlab_mr.iid)
+                            existing_mappings.set_fingerprint(github_pr.number, self.pr_fingerprint(github_pr))
+                            remaining.pop(github_pr.number, None)
+                            created_count += 1
+                        else:
+                            skipped_count += 1
+                    
+                    # Commit do lote: mapeamentos primeiro, depois o checkpoint que os referencia
+                    if self._flush_pr_mapping():
+                        self._commit_checkpoint(checkpoint, len(batch), remaining)
+                    else:
+                        mappings_saved = False
+        
+        if stream.error:
+            self.log(f"❌ Erro ao buscar PRs do GitHub: {str(stream.error)}", "ERROR")
+        self.log(f"Encontrados {stream.items} Pull Requests no GitHub{' (GraphQL)' if self.graphql else ''}")
+        if stream.complete:
+            if github_counts is not None:
+                self.snapshot.github_prs = github_counts
+            checkpoint.listed = True
+            self._commit_checkpoint(checkpoint, 0, remaining)
+        
+        if remaining or not stream.complete:
+            self.log(f"⏸️ {len(remaining)} PRs pendentes no checkpoint - use --resume para retomar", "WARN")
+        else:
+            checkpoint.clear()
+        
+        # Avançar watermarks apenas se nenhum PR ficou pendente
+        if skipped_count == 0 and mappings_saved and stream.complete and not remaining:
+            self.state.set_watermark(GITHUB_PRS, run_started_at)
+            self.state.set_watermark(GITLAB_MRS, run_started_at)
+            self.state.save()
+        else:
+            self.log("⚠️ PRs ignorados nesta execução - watermark mantido para nova tentativa", "WARN")
         
         # Relatório final
-        total_processed = created_count + updated_count + skipped_count
+        total_processed = created_count + updated_count + skipped_count + unchanged_count
         self.log(f"✅ Sincronização de Pull Requests concluída:")
         self.log(f"   📊 Total processados: {total_processed}")
         self.log(f"   ➕ Criados: {created_count}")
         self.log(f"   🔄 Atualizados: {updated_count}")
+        self.log(f"   ✔️ Sem alterações: {unchanged_count}")
         self.log(f"   ⏭️ Ignorados: {skipped_count}")
+        
+        return SyncSummary(created=created_count, updated=updated_count, skipped=skipped_count,
+                           unchanged=unchanged_count)
+
+    def plan_labels(self, plan: SyncPlan, github_prs: List[GitHubPullRequest]):
+        """Planeja a criação das labels ausentes usadas pelos PRs (sem escrever no GitLab)"""
+        wanted = labels_from_items(github_prs) + [SYNC_LABEL_SPEC]
+        try:
+            for label in self.label_index.missing(wanted):
+                plan.add_label(label, self.gitlab_host)
+        except Exception as e:
+            self.log(f"⚠️ Erro ao listar labels: {str(e)}", "WARN")
+
+    def _plan_pr(self, plan: SyncPlan, github_pr: GitHubPullRequest, gitlab_index: GitLabIndex,
+                 gitlab_since: Optional[str]):
+        """Adiciona ao plano a escrita decidida para um PR (inclui a leitura das notas de merge)"""
+        action, gitlab_mr = self.match_pr(github_pr, gitlab_index, gitlab_since)
+        if action == 'unchanged':
+            return
+        
+        fingerprint = self.pr_fingerprint(github_pr)
+        summary = f"#{github_pr.number} {github_pr.title[:50]}"
+        if gitlab_mr is None:
+            closed = github_pr.state == 'closed'
+            note = self.merge_note(github_pr) if closed and github_pr.merged else None
+            plan.add(PRS, 'create', summary, self.gitlab_host, 1 + (closed or bool(note)),
+                     payload={'data': self.mr_create_data(github_pr), 'close': closed and not note, 'note': note},
+                     github_number=github_pr.number, fingerprint=fingerprint)
+            return
+        
+        note = self.merge_note(github_pr) if self.needs_merge_note(gitlab_mr, github_pr) else None
+        changes = self.mr_changes(gitlab_mr, github_pr)
+        if set(changes) - {'state_event'}:
+            kind = 'update'
+        elif changes:
+            kind = 'state'
+        elif note:
+            kind = 'note'
+        else:
+            kind = 'map'
+        fields = ', '.join(list(changes) + (['nota de merge'] if note else [])) or 'mapeamento'
+        plan.add(PRS, kind, f"{summary} → !{gitlab_mr.iid} ({fields})", self.gitlab_host,
+                 (1 if changes else 0) + (1 if note else 0),
+                 payload={'changes': changes, 'note': note}, github_number=github_pr.number,
+                 gitlab_iid=gitlab_mr.iid, fingerprint=fingerprint)
+
+    def plan_pull_requests(self, plan: SyncPlan):
+        """Planeja as escritas de MRs e notas a partir das listagens, sem escrever no GitLab (--dry-run)"""
+        self.log("🗂️ Planejando sincronização de Pull Requests GitHub → GitLab...")
+        
+        run_started_at = utc_now_iso()
+        github_since = self.state.get_watermark(GITHUB_PRS) if self.incremental else None
+        gitlab_since = self.state.get_watermark(GITLAB_MRS) if self.incremental else None
+        if github_since:
+            self.log(f"⏩ Modo incremental: PRs alterados desde {github_since}")
+        
+        with span('gitlab-fetch'):
+            gitlab_index = self.get_gitlab_mr_index(updated_after=gitlab_since)
+        self._load_pr_mapping()
+        
+        listed = 0
+        complete = True
+        try:
+            for page in self.iter_github_pr_pages(since=github_since):
+                listed += len(page)
+                self.plan_labels(plan, page)
+                for github_pr in page:
+                    self._plan_pr(plan, github_pr, gitlab_index, gitlab_since)
+        except Exception as e:
+            complete = False
+            self.log(f"❌ Erro ao buscar PRs do GitHub: {str(e)}", "ERROR")
+        
+        # Watermarks só avançam ao aplicar um plano montado sobre a listagem completa
+        plan.add_phase(PRS, run_started_at, [GITHUB_PRS, GITLAB_MRS] if complete else [])
+        self.log(f"🗂️ {len(plan.pending(PRS))} escritas planejadas para {listed} Pull Requests do GitHub")
+
+    def _apply_label(self, action: PlannedAction):
+        self.label_index.ensure([action.payload])
+
+    def _apply_pr(self, action: PlannedAction):
+        """Executa uma ação de MR do plano (após a criação, o restante vira ação de estado/nota)"""
+        if action.kind == 'create':
+            gitlab_mr = self._create_mr(action.payload['data'])
+            # A partir daqui o MR existe: uma nova tentativa apenas aplica estado e nota
+            action.gitlab_iid = gitlab_mr.iid
+            action.kind = 'note' if action.payload['note'] else 'state'
+            action.payload = {'changes': {'state_event': 'close'} if action.payload['close'] else {},
+                              'note': action.payload['note']}
+        if action.payload['changes']:
+            self._send_mr_changes(action.gitlab_iid, action.payload['changes'])
+        if action.payload['note']:
+            self._add_merge_note(action.gitlab_iid, action.payload['note'])
+
+    def _record_pr(self, action: PlannedAction):
+        """Mapeamento de todo MR existente; impressão digital apenas das ações concluídas"""
+        if action.gitlab_iid is not None:
+            self.pr_mappings.set(action.github_number, action.gitlab_iid)
+        if action.status == DONE:
+            self.pr_mappings.set_fingerprint(action.github_number, action.fingerprint)
+
+    def apply_plan(self, plan: SyncPlan, plan_path: str) -> bool:
+        """Aplica as labels, MRs e notas pendentes do plano; retorna True se nada falhou (--apply)"""
+        self.log(f"▶️ Aplicando plano de Pull Requests gerado em {plan.created_at}...")
+        self._load_pr_mapping()
+        
+        def commit():
+            if self._flush_pr_mapping():
+                plan.save(plan_path)
+        
+        failed = run_actions(plan.pending(LABELS), self.gitlab_host, self._apply_label, lambda action: None,
+                             lambda: plan.save(plan_path))
+        failed += run_actions(plan.pending(PRS), self.gitlab_host, self._apply_pr, self._record_pr, commit)
+        
+        phase = plan.phases.get(PRS)
+        if phase and phase.watermarks and not plan.pending(PRS):
+            for entity in phase.watermarks:
+                self.state.set_watermark(entity, phase.run_started_at)
+            self.state.save()
+        
+        self.log(f"{'✅' if not failed else '⚠️'} Plano de Pull Requests aplicado: {failed} falhas")
+        return failed == 0
 
     def generate_prs_report(self):
         """Gera relatório específico de PRs/MRs"""
         try:
-            github_prs = self.get_github_prs()
-            gitlab_mrs = self.get_gitlab_mrs()
-            
-            # Estatísticas por estado GitHub
-            github_open = sum(1 for pr in github_prs if pr['state'] == 'open')
-            github_closed = sum(1 for pr in github_prs if pr['state'] == 'closed')
-            github_merged = sum(1 for pr in github_prs if pr.get('merged', False))
-            
-            # Estatísticas por estado GitLab
-            gitlab_open = sum(1 for mr in gitlab_mrs if mr.state == 'opened')
-            gitlab_closed = sum(1 for mr in gitlab_mrs if mr.state == 'closed')
-            gitlab_merged = sum(1 for mr in gitlab_mrs if mr.state == 'merged')
+            # Contagens da fase de sincronização ou, em modo incremental, dos endpoints de contagem
+            github_prs = self.snapshot.get_or_fetch('github_prs', self.count_github_items)
+            gitlab_mrs = self.snapshot.get_or_fetch('gitlab_mrs', lambda: count_gitlab_mrs(self.project))
             
             report = f"""## 🔄 Relatório de Pull Requests - {datetime.now().strftime('%d/%m/%Y %H:%M')}
 
 ### GitHub Pull Requests
-- **Total**: {len(github_prs)}
-- **Abertos**: {github_open}
-- **Fechados**: {github_closed}
-- **Merged**: {github_merged}
+- **Total**: {github_prs.total}
+- **Abertos**: {github_prs.states['open']}
+- **Fechados**: {github_prs.states['closed']}
+- **Merged**: {github_prs.merged}
 
 ### GitLab Merge Requests
-- **Total**: {len(gitlab_mrs)}
-- **Abertos**: {gitlab_open}
-- **Fechados**: {gitlab_closed}
-- **Merged**: {gitlab_merged}
+- **Total**: {gitlab_mrs.total}
+- **Abertos**: {gitlab_mrs.states['opened']}
+- **Fechados**: {gitlab_mrs.states['closed']}
+- **Merged**: {gitlab_mrs.states['merged']}
 
 ### Status de Sincronização
-- **Sincronização**: {'✅ OK' if len(gitlab_mrs) >= len(github_prs) else '⚠️ Pendente'}
-- **Diferença**: {len(github_prs) - len(gitlab_mrs)} PRs
+- **Sincronização**: {'✅ OK' if gitlab_mrs.total >= github_prs.total else '⚠️ Pendente'}
+- **Diferença**: {github_prs.total - gitlab_mrs.total} PRs
 
 ### Branches Mais Ativas
 {self._get_top_branches(github_prs)}
@@ -329,33 +737,56 @@ class GitHubPRSyncer:
             self.log(f"❌ Erro ao gerar relatório de PRs: {str(e)}", "ERROR")
             return ""
 
-    def _get_top_branches(self, prs: List[Dict], top_n: int = 5) -> str:
+    def _get_top_branches(self, counts: ItemCounts, top_n: int = 5) -> str:
         """Obtém as branches mais usadas como origem"""
-        branch_count = {}
-        
-        for pr in prs:
-            branch = pr['head']['ref']
-            branch_count[branch] = branch_count.get(branch, 0) + 1
-        
-        # Ordenar por uso
-        sorted_branches = sorted(branch_count.items(), key=lambda x: x[1], reverse=True)
-        
         result = []
-        for branch, count in sorted_branches[:top_n]:
+        for branch, count in counts.branches.most_common(top_n):
             result.append(f"- **{branch}**: {count} PRs")
         
         return '\n'.join(result) if result else "- Nenhuma branch encontrada"
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Sincronização de Pull Requests GitHub → GitLab AGES")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--resume', action='store_true',
+                      help="retoma a última execução interrompida a partir do checkpoint")
+    mode.add_argument('--dry-run', nargs='?', const=PLAN_FILE, metavar='PLAN',
+                      help=f"apenas planeja as escritas e grava o plano em PLAN (padrão: {PLAN_FILE})")
+    mode.add_argument('--apply', metavar='PLAN',
+                      help="executa um plano gerado com --dry-run")
+    args = parser.parse_args()
+    
     try:
         syncer = GitHubPRSyncer()
-        syncer.sync_pull_requests()
+        
+        if args.dry_run:
+            plan = SyncPlan(repo=syncer.repo_name, project_id=syncer.project.id)
+            with span('plan'):
+                syncer.plan_pull_requests(plan)
+            plan.publish(args.dry_run)
+            print(f"🗂️ Plano gravado em {args.dry_run}")
+            return
+        
+        if args.apply:
+            plan = SyncPlan.load(args.apply, syncer.repo_name, syncer.project.id)
+            with span('apply'):
+                applied = syncer.apply_plan(plan, args.apply)
+            print(plan.render())
+            if not applied:
+                exit(1)
+            return
+        
+        with span('prs'):
+            syncer.sync_pull_requests(resume=args.resume)
         syncer.generate_prs_report()
         
     except Exception as e:
         print(f"❌ ERRO CRÍTICO na sincronização de PRs: {str(e)}")
         exit(1)
+    
+    finally:
+        export_metrics()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
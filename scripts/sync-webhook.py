@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Receptor de webhooks do GitHub para sincronização GitHub → GitLab AGES em tempo quase real
+Cada evento (issues, pull_request, label, push) vira uma única criação, atualização ou push
+Para uso no projeto Pro-Mata PUCRS
+
+Uso:
+    python scripts/sync-webhook.py                                # inicia o receptor
+    python scripts/sync-webhook.py send issues evento.json        # remetente local de testes
+"""
+
+import os
+import json
+import argparse
+import subprocess
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict
+from urllib.parse import urlparse
+
+from promata_sync.branches import BranchIndex
+from promata_sync.http_client import build_gitlab_client, get_session
+from promata_sync.labels import LabelIndex, label_from_github
+from promata_sync.loader import load_script
+from promata_sync.mirror import MirrorEngine
+from promata_sync.models import GitHubIssue, GitHubPullRequest
+from promata_sync.webhook import (
+    DELIVERY_HEADER,
+    EVENT_HEADER,
+    SIGNATURE_HEADER,
+    sign_payload,
+    verify_signature,
+)
+
+WEBHOOK_HOST = os.environ.get('SYNC_WEBHOOK_HOST', '127.0.0.1')
+WEBHOOK_PORT = int(os.environ.get('SYNC_WEBHOOK_PORT', '8080'))
+MAX_PAYLOAD_BYTES = 25 * 1024 * 1024  # limite de payload do GitHub
+
+class GitHubWebhookReceiver:
+    def __init__(self):
+        """Inicializa o receptor com os syncers de issues/PRs compartilhando cliente e projeto"""
+        self.webhook_secret = os.environ.get('GITHUB_WEBHOOK_SECRET')
+        self.gitlab_url = os.environ.get('GITLAB_URL', 'https://tools.ages.pucrs.br')
+        self.gitlab_token = os.environ.get('GITLAB_TOKEN')
+        self.gitlab_project_id = os.environ.get('GITLAB_PROJECT_ID')
+
+        # Sem segredo não há como autenticar os eventos recebidos
+        if not all([self.webhook_secret, self.gitlab_token, self.gitlab_project_id]):
+            raise ValueError("Configurações incompletas. Verifique GITHUB_WEBHOOK_SECRET e os secrets do GitLab.")
+
+        self.gl = build_gitlab_client(self.gitlab_url, self.gitlab_token)
+        self.project = self.gl.projects.get(self.gitlab_project_id)
+
+        # Índices mantidos entre eventos (uma listagem por processo)
+        self.branch_index = BranchIndex(self.project)
+        self.label_index = LabelIndex(self.project)
+
+        issues_module = load_script('sync-issues.py')
+        prs_module = load_script('sync-prs.py')
+        self.issues_syncer = issues_module.GitHubIssuesSyncer(gl=self.gl, project=self.project,
+                                                             label_index=self.label_index)
+        self.prs_syncer = prs_module.GitHubPRSyncer(gl=self.gl, project=self.project,
+                                                    branch_index=self.branch_index, label_index=self.label_index)
+
+        self.mirror = MirrorEngine(remote='gitlab')
+        self.mirror_remote_ready = False
+
+        self.handlers = {
+            'ping': self.handle_ping,
+            'issues': self.handle_issues,
+            'pull_request': self.handle_pull_request,
+            'label': self.handle_label,
+            'push': self.handle_push,
+        }
+
+    def log(self, message: str, level: str = "INFO"):
+        """Log com timestamp"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        print(f"[{timestamp}] {level}: {message}", flush=True)
+
+    def handle_event(self, event: str, payload: Dict) -> Dict:
+        """Despacha o evento para o handler correspondente"""
+        handler = self.handlers.get(event)
+        if handler is None:
+            return {'event': event, 'result': 'ignored'}
+        action = payload.get('action')
+        result = handler(payload)
+        self.log(f"📨 Evento {event}{'/' + action if action else ''}: {result}")
+        return {'event': event, 'action': action, 'result': result}
+
+    def handle_ping(self, payload: Dict) -> str:
+        return 'pong'
+
+    def handle_issues(self, payload: Dict) -> str:
+        """Issue aberta/editada/fechada/reaberta/rotulada → criação ou PUT único"""
+        if payload.get('action') in ('deleted', 'transferred'):
+            return 'ignored'
+        return self.issues_syncer.sync_issue(GitHubIssue.from_rest(payload['issue'])) or 'error'
+
+    def handle_pull_request(self, payload: Dict) -> str:
+        """PR aberto/editado/fechado/merged/reaberto → criação ou PUT único"""
+        return self.prs_syncer.sync_pull_request(GitHubPullRequest.from_rest(payload['pull_request'])) or 'error'
+
+    def handle_label(self, payload: Dict) -> str:
+        """Label criada/editada no GitHub → criação ou atualização da label no GitLab"""
+        action = payload.get('action')
+        label = label_from_github(payload['label'])
+        try:
+            if action == 'created':
+                return 'created' if self.label_index.ensure([label]) else 'unchanged'
+            if action == 'edited':
+                old_name = payload.get('changes', {}).get('name', {}).get('from', label['name'])
+                return 'updated' if self.label_index.update(old_name, label) else 'unchanged'
+        except Exception as e:
+            self.log(f"❌ Erro ao sincronizar label '{label['name']}': {str(e)}", "ERROR")
+            return 'error'
+        # Labels removidas no GitHub são mantidas no GitLab (histórico das issues)
+        return 'ignored'
+
+    def _ensure_mirror_remote(self):
+        """Configura o remote `gitlab` uma vez por processo"""
+        if self.mirror_remote_ready:
+            return
+        host = urlparse(self.gitlab_url).netloc
+        gitlab_remote_url = f"https://oauth2:{self.gitlab_token}@{host}/{self.project.path_with_namespace}.git"
+        subprocess.run(['git', 'remote', 'remove', 'gitlab'], capture_output=True, check=False)
+        result = subprocess.run(['git', 'remote', 'add', 'gitlab', gitlab_remote_url],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            self.log(f"Aviso ao adicionar remote: {result.stderr}")
+        self.mirror_remote_ready = True
+
+    def handle_push(self, payload: Dict) -> str:
+        """Push de branch/tag → espelha apenas a ref enviada"""
+        ref = payload['ref']
+        deleted = bool(payload.get('deleted'))
+        self._ensure_mirror_remote()
+        report = self.mirror.mirror_ref(ref, deleted=deleted)
+        if not report.updates:
+            return 'ignored'
+        if not report.ok:
+            self.log(f"❌ Erro ao espelhar {ref}: {report.error or 'ref rejeitada'}", "ERROR")
+            return 'error'
+
+        # Manter o índice de branches coerente para os próximos MRs
+        if deleted:
+            self.branch_index.apply_ref_updates([], [ref])
+        else:
+            self.branch_index.apply_ref_updates([ref])
+        return report.updates[0].status
+
+    def serve(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT):
+        """Atende eventos em série: cada evento é aplicado por completo antes do próximo"""
+        server = HTTPServer((host, port), make_handler(self))
+        self.log(f"🔔 Receptor de webhooks ouvindo em http://{host}:{server.server_port}/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.log("🛑 Receptor de webhooks encerrado")
+        finally:
+            server.server_close()
+
+
+def make_handler(receiver: GitHubWebhookReceiver):
+    """Handler HTTP que valida a assinatura antes de despachar o evento"""
+
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _respond(self, status: int, body: Dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_PAYLOAD_BYTES:
+                return self._respond(413, {'error': 'payload muito grande'})
+            body = self.rfile.read(length)
+
+            if not verify_signature(receiver.webhook_secret, body, self.headers.get(SIGNATURE_HEADER)):
+                receiver.log(f"⚠️ Assinatura inválida (entrega {self.headers.get(DELIVERY_HEADER)})", "WARN")
+                return self._respond(401, {'error': 'assinatura inválida'})
+
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return self._respond(400, {'error': 'JSON inválido'})
+
+            try:
+                result = receiver.handle_event(self.headers.get(EVENT_HEADER, ''), payload)
+            except Exception as e:
+                receiver.log(f"❌ Erro ao processar evento: {str(e)}", "ERROR")
+                return self._respond(500, {'error': str(e)})
+            self._respond(200, result)
+
+    return WebhookHandler
+
+
+def send_event(url: str, secret: str, event: str, payload_path: str) -> int:
+    """Remetente local: envia um payload assinado como o GitHub faria"""
+    with open(payload_path, 'rb') as f:
+        body = f.read()
+    headers = {
+        'Content-Type': 'application/json',
+        EVENT_HEADER: event,
+        DELIVERY_HEADER: f"local-{datetime.now().strftime('%Y%m%d%H%M%S%f')}",
+        SIGNATURE_HEADER: sign_payload(secret, body),
+    }
+    response = get_session().post(url, data=body, headers=headers)
+    print(f"{response.status_code} {response.text}")
+    return 0 if response.ok else 1
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Receptor de webhooks GitHub → GitLab")
+    subparsers = parser.add_subparsers(dest='command')
+    sender = subparsers.add_parser('send', help="envia um payload local assinado ao receptor")
+    sender.add_argument('event', help="tipo do evento (issues, pull_request, label, push)")
+    sender.add_argument('payload', help="arquivo JSON com o payload do evento")
+    sender.add_argument('--url', default=f"http://{WEBHOOK_HOST}:{WEBHOOK_PORT}/")
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'send':
+            secret = os.environ.get('GITHUB_WEBHOOK_SECRET')
+            if not secret:
+                raise ValueError("GITHUB_WEBHOOK_SECRET não definido")
+            exit(send_event(args.url, secret, args.event, args.payload))
+
+        GitHubWebhookReceiver().serve()
+
+    except Exception as e:
+        print(f"❌ ERRO CRÍTICO no receptor de webhooks: {str(e)}")
+        exit(1)
+
+if __name__ == "__main__":
+    main()